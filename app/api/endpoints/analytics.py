@@ -0,0 +1,51 @@
+# app/api/endpoints/analytics.py
+from fastapi import APIRouter, Depends, Query
+from typing import Literal, Optional
+from datetime import datetime
+from app.db.sessions import get_read_database
+from app.core.security import verify_api_key
+from app.services import analytics
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/timeseries")
+async def get_timeseries(
+    granularity: Literal["hour", "day"] = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    lane: Optional[str] = Query(None, description="Origin-destination states, e.g. TX-IL"),
+    equipment: Optional[str] = None,
+    mc_number: Optional[str] = None,
+    api_key: str = Depends(verify_api_key)
+):
+    """Calls, bookings, revenue, margin vs loadboard rate and outcomes per hour or day (default: last 7 days)"""
+    start, end = analytics.default_range(start, end, granularity)
+    buckets = await analytics.timeseries(get_read_database(), granularity, start, end, lane, equipment, mc_number)
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "buckets": buckets
+    }
+
+@router.get("/breakdown")
+async def get_breakdown(
+    by: Literal["lane", "equipment", "mc_number"] = "lane",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    lane: Optional[str] = None,
+    equipment: Optional[str] = None,
+    mc_number: Optional[str] = None,
+    api_key: str = Depends(verify_api_key)
+):
+    """Totals over a range grouped by lane, equipment or carrier (default: last 7 days)"""
+    start, end = analytics.default_range(start, end, "day")
+    rows = await analytics.breakdown(get_read_database(), by, start, end, lane, equipment, mc_number)
+    return {
+        "by": by,
+        "start": start,
+        "end": end,
+        "rows": rows
+    }
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends
-import httpx
-from app.core.config import settings
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from app.core.responses import FastJSONResponse
 from app.core.security import verify_api_key
+from app.services.carrier_verification import carrier_verification_service
+from app.services import loads as load_service
+from app.services.loads import InvalidSearch
 import logging
 
 router = APIRouter()
@@ -11,28 +14,40 @@ logger = logging.getLogger(__name__)
 async def verify_carrier(mc_number: str, api_key: str = Depends(verify_api_key)):
     """Verify carrier using FMCSA API"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://mobile.fmcsa.dot.gov/qc/services/carriers/{mc_number}",
-                params={"webKey": settings.fmcsa_api_key}
-            )
-            
-        if response.status_code == 200:
-            data = response.json()
-            carrier = data.get("content", {}).get("carrier", {})
-            
-            return {
-                "mc_number": mc_number,
-                "is_eligible": (
-                    carrier.get("entityType") == "CARRIER" and
-                    carrier.get("statusCode") == "ACTIVE"
-                ),
-                "carrier_name": carrier.get("legalName", "Unknown"),
-                "safety_rating": carrier.get("safetyRating", "Not Rated")
-            }
-        else:
-            return {"mc_number": mc_number, "is_eligible": False, "error": "Not found"}
+        return FastJSONResponse(await carrier_verification_service.verify(mc_number))
             
     except Exception as e:
         logger.error(f"FMCSA verification failed: {e}")
-        raise HTTPException(status_code=500, detail="Verification failed")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Verification failed")
+
+@router.get("/{mc_number}/recommendations")
+async def recommend_loads(
+    mc_number: str,
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    equipment_type: Optional[str] = None,
+    min_rate: Optional[float] = None,
+    max_rate: Optional[float] = None,
+    origin_radius_miles: Optional[float] = Query(None, gt=0),
+    destination_radius_miles: Optional[float] = Query(None, gt=0),
+    k: int = Query(5, ge=1, le=50),
+    explain: bool = False,
+    api_key: str = Depends(verify_api_key)
+):
+    """Available loads ranked for a carrier by lane and equipment history, acceptance rate, deadhead and rate per mile"""
+    try:
+        loads = await load_service.recommend_loads(
+            mc_number,
+            k=k,
+            explain=explain,
+            origin=origin,
+            destination=destination,
+            equipment_type=equipment_type,
+            min_rate=min_rate,
+            max_rate=max_rate,
+            origin_radius_miles=origin_radius_miles,
+            destination_radius_miles=destination_radius_miles
+        )
+    except InvalidSearch as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(loads)
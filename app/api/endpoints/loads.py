@@ -1,13 +1,18 @@
 # app/api/endpoints/loads.py
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-from app.db.sessions import get_database
-from app.models.loads import Load, CallLog
-from app.core.security import verify_api_key
-from app.services.negotiation import negotiation_service
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.db.sessions import get_database, get_read_database
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.security import verify_api_key, verify_api_key_or_query
+from app.services.dashboard_metrics import dashboard_metrics
+from app.services.load_import import FORMATS, aiter_lines, import_lines
+from app.services.stats_stream import TooManySubscribers, stats_broker, stream
+from app.services import loads as load_service
+from app.services.loads import InvalidSearch, LoadNotFound, LoadNotAvailable
+from app.services.pagination import SORTS, InvalidCursor
 import logging
-from bson import ObjectId
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,37 +24,52 @@ async def search_loads(
     equipment_type: Optional[str] = None,
     min_rate: Optional[float] = None,
     max_rate: Optional[float] = None,
+    origin_radius_miles: Optional[float] = Query(None, gt=0),
+    destination_radius_miles: Optional[float] = Query(None, gt=0),
+    sort: Optional[str] = Query(None, description=f"One of: {', '.join(SORTS)}"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    limit: int = Query(settings.load_search_default_limit, ge=1, le=settings.load_search_max_limit),
     api_key: str = Depends(verify_api_key)
 ):
-    """Search for available loads based on criteria"""
-    db = get_database()
-    
-    # Build query
-    query = {"status": "available"}
-    
-    if origin:
-        query["origin"] = {"$regex": origin, "$options": "i"}
-    if destination:
-        query["destination"] = {"$regex": destination, "$options": "i"}
-    if equipment_type:
-        query["equipment_type"] = {"$regex": equipment_type, "$options": "i"}
-    if min_rate:
-        query["loadboard_rate"] = {"$gte": min_rate}
-    if max_rate:
-        if "loadboard_rate" in query:
-            query["loadboard_rate"]["$lte"] = max_rate
-        else:
-            query["loadboard_rate"] = {"$lte": max_rate}
-    
-    # Execute query
-    loads_cursor = db.loads.find(query).limit(10)
-    loads = []
-    
-    async for load in loads_cursor:
-        load["_id"] = str(load["_id"])
-        loads.append(load)
+    """Search for available loads based on criteria, one page at a time (next page cursor in X-Next-Cursor)"""
+    try:
+        page = await load_service.search_loads(
+            origin=origin,
+            destination=destination,
+            equipment_type=equipment_type,
+            min_rate=min_rate,
+            max_rate=max_rate,
+            origin_radius_miles=origin_radius_miles,
+            destination_radius_miles=destination_radius_miles,
+            sort=sort,
+            cursor=cursor,
+            fields=[field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+            limit=limit
+        )
+    except (InvalidSearch, InvalidCursor) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {"X-Next-Cursor": page["next_cursor"]} if page["next_cursor"] else None
+    return FastJSONResponse(page["loads"], headers=headers)
+
+@router.post("/import")
+async def import_loads(
+    request: Request,
+    format: str = Query("csv", description="csv or jsonl"),
+    batch_size: Optional[int] = Query(None, gt=0, le=10000),
+    dry_run: bool = False,
+    api_key: str = Depends(verify_api_key)
+):
+    """Bulk upsert loads from a CSV or JSONL request body, streamed row by row"""
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format, expected one of: {', '.join(FORMATS)}")
     
-    return loads
+    db = get_database()
+    report = await import_lines(db, aiter_lines(request.stream()), format, batch_size, dry_run)
+    if not dry_run and (report.inserted or report.updated):
+        await dashboard_metrics.reconcile(db)
+    return report.to_dict()
 
 @router.get("/{load_id}")
 async def get_load(
@@ -57,23 +77,10 @@ async def get_load(
     api_key: str = Depends(verify_api_key)
 ):
     """Get specific load details"""
-    db = get_database()
-    
-    # Try to find by load_id field first
-    load = await db.loads.find_one({"load_id": load_id})
-    
-    # If not found, try by MongoDB _id
-    if not load:
-        try:
-            load = await db.loads.find_one({"_id": ObjectId(load_id)})
-        except:
-            raise HTTPException(status_code=404, detail="Load not found")
-    
-    if not load:
+    try:
+        return FastJSONResponse(await load_service.get_load(load_id))
+    except LoadNotFound:
         raise HTTPException(status_code=404, detail="Load not found")
-    
-    load["_id"] = str(load["_id"])
-    return load
 
 @router.post("/{load_id}/book")
 async def book_load(
@@ -83,51 +90,12 @@ async def book_load(
     api_key: str = Depends(verify_api_key)
 ):
     """Book a load for a carrier"""
-    db = get_database()
-    
-    # Find the load
-    load = await db.loads.find_one({"load_id": load_id})
-    if not load:
-        try:
-            load = await db.loads.find_one({"_id": ObjectId(load_id)})
-        except:
-            raise HTTPException(status_code=404, detail="Load not found")
-    
-    if not load:
+    try:
+        return FastJSONResponse(await load_service.book_load(load_id, mc_number, agreed_rate))
+    except LoadNotFound:
         raise HTTPException(status_code=404, detail="Load not found")
-    
-    if load.get("status") != "available":
-        raise HTTPException(status_code=400, detail="Load not available")
-    
-    # Update load status
-    await db.loads.update_one(
-        {"_id": load["_id"]},
-        {
-            "$set": {
-                "status": "booked",
-                "booked_by": mc_number,
-                "agreed_rate": agreed_rate,
-                "booked_at": datetime.utcnow()
-            }
-        }
-    )
-    
-    # Log the booking
-    await db.bookings.insert_one({
-        "load_id": load_id,
-        "mc_number": mc_number,
-        "agreed_rate": agreed_rate,
-        "original_rate": load.get("loadboard_rate"),
-        "booked_at": datetime.utcnow()
-    })
-    
-    return {
-        "success": True,
-        "load_id": load_id,
-        "mc_number": mc_number,
-        "agreed_rate": agreed_rate,
-        "message": "Load booked successfully"
-    }
+    except LoadNotAvailable:
+        raise HTTPException(status_code=409, detail="Load not available")
 
 @router.post("/{load_id}/negotiate")
 async def negotiate_rate(
@@ -135,67 +103,50 @@ async def negotiate_rate(
     offered_rate: float,
     negotiation_round: int = 1,
     mc_number: Optional[str] = None,
+    session_id: Optional[str] = None,
     api_key: str = Depends(verify_api_key)
 ):
     """Handle price negotiation for a load"""
-    db = get_database()
-    
-    # Find the load
-    load = await db.loads.find_one({"load_id": load_id})
-    if not load:
+    try:
+        return FastJSONResponse(
+            await load_service.negotiate_rate(load_id, offered_rate, negotiation_round, mc_number, session_id)
+        )
+    except LoadNotFound:
         raise HTTPException(status_code=404, detail="Load not found")
-    
-    # Convert to Load model for negotiation service
-    load_model = Load(**load)
-    
-    # Evaluate the offer
-    result = negotiation_service.evaluate_offer(
-        load_model, 
-        offered_rate, 
-        negotiation_round
-    )
-    
-    # Log negotiation attempt
-    await db.negotiations.insert_one({
-        "load_id": load_id,
-        "mc_number": mc_number,
-        "offered_rate": offered_rate,
-        "negotiation_round": negotiation_round,
-        "result": result,
-        "timestamp": datetime.utcnow()
-    })
-    
-    return result
 
 @router.get("/stats/summary")
 async def get_load_stats(
+    request: Request,
     api_key: str = Depends(verify_api_key)
 ):
-    """Get summary statistics for loads"""
-    db = get_database()
-    
-    pipeline = [
-        {
-            "$group": {
-                "_id": "$status",
-                "count": {"$sum": 1},
-                "avg_rate": {"$avg": "$loadboard_rate"}
-            }
-        }
-    ]
-    
-    stats = []
-    async for stat in db.loads.aggregate(pipeline):
-        stats.append(stat)
-    
-    total_loads = await db.loads.count_documents({})
-    booked_today = await db.loads.count_documents({
-        "status": "booked",
-        "booked_at": {"$gte": datetime.utcnow().replace(hour=0, minute=0, second=0)}
-    })
-    
-    return {
-        "total_loads": total_loads,
-        "booked_today": booked_today,
-        "status_breakdown": stats
-    }
\ No newline at end of file
+    """Get summary statistics for loads, served from in-memory counters"""
+    if not dashboard_metrics.ready:
+        await dashboard_metrics.reconcile(get_read_database())
+    
+    body, etag = dashboard_metrics.snapshot()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.dashboard_metrics_max_age_seconds}"
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+@router.get("/stats/stream")
+async def stream_load_stats(
+    api_key: str = Depends(verify_api_key_or_query)
+):
+    """Server-sent events: a stats snapshot, then deltas as loads are booked, offers evaluated and calls logged"""
+    if not dashboard_metrics.ready:
+        await dashboard_metrics.reconcile(get_read_database())
+    
+    try:
+        subscriber = stats_broker.subscribe()
+    except TooManySubscribers:
+        raise HTTPException(status_code=503, detail="Too many dashboard connections", headers={"Retry-After": "30"})
+    
+    return StreamingResponse(
+        stream(stats_broker, subscriber, dashboard_metrics.current),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,266 @@
+# app/core/cache.py
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from app.core.config import settings
+from app.core.metrics import cache_requests
+from app.core.responses import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+class TTLCache:
+    """Size-bounded LRU cache with a per-entry time-to-live"""
+
+    def __init__(self, max_size: int = 10000, default_ttl: float = 300.0):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, MISSING)
+        if entry is MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        # Evict least recently used entries once over capacity
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class MemoryCacheBackend:
+    """In-process stand-in for the shared L2 backend, used in tests and single-worker setups"""
+
+    def __init__(self, max_size: int = 100000):
+        self._store = TTLCache(max_size=max_size)
+        self._counters: Dict[str, int] = {}
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        self._store.clear()
+        self._counters.clear()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._store.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._store.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str):
+        self._store.delete(key)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+class RedisCacheBackend:
+    """Shared L2 backend on the configured redis_url"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.client = None
+
+    async def connect(self):
+        # Imported lazily so redis stays optional for memory-only deployments
+        import redis.asyncio as aioredis
+
+        self.client = aioredis.from_url(self.url)
+        await self.client.ping()
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self.client.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, key: str):
+        await self.client.delete(key)
+
+    async def get_counter(self, key: str) -> int:
+        value = await self.client.get(key)
+        return int(value) if value is not None else 0
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+class TwoTierCache:
+    """
+    In-process L1 in front of a shared L2 backend.
+
+    Entries live in namespaces; every namespace carries a generation counter
+    stored in L2 and baked into each key, so invalidating a namespace bumps
+    the counter and every worker stops seeing the old entries at once.
+    """
+
+    def __init__(self, backend=None, l1_max_size: int = 1000, prefix: str = "cache"):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.l1 = TTLCache(max_size=l1_max_size)
+        self.prefix = prefix
+        self._hooks: Dict[str, List[str]] = defaultdict(list)
+
+    async def connect(self):
+        try:
+            await self.backend.connect()
+        except Exception as e:
+            logger.warning(f"Cache backend unavailable, falling back to memory: {e}")
+            self.backend = MemoryCacheBackend()
+
+    async def close(self):
+        await self.backend.close()
+        self.l1.clear()
+
+    async def _generation(self, namespace: str) -> int:
+        return await self.backend.get_counter(f"{self.prefix}:gen:{namespace}")
+
+    async def get(self, namespace: str, key: str) -> Tuple[Any, Optional[str]]:
+        """
+        Return (value, full_key). value is MISSING on a miss; full_key is None
+        when the backend could not be reached and the entry must not be cached.
+        """
+        try:
+            generation = await self._generation(namespace)
+        except Exception as e:
+            logger.warning(f"Cache generation lookup failed for {namespace}: {e}")
+            return MISSING, None
+
+        full_key = f"{self.prefix}:{namespace}:{generation}:{key}"
+
+        value = self.l1.get(full_key, MISSING)
+        if value is not MISSING:
+            cache_requests.inc(namespace, "l1")
+            return value, full_key
+
+        try:
+            raw = await self.backend.get(full_key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {full_key}: {e}")
+            cache_requests.inc(namespace, "miss")
+            return MISSING, full_key
+
+        if raw is None:
+            cache_requests.inc(namespace, "miss")
+            return MISSING, full_key
+
+        cache_requests.inc(namespace, "l2")
+        value = loads(raw)
+        self.l1.set(full_key, value, ttl=settings.cache_l1_ttl_seconds)
+        return value, full_key
+
+    async def set(self, full_key: str, value: Any, ttl: float):
+        self.l1.set(full_key, value, ttl=min(ttl, settings.cache_l1_ttl_seconds))
+        try:
+            await self.backend.set(full_key, dumps(value), ttl)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {full_key}: {e}")
+
+    async def invalidate(self, *namespaces: str):
+        """Drop every entry in the given namespaces across all workers"""
+        for namespace in namespaces:
+            try:
+                await self.backend.incr(f"{self.prefix}:gen:{namespace}")
+            except Exception as e:
+                logger.error(f"Cache invalidation failed for {namespace}: {e}")
+
+    def on(self, event: str, *namespaces: str):
+        """Register namespaces to invalidate when an event fires"""
+        self._hooks[event].extend(namespaces)
+
+    async def fire(self, event: str):
+        """Run the invalidation hooks registered for an event"""
+        namespaces = self._hooks.get(event)
+        if namespaces:
+            await self.invalidate(*namespaces)
+
+def _make_key(bound: inspect.BoundArguments, skip: Iterable[str]) -> str:
+    items = {k: v for k, v in bound.arguments.items() if k not in skip}
+    return hashlib.sha1(dumps(items)).hexdigest()
+
+def cached(namespace: str, ttl: float, skip: Iterable[str] = ("api_key",)):
+    """
+    Cache an async endpoint's result in the two-tier cache.
+
+    The wrapped signature is preserved so FastAPI dependency injection keeps
+    working; arguments named in `skip` are left out of the cache key.
+    Cached values are shared between callers and must be treated as read-only.
+    """
+    skip = tuple(skip)
+
+    def decorator(func: Callable):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = _make_key(bound, skip)
+
+            value, full_key = await cache.get(namespace, key)
+            if value is not MISSING:
+                return value
+
+            value = await func(*args, **kwargs)
+            if full_key is not None:
+                await cache.set(full_key, value, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
+
+def _create_backend():
+    if settings.cache_backend == "redis" and settings.redis_url:
+        return RedisCacheBackend(settings.redis_url)
+    return MemoryCacheBackend()
+
+cache = TwoTierCache(backend=_create_backend(), l1_max_size=settings.cache_l1_max_size)
+
+# Namespaces that must be dropped when a load leaves the board
+LOAD_SEARCH_NAMESPACE = "loads:search"
+LOAD_DETAIL_NAMESPACE = "loads:detail"
+CARRIER_NAMESPACE = "carriers"
+
+cache.on("load_booked", LOAD_SEARCH_NAMESPACE, LOAD_DETAIL_NAMESPACE)
+cache.on("loads_imported", LOAD_SEARCH_NAMESPACE, LOAD_DETAIL_NAMESPACE)
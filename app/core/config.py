@@ -1,6 +1,6 @@
 # app/core/config.py
-from pydantic_settings import BaseSettings
-from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     # API Settings - loaded from environment
@@ -8,22 +8,129 @@ class Settings(BaseSettings):
     
     # MongoDB Atlas - loaded from environment
     mongodb_url: str
-    
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 10          # opened at startup and kept warm
+    mongodb_max_idle_time_ms: int = 300000
+    mongodb_wait_queue_timeout_ms: int = 2000  # fail fast instead of queueing behind a saturated pool
+    mongodb_connect_timeout_ms: int = 5000
+    mongodb_server_selection_timeout_ms: int = 5000
+    mongodb_socket_timeout_ms: int = 20000
+    mongodb_compressors: str = "zstd,snappy,zlib"  # unavailable libraries are skipped
+    # Searches, stats and analytics may read from secondaries; writes and bookings stay on the primary
+    mongodb_read_preference: str = "secondaryPreferred"
+    mongodb_max_staleness_seconds: Optional[int] = None  # at least 90 when set
+    mongodb_ensure_indexes: bool = True
+    mongodb_startup_retry_seconds: float = 5.0
+    mongodb_ready_timeout_ms: int = 1000
+
     # External APIs - loaded from environment
     fmcsa_api_key: str
+    fmcsa_base_url: str = "https://mobile.fmcsa.dot.gov/qc/services"
+    fmcsa_timeout_seconds: float = 5.0
+    fmcsa_max_connections: int = 20
+    
+    # Carrier verification cache
+    carrier_cache_ttl_seconds: int = 3600
+    carrier_negative_cache_ttl_seconds: int = 300
+    carrier_write_through: bool = True
     
     # Redis (optional for caching)
     redis_url: Optional[str] = "redis://localhost:6379"
     
+    # Response cache - "memory" keeps L2 in-process, "redis" shares it across workers
+    cache_backend: str = "memory"
+    cache_l1_max_size: int = 1000
+    cache_l1_ttl_seconds: int = 5
+    load_search_cache_ttl_seconds: int = 15
+    load_detail_cache_ttl_seconds: int = 60
+    
+    # Load search paging
+    load_search_default_limit: int = 10
+    load_search_max_limit: int = 100
+    
+    # In-process index of available loads, kept in sync via change streams (replica sets only)
+    load_index_enabled: bool = False
+    load_index_retry_seconds: float = 5.0  # before reopening a dropped change stream
+    
+    # Write-behind queue for audit inserts (negotiations, call logs, call events)
+    write_behind_max_queue: int = 10000
+    write_behind_batch_size: int = 500
+    write_behind_flush_interval_seconds: float = 1.0
+    write_behind_max_retries: int = 3
+    
+    # Negotiation sessions - per-call offer state; shared uses the cache backend so calls can move between workers
+    negotiation_session_ttl_seconds: int = 1800
+    negotiation_session_max_size: int = 10000
+    negotiation_session_shared: bool = False
+    
+    # Pricing policies - JSON file of per-lane/equipment thresholds (see app/services/pricing.py)
+    pricing_policy_path: Optional[str] = None
+    
+    # Dynamic floor pricing from incrementally aggregated booking stats
+    pricing_model_enabled: bool = False
+    pricing_model_refresh_seconds: float = 300.0
+    pricing_model_settle_seconds: float = 60.0
+    pricing_model_min_samples: int = 20
+    pricing_model_max_adjust: float = 0.05
+    pricing_model_carrier_step: float = 0.01
+    pricing_model_urgent_days: float = 1.0
+    pricing_model_urgent_discount: float = 0.03
+    
+    # Dashboard metrics - in-memory counters reconciled against MongoDB
+    dashboard_metrics_reconcile_seconds: float = 300.0
+    dashboard_metrics_max_age_seconds: int = 10
+    
+    # Dashboard event stream (SSE)
+    stats_stream_max_clients: int = 100
+    stats_stream_max_pending: int = 100
+    stats_stream_heartbeat_seconds: float = 15.0
+    stats_stream_retry_ms: int = 5000
+    
+    # Analytics rollups - hourly/daily buckets folded in by a background job
+    analytics_enabled: bool = True
+    analytics_rollup_interval_seconds: float = 60.0
+    analytics_settle_seconds: float = 30.0
+    analytics_batch_size: int = 5000
+    
+    # Carrier load recommendations
+    recommendations_enabled: bool = True
+    recommendation_refresh_seconds: float = 300.0
+    recommendation_lookback_days: int = 90
+    recommendation_candidates: int = 200
+    recommendation_max_deadhead_miles: float = 250.0
+    
+    # Prometheus metrics at /metrics and Server-Timing headers
+    metrics_enabled: bool = True
+    
+    # Load Import Settings
+    import_batch_size: int = 1000
+    import_max_errors: int = 1000
+    
     # HappyRobot Webhook Settings
     happyrobot_webhook_secret: Optional[str] = None
+    batch_max_steps: int = 20
+    
+    # Webhook idempotency - retried side-effecting actions replay the first response
+    idempotency_enabled: bool = True
+    idempotency_actions: List[str] = ["book_load", "negotiate_rate", "log_call", "batch"]
+    # A caller repeating an offer is a new turn, not a retry; only an Idempotency-Key dedups these
+    idempotency_header_only_actions: List[str] = ["negotiate_rate"]
+    idempotency_ttl_seconds: int = 3600
+    idempotency_max_size: int = 10000
+    idempotency_lock_seconds: float = 30.0  # a pending claim older than this is treated as abandoned
+    idempotency_wait_seconds: float = 5.0   # how long a concurrent retry waits for the first attempt
     
     # Environment
     environment: str = "development"
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+    # Logging - JSON lines through a background queue, sampled per webhook action
+    log_level: str = "INFO"
+    log_json: bool = True
+    log_sample_rate: float = 1.0
+    log_action_sample_rates: Dict[str, float] = {}
+    log_max_field_chars: int = 200
+    log_max_items: int = 10
+    
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False)
 
 settings = Settings()
\ No newline at end of file
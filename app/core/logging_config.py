@@ -0,0 +1,140 @@
+# app/core/logging_config.py
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+import atexit
+import json
+import logging
+import queue
+import random
+from pydantic import BaseModel
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+def truncate(value: Any, max_chars: int, max_items: int, depth: int = 0) -> Any:
+    """Bound the size of a payload before it is serialized into a log line"""
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            return f"{value[:max_chars]}...[{len(value) - max_chars} chars truncated]"
+        return value
+    if depth >= 4:
+        return "..."
+    if isinstance(value, BaseModel):
+        # Walk the fields rather than dumping the whole model first
+        value = dict(value)
+    if isinstance(value, dict):
+        items = list(value.items())
+        result = {str(k): truncate(v, max_chars, max_items, depth + 1) for k, v in items[:max_items]}
+        if len(items) > max_items:
+            result["..."] = f"{len(items) - max_items} keys truncated"
+        return result
+    if isinstance(value, (list, tuple)):
+        result = [truncate(v, max_chars, max_items, depth + 1) for v in value[:max_items]]
+        if len(value) > max_items:
+            result.append(f"...[{len(value) - max_items} items truncated]")
+        return result
+    return value
+
+def _extras(record: logging.LogRecord) -> Dict[str, Any]:
+    return {
+        key: truncate(value, settings.log_max_field_chars, settings.log_max_items)
+        for key, value in record.__dict__.items()
+        if key not in _RESERVED and not key.startswith("_")
+    }
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed via `extra=` become top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        entry.update(_extras(record))
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+class TextFormatter(logging.Formatter):
+    """The original human-readable format, with truncated extras appended"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = _extras(record)
+        if extras:
+            line = f"{line} {json.dumps(extras, default=str)}"
+        return line
+
+class ActionSamplingFilter(logging.Filter):
+    """
+    Drop a share of INFO-and-below records per webhook action.
+
+    Runs on the calling thread before the record is queued, so sampled-out
+    records cost almost nothing. Warnings and errors are always kept.
+    """
+
+    def __init__(self, rates: Dict[str, float], default_rate: float):
+        super().__init__()
+        self.rates = rates
+        self.default_rate = default_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        action = getattr(record, "action", None)
+        if action is None:
+            return True
+        rate = self.rates.get(action, self.default_rate)
+        return rate >= 1.0 or random.random() < rate
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queue the record as-is and leave formatting to the listener thread.
+
+    The stock QueueHandler formats the message on the caller; the record is
+    only shared in-process here, so that work can be deferred.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # Render the traceback now rather than keeping its frames alive in the queue
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def setup_logging():
+    """Route all logging through a non-blocking queue to a single stream handler"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter() if settings.log_json else TextFormatter())
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(ActionSamplingFilter(settings.log_action_sample_rates, settings.log_sample_rate))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(settings.log_level.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
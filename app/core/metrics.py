@@ -0,0 +1,336 @@
+# app/core/metrics.py
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import threading
+import time
+from pymongo import monitoring
+
+# Seconds; request and upstream calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds; individual database round trips
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    """Monotonic counter; updated from the event loop only"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+class Histogram:
+    """
+    Fixed-bucket histogram; observe() is a bisect and two increments.
+    Only histograms fed from other threads pay for a lock.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        threadsafe: bool = False
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock() if threadsafe else None
+
+    def observe(self, value: float, *labels: str):
+        if self._lock is not None:
+            with self._lock:
+                self._record(value, labels)
+        else:
+            self._record(value, labels)
+
+    def _record(self, value: float, labels: Tuple[str, ...]):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            cumulative += counts[-1]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+class Gauge:
+    """Value computed at scrape time by a callback returning {label values: value}"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in sorted(self.collect().items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> bytes:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+))
+webhook_action_duration = registry.register(Histogram(
+    "webhook_action_duration_seconds", "Voice webhook action latency", ("action", "outcome")
+))
+mongo_command_duration = registry.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trip by command and collection",
+    ("command", "collection", "outcome"), FAST_BUCKETS, threadsafe=True
+))
+fmcsa_request_duration = registry.register(Histogram(
+    "fmcsa_request_duration_seconds", "FMCSA API latency", ("outcome",)
+))
+webhook_idempotency = registry.register(Counter(
+    "webhook_idempotency_total", "Side-effecting webhook actions by whether they ran or replayed a stored response",
+    ("action", "result")
+))
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "Two-tier cache lookups by namespace and where they were answered", ("namespace", "result")
+))
+
+def _cache_hit_ratios() -> Dict[Tuple[str, ...], float]:
+    totals: Dict[str, List[float]] = {}
+    for (namespace, result), count in list(cache_requests._values.items()):
+        entry = totals.setdefault(namespace, [0.0, 0.0])
+        entry[1] += count
+        if result != "miss":
+            entry[0] += count
+    return {(namespace,): hits / total for namespace, (hits, total) in totals.items() if total}
+
+registry.register(Gauge("cache_hit_ratio", "Share of cache lookups answered by L1 or L2", ("namespace",), _cache_hit_ratios))
+
+# Per-request stage timings for the Server-Timing header: name -> [seconds, count]
+_timings: ContextVar[Optional[Dict[str, list]]] = ContextVar("server_timings", default=None)
+
+def add_timing(name: str, seconds: float):
+    """Attribute time to a stage of the current request, if one is being timed"""
+    timings = _timings.get()
+    if timings is not None:
+        entry = timings.get(name)
+        if entry is None:
+            timings[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+def _server_timing(timings: Dict[str, list], total: float) -> bytes:
+    parts = [f"app;dur={total * 1000:.1f}"]
+    for name, (seconds, count) in timings.items():
+        parts.append(f'{name};dur={seconds * 1000:.1f};desc="{count}x"')
+    return ", ".join(parts).encode()
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Times every MongoDB command. Motor runs commands on executor threads
+    with the caller's context copied, so time lands on the right request.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple, Tuple[str, str]] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get("collection", "")
+        self._pending[(event.connection_id, event.request_id)] = (event.command_name, collection)
+
+    def _finished(self, event, outcome: str):
+        command, collection = self._pending.pop((event.connection_id, event.request_id), (event.command_name, ""))
+        seconds = event.duration_micros / 1e6
+        mongo_command_duration.observe(seconds, command, collection, outcome)
+        add_timing("mongo", seconds)
+
+    def succeeded(self, event):
+        self._finished(event, "success")
+
+    def failed(self, event):
+        self._finished(event, "failure")
+
+mongo_listener = MongoCommandListener()
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """
+    Open, checked-out and waiting connections per server, kept from the
+    driver's pool events for the readiness check and the pool gauges
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # "host:port" -> {"open", "in_use", "waiting", "checkout_failures"}
+        self._pools: Dict[str, Dict[str, int]] = {}
+
+    def _add(self, address, **deltas: int):
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = {"open": 0, "in_use": 0, "waiting": 0, "checkout_failures": 0}
+            for field, delta in deltas.items():
+                pool[field] += delta
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(pool) for address, pool in self._pools.items()}
+
+    def pool_created(self, event):
+        self._add(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        self._add(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._add(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._add(event.address, waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._add(event.address, waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._add(event.address, in_use=-1)
+
+mongo_pool_listener = MongoPoolListener()
+
+def _pool_connections() -> Dict[Tuple[str, ...], float]:
+    return {
+        (address, state): pool[state]
+        for address, pool in mongo_pool_listener.snapshot().items()
+        for state in ("open", "in_use", "waiting")
+    }
+
+registry.register(Gauge("mongo_pool_connections", "MongoDB pool connections by server and state", ("address", "state"), _pool_connections))
+registry.register(Gauge(
+    "mongo_pool_checkout_failures", "MongoDB connection checkouts that failed or timed out since the pool was created",
+    ("address",), lambda: {(address,): pool["checkout_failures"] for address, pool in mongo_pool_listener.snapshot().items()}
+))
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template and adding
+    a Server-Timing header with the stages attributed to the request
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict[int, str] = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        route = self._routes.get(id(endpoint))
+        if route is None:
+            app = scope.get("app")
+            for candidate in getattr(app, "routes", ()):
+                target = getattr(candidate, "endpoint", None) or getattr(candidate, "app", None)
+                self._routes[id(target)] = candidate.path
+            route = self._routes.setdefault(id(endpoint), "unmatched")
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings: Dict[str, list] = {}
+        token = _timings.set(timings)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(timings, time.perf_counter() - start)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], self._route(scope), str(status))
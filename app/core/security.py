@@ -1,19 +1,16 @@
 # app/core/security.py
 from fastapi import HTTPException, Security, Depends
-from fastapi.security import APIKeyHeader
+from fastapi.security import APIKeyHeader, APIKeyQuery
 from app.core.config import settings
 import hashlib
 import hmac
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+api_key_query = APIKeyQuery(name="api_key", auto_error=False)
 
 async def verify_api_key(api_key: str = Security(api_key_header)):
     """Verify API key for authentication"""
     
-    # Allow internal calls
-    if api_key == "internal":
-        return api_key
-    
     if not api_key:
         raise HTTPException(
             status_code=403, 
@@ -29,6 +26,17 @@ async def verify_api_key(api_key: str = Security(api_key_header)):
     
     return api_key
 
+async def verify_api_key_or_query(
+    header_key: str = Security(api_key_header),
+    query_key: str = Security(api_key_query)
+):
+    """
+    Verify API key from the header or an api_key query parameter. Only for
+    the SSE route: EventSource clients cannot set headers, and a key in a URL
+    ends up in access logs and browser history.
+    """
+    return await verify_api_key(header_key or query_key)
+
 def verify_webhook_signature(payload: bytes, signature: str, secret: str) -> bool:
     """Verify webhook signature from HappyRobot"""
     expected_signature = hmac.new(
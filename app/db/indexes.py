@@ -0,0 +1,116 @@
+# app/db/indexes.py
+from typing import Dict, List
+import logging
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Collection -> indexes the queries in app/services rely on
+INDEXES: Dict[str, List[IndexModel]] = {
+    "loads": [
+        IndexModel("load_id", unique=True),
+        IndexModel("status"),
+        IndexModel("origin"),
+        IndexModel("destination"),
+        IndexModel("equipment_type"),
+        IndexModel("loadboard_rate"),
+        # Search indexes on the normalized fields written by normalize_load
+        IndexModel([
+            ("status", ASCENDING),
+            ("equipment_norm", ASCENDING),
+            ("origin_norm", ASCENDING),
+            ("destination_norm", ASCENDING),
+            ("loadboard_rate", ASCENDING)
+        ], name="load_search"),
+        IndexModel([
+            ("status", ASCENDING),
+            ("origin_state_norm", ASCENDING),
+            ("equipment_norm", ASCENDING),
+            ("loadboard_rate", ASCENDING)
+        ], name="load_search_origin_state"),
+        IndexModel([
+            ("status", ASCENDING),
+            ("destination_state_norm", ASCENDING),
+            ("equipment_norm", ASCENDING),
+            ("loadboard_rate", ASCENDING)
+        ], name="load_search_destination_state"),
+        # Keyset pagination: each search sort plus the _id tie-breaker
+        IndexModel([("status", ASCENDING), ("loadboard_rate", DESCENDING), ("_id", DESCENDING)], name="load_page_rate"),
+        IndexModel([("status", ASCENDING), ("pickup_at", ASCENDING), ("_id", ASCENDING)], name="load_page_pickup"),
+        IndexModel(
+            [("status", ASCENDING), ("rate_per_mile", DESCENDING), ("_id", DESCENDING)],
+            name="load_page_rate_per_mile"
+        ),
+        # Radius search around origin/destination points
+        IndexModel([("origin_point", GEOSPHERE)]),
+        IndexModel([("destination_point", GEOSPHERE)])
+    ],
+    # One bookings row per booking of a load; a re-listed load can be booked again
+    "bookings": [IndexModel([("load_id", ASCENDING), ("booked_at", ASCENDING)], unique=True)],
+    # Pricing model running sums (lane rows and per-load carrier counts)
+    "pricing_stats": [IndexModel("kind")],
+    "carriers": [
+        IndexModel("mc_number", unique=True),
+        IndexModel("dot_number")
+    ],
+    "call_logs": [
+        IndexModel("call_id"),
+        IndexModel("mc_number"),
+        IndexModel("created_at")
+    ],
+    "negotiations": [IndexModel("timestamp")],
+    # Webhook idempotency keys are the _id; entries expire on their own
+    "webhook_idempotency": [IndexModel("expires_at", expireAfterSeconds=0)]
+}
+
+# Analytics rollups - unique bucket key, then dimension + bucket for filtered range queries
+for _rollup in ("analytics_hourly", "analytics_daily"):
+    INDEXES[_rollup] = [
+        IndexModel([("bucket", ASCENDING), ("lane", ASCENDING), ("equipment", ASCENDING), ("mc_number", ASCENDING)], unique=True),
+        IndexModel([("lane", ASCENDING), ("bucket", ASCENDING)]),
+        IndexModel([("equipment", ASCENDING), ("bucket", ASCENDING)]),
+        IndexModel([("mc_number", ASCENDING), ("bucket", ASCENDING)])
+    ]
+
+# Collection -> index names replaced by an entry above; dropped so they stop constraining writes
+OBSOLETE_INDEXES: Dict[str, List[str]] = {
+    # Unique on load_id alone allowed only one booking per load ever
+    "bookings": ["load_id_1"]
+}
+
+async def drop_obsolete_indexes(db):
+    for collection, names in OBSOLETE_INDEXES.items():
+        existing = await db[collection].index_information()
+        for name in names:
+            if name in existing:
+                await db[collection].drop_index(name)
+                logger.info(f"Dropped obsolete index {collection}.{name}")
+
+async def ensure_indexes(db) -> List[str]:
+    """
+    Create any missing index, one round trip per collection; existing ones
+    are left alone, apart from the obsolete ones, which are dropped first.
+    Returns the indexes that could not be created (usually an index of the
+    same name with different options) so the caller can report them.
+    """
+    failed = []
+    try:
+        await drop_obsolete_indexes(db)
+    except OperationFailure as e:
+        logger.error(f"Could not drop obsolete indexes: {e}")
+    for collection, models in INDEXES.items():
+        try:
+            await db[collection].create_indexes(models)
+            continue
+        except OperationFailure as e:
+            logger.warning(f"Batch index creation on {collection} failed, retrying one by one: {e}")
+
+        for model in models:
+            name = model.document["name"]
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                logger.error(f"Could not create index {collection}.{name}: {e}")
+                failed.append(f"{collection}.{name}")
+    return failed
@@ -0,0 +1,62 @@
+# app/db/leases.py
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import os
+import socket
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+# Identifies this worker process as a lease holder
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+async def acquire_lease(collection, lease_id: str, seconds: float, owner: str = OWNER) -> bool:
+    """
+    Take or renew a time-bounded lease stored in `collection` under `lease_id`,
+    so a periodic job runs on one worker at a time
+    """
+    now = datetime.utcnow()
+    try:
+        lease = await collection.find_one_and_update(
+            {"_id": lease_id, "$or": [{"lease_until": {"$lt": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "lease_until": now + timedelta(seconds=seconds)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Someone else holds an unexpired lease
+        return False
+    return lease is not None
+
+def settled_id(settle_seconds: float) -> ObjectId:
+    """
+    Upper _id bound for incremental jobs. Documents newer than the settle
+    window are left for the next run, so a late insert carrying an older
+    _id (clock skew between workers, batched writes) isn't skipped.
+    """
+    return ObjectId.from_datetime(datetime.utcnow() - timedelta(seconds=settle_seconds))
+
+def id_window(since: Optional[ObjectId], upto: ObjectId) -> Dict[str, Any]:
+    """_id range after the last watermark, up to the settled bound"""
+    return {"$gt": since, "$lte": upto} if since else {"$lte": upto}
+
+def window_upsert(query: Dict[str, Any], update: Dict[str, Any], window_id: ObjectId) -> UpdateOne:
+    """
+    Upsert that adds one window of an incremental job to a running total at
+    most once. The document records the last window applied to it; replaying
+    that window matches nothing and the upsert hits the document's unique key,
+    which apply_window() treats as already applied.
+    """
+    update = {**update, "$set": {**update.get("$set", {}), "window": window_id}}
+    return UpdateOne({**query, "window": {"$ne": window_id}}, update, upsert=True)
+
+async def apply_window(collection, updates: List[UpdateOne]):
+    """Run window_upsert()s; duplicate key errors mark documents that already have the window"""
+    if not updates:
+        return
+    try:
+        await collection.bulk_write(updates, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if e.details.get("writeConcernErrors") or any(error["code"] != 11000 for error in errors):
+            raise
@@ -1,20 +1,149 @@
+from importlib.util import find_spec
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
 from app.core.config import settings
+from app.core.metrics import mongo_listener, mongo_pool_listener
+from app.db.indexes import ensure_indexes
+from app.db.write_behind import write_behind
+
+logger = logging.getLogger(__name__)
+
+# Wire compressor -> module the driver needs for it
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
 
 class MongoDB:
     client: AsyncIOMotorClient = None
     database = None
+    # Same database with reads routed by mongodb_read_preference
+    read_database = None
+    warmed = False
+    failed_indexes: list = []
+    last_error: Optional[str] = None
+    warm_up_task: Optional[asyncio.Task] = None
 
 mongodb = MongoDB()
 
+def _compressors() -> Optional[str]:
+    """Configured compressors whose libraries are installed, so the driver doesn't warn on every start"""
+    names = [name.strip() for name in settings.mongodb_compressors.split(",") if name.strip()]
+    available = [name for name in names if name in COMPRESSOR_MODULES and find_spec(COMPRESSOR_MODULES[name])]
+    return ",".join(available) or None
+
+def client_options() -> Dict[str, Any]:
+    options = {
+        "maxPoolSize": settings.mongodb_max_pool_size,
+        "minPoolSize": settings.mongodb_min_pool_size,
+        "maxIdleTimeMS": settings.mongodb_max_idle_time_ms,
+        "waitQueueTimeoutMS": settings.mongodb_wait_queue_timeout_ms,
+        "connectTimeoutMS": settings.mongodb_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongodb_server_selection_timeout_ms,
+        "socketTimeoutMS": settings.mongodb_socket_timeout_ms,
+        "appname": "carrier-loads-api",
+        "event_listeners": [mongo_listener, mongo_pool_listener]
+    }
+    compressors = _compressors()
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+def read_preference():
+    mode = read_pref_mode_from_name(settings.mongodb_read_preference)
+    return make_read_preference(mode, None, settings.mongodb_max_staleness_seconds or -1)
+
+async def _prewarm(connections: int):
+    """Open connections up front with concurrent pings so first requests skip the TCP/TLS handshake"""
+    if connections <= 0:
+        return
+    read_db = mongodb.read_database
+    pings = [mongodb.client.admin.command("ping") for _ in range(connections)]
+    if read_db is not None and read_db.read_preference != mongodb.database.read_preference:
+        # Secondary reads go through their own per-server pools
+        pings += [read_db.command("ping", read_preference=read_db.read_preference) for _ in range(connections)]
+    await asyncio.gather(*pings)
+
+async def warm_up():
+    """Ping, ensure indexes and fill the pool; readiness stays false until this succeeds"""
+    start = time.perf_counter()
+    await mongodb.client.admin.command("ping")
+    if settings.mongodb_ensure_indexes:
+        mongodb.failed_indexes = await ensure_indexes(mongodb.database)
+    await _prewarm(settings.mongodb_min_pool_size)
+    mongodb.warmed = True
+    mongodb.last_error = None
+    logger.info(f"MongoDB warm-up finished in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+async def _retry_warm_up():
+    while True:
+        await asyncio.sleep(settings.mongodb_startup_retry_seconds)
+        try:
+            await warm_up()
+            return
+        except Exception as e:
+            mongodb.last_error = str(e)
+            logger.warning(f"MongoDB warm-up retry failed: {e}")
+
 async def connect_to_mongo():
-    mongodb.client = AsyncIOMotorClient(settings.mongodb_url)
+    mongodb.client = AsyncIOMotorClient(settings.mongodb_url, **client_options())
     mongodb.database = mongodb.client.carrier_loads
+    mongodb.read_database = mongodb.client.get_database("carrier_loads", read_preference=read_preference())
+    write_behind.start(mongodb.database)
+    try:
+        await warm_up()
+    except Exception as e:
+        # Keep serving (readiness reports not ready) and keep trying in the background
+        mongodb.last_error = str(e)
+        logger.error(f"MongoDB warm-up failed, retrying every {settings.mongodb_startup_retry_seconds}s: {e}")
+        mongodb.warm_up_task = asyncio.create_task(_retry_warm_up())
     print("Connected to MongoDB Atlas")
 
 async def close_mongo_connection():
+    if mongodb.warm_up_task is not None:
+        mongodb.warm_up_task.cancel()
+        mongodb.warm_up_task = None
+    mongodb.warmed = False
+    # Drain buffered audit writes before the client goes away
+    await write_behind.stop()
     mongodb.client.close()
     print("Disconnected from MongoDB Atlas")
 
+async def readiness() -> Dict[str, Any]:
+    """
+    Live ping plus warm-up and pool state. Not ready until warm-up has
+    finished, when the ping fails or is slow, or when a pool is exhausted
+    with requests queueing for a connection.
+    """
+    report: Dict[str, Any] = {"warmed": mongodb.warmed}
+    if mongodb.failed_indexes:
+        report["failed_indexes"] = mongodb.failed_indexes
+    try:
+        start = time.perf_counter()
+        await asyncio.wait_for(mongodb.client.admin.command("ping"), settings.mongodb_ready_timeout_ms / 1000)
+        report["ping_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        ping_ok = True
+    except Exception as e:
+        report["error"] = str(e) or type(e).__name__
+        ping_ok = False
+    if not mongodb.warmed and mongodb.last_error:
+        report["warm_up_error"] = mongodb.last_error
+
+    pools = mongo_pool_listener.snapshot()
+    saturated = [
+        address for address, pool in pools.items()
+        if pool["in_use"] >= settings.mongodb_max_pool_size and pool["waiting"] > 0
+    ]
+    report["pools"] = pools
+    if saturated:
+        report["saturated"] = saturated
+    report["ready"] = mongodb.warmed and ping_ok and not saturated
+    return report
+
 def get_database():
-    return mongodb.database
\ No newline at end of file
+    return mongodb.database
+
+def get_read_database():
+    """Database handle for searches, stats and analytics, which tolerate slightly stale reads"""
+    return mongodb.read_database if mongodb.read_database is not None else mongodb.database
@@ -0,0 +1,155 @@
+# app/db/write_behind.py
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import logging
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class WriteBehindQueue:
+    """
+    Buffer audit documents off the request path and write them with
+    insert_many(ordered=False) once a batch fills or the flush interval passes.
+
+    The queue is bounded: when it is full, enqueue waits for the flusher,
+    which applies backpressure instead of growing memory without limit.
+    """
+
+    def __init__(self, max_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._database = None
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "capacity": self.max_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes
+        }
+
+    def start(self, database):
+        self._database = database
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._batch_ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued, then stop the flusher"""
+        if self._task is None:
+            return
+        self._batch_ready.set()
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def enqueue(self, collection: str, document: Dict[str, Any]):
+        """Queue a document for insertion, waiting if the queue is full"""
+        if self._task is None:
+            # Not started (scripts, benchmarks) - write through directly
+            await self._database_for_write()[collection].insert_one(document)
+            return
+
+        await self._queue.put((collection, document))
+        self.enqueued += 1
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if depth >= self.batch_size:
+            self._batch_ready.set()
+
+    def _database_for_write(self):
+        if self._database is None:
+            from app.db.sessions import get_database
+            return get_database()
+        return self._database
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+
+            # Give a partial batch until the flush interval to fill up
+            if item is not _STOP and self._queue.qsize() + 1 < self.batch_size:
+                self._batch_ready.clear()
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch: List[Tuple[str, Dict[str, Any]]] = []
+            stopping = False
+            while True:
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    await self._flush(batch)
+                    batch = []
+                    # When stopping keep draining until the queue is empty
+                    if not stopping:
+                        break
+                if self._queue.empty():
+                    break
+                item = self._queue.get_nowait()
+
+            if batch:
+                await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        by_collection: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for collection, document in batch:
+            by_collection[collection].append(document)
+
+        database = self._database_for_write()
+        self.flushes += 1
+        for collection, documents in by_collection.items():
+            for attempt in range(settings.write_behind_max_retries + 1):
+                try:
+                    result = await database[collection].insert_many(documents, ordered=False)
+                    self.written += len(result.inserted_ids)
+                    break
+                except BulkWriteError as e:
+                    # Individual documents were rejected; the rest are already written.
+                    # Duplicate keys mean a retried batch already landed.
+                    errors = e.details.get("writeErrors", [])
+                    rejected = sum(1 for error in errors if error.get("code") != 11000)
+                    self.written += len(documents) - rejected
+                    self.failed += rejected
+                    if rejected:
+                        logger.error(f"Write-behind rejected {rejected} {collection} documents: {e}")
+                    break
+                except Exception as e:
+                    if attempt == settings.write_behind_max_retries:
+                        self.failed += len(documents)
+                        logger.error(f"Write-behind dropped {len(documents)} {collection} documents: {e}")
+                    else:
+                        await asyncio.sleep(0.5 * (attempt + 1))
+
+write_behind = WriteBehindQueue(
+    max_size=settings.write_behind_max_queue,
+    batch_size=settings.write_behind_batch_size,
+    flush_interval=settings.write_behind_flush_interval_seconds
+)
@@ -1,26 +1,61 @@
 # app/main.py
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import logging
-from app.api.endpoints import carriers, loads, webhooks
-from app.db.sessions import connect_to_mongo, close_mongo_connection
+from app.api.endpoints import analytics, carriers, loads, webhooks
+from app.db.sessions import connect_to_mongo, close_mongo_connection, get_database, get_read_database, readiness
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.core.cache import cache
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from app.core.responses import FastJSONResponse
+from app.db.write_behind import write_behind
+from app.services.carrier_verification import carrier_verification_service
+from app.services.idempotency import idempotency_store
+from app.services.load_index import load_index
+from app.services.pricing_model import pricing_model
+from app.services.dashboard_metrics import dashboard_metrics
+from app.services.analytics import analytics_rollups
+from app.services.recommendations import recommendation_engine
+from app.services.bookings import relay_unrecorded_bookings
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    await cache.connect()
+    await carrier_verification_service.start()
+    try:
+        await relay_unrecorded_bookings(get_database())
+    except Exception as e:
+        logger.error(f"Booking outbox relay failed: {e}")
+    if settings.load_index_enabled:
+        await load_index.start(get_database())
+    if settings.pricing_model_enabled:
+        await pricing_model.start(get_database())
+    await dashboard_metrics.start(get_read_database())
+    if settings.analytics_enabled:
+        await analytics_rollups.start(get_database())
+    if settings.recommendations_enabled:
+        await recommendation_engine.start(get_read_database())
     logger.info("Application startup complete")
     yield
     # Shutdown
+    await recommendation_engine.stop()
+    await analytics_rollups.stop()
+    await dashboard_metrics.stop()
+    await pricing_model.stop()
+    await load_index.stop()
+    await carrier_verification_service.close()
+    await idempotency_store.close()
+    await cache.close()
     await close_mongo_connection()
     logger.info("Application shutdown complete")
 
@@ -29,6 +64,7 @@ app = FastAPI(
     title="Carrier Load Booking API",
     description="API for automated carrier load booking and negotiation",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -41,6 +77,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Mount static files for dashboard
 app.mount("/dashboard", StaticFiles(directory="app/dashboard", html=True), name="dashboard")
 
@@ -48,6 +87,7 @@ app.mount("/dashboard", StaticFiles(directory="app/dashboard", html=True), name=
 app.include_router(carriers.router, prefix="/api/carriers", tags=["carriers"])
 app.include_router(loads.router, prefix="/api/loads", tags=["loads"])
 app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 
 @app.get("/")
 async def root():
@@ -59,4 +99,21 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    """Liveness: the process is up; see /ready for the database"""
+    return {
+        "status": "healthy",
+        "write_behind": write_behind.stats()
+    }
+
+@app.get("/ready")
+async def ready_check():
+    """Readiness: warm-up finished, MongoDB answers a ping and no pool is exhausted"""
+    report = await readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint; counters are per worker process"""
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    return Response(registry.render(), media_type=CONTENT_TYPE)
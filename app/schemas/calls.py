@@ -0,0 +1,35 @@
+# app/schemas/calls.py
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pydantic import Field
+from app.schemas.common import Document
+
+class CallOutcome(str, Enum):
+    BOOKED = "booked"
+    NEGOTIATION_FAILED = "negotiation_failed"
+    NOT_INTERESTED = "not_interested"
+    TRANSFERRED = "transferred"
+    DROPPED = "dropped"
+    VERIFICATION_FAILED = "verification_failed"
+
+class Sentiment(str, Enum):
+    POSITIVE = "positive"
+    NEUTRAL = "neutral"
+    NEGATIVE = "negative"
+
+class CallLog(Document):
+    """A call_logs document as written by the log_call action"""
+    call_id: Optional[str] = Field(None, description="Voice session the call was logged from")
+    mc_number: Optional[str] = None
+    load_id: Optional[str] = None
+    # Free text from the agent; usually a CallOutcome / Sentiment value
+    outcome: Optional[str] = None
+    sentiment: Optional[str] = None
+    initial_offer: Optional[float] = None
+    final_rate: Optional[float] = None
+    negotiation_rounds: int = 0
+    negotiation_history: List[Dict[str, Any]] = Field(default_factory=list)
+    duration: Optional[Any] = Field(None, description="Call duration as reported by the agent")
+    transcript: List[Any] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,22 @@
+# app/schemas/carriers.py
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pydantic import Field
+from app.schemas.common import Document
+
+class Carrier(Document):
+    """A carriers document: the last FMCSA verification plus booking preferences"""
+    mc_number: str
+    legal_name: Optional[str] = None
+    dot_number: Optional[Any] = None
+    entity_type: Optional[str] = None
+    status_code: Optional[str] = None
+    safety_rating: Optional[str] = None
+    is_eligible: bool = False
+    last_verified: datetime = Field(default_factory=datetime.utcnow)
+    total_calls: int = 0
+    successful_bookings: int = 0
+    average_rate: Optional[float] = None
+    preferred_equipment: List[str] = Field(default_factory=list)
+    # {"origin": "Dallas, TX", "destination": "IL"} or origin_state/destination_state
+    preferred_lanes: List[Dict[str, Any]] = Field(default_factory=list)
@@ -0,0 +1,48 @@
+# app/schemas/common.py
+from functools import lru_cache
+from typing import Any
+from bson import ObjectId
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, PlainSerializer, PlainValidator, TypeAdapter, WithJsonSchema
+from typing_extensions import Annotated
+
+def _validate_object_id(value: Any) -> ObjectId:
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    raise ValueError("Invalid ObjectId")
+
+def _object_id_str(value: ObjectId) -> str:
+    return str(value)
+
+# ObjectId in Python, its hex string in JSON output and the OpenAPI schema
+PyObjectId = Annotated[
+    ObjectId,
+    PlainValidator(_validate_object_id),
+    PlainSerializer(_object_id_str, return_type=str, when_used="json"),
+    WithJsonSchema({"type": "string", "example": "65a1f0c2e4b0a1b2c3d4e5f6"})
+]
+
+def _number_to_str(value: Any) -> Any:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return value
+
+# Identifier that voice platforms may send as a JSON number (MC numbers, call IDs)
+IdStr = Annotated[str, BeforeValidator(_number_to_str)]
+
+@lru_cache(maxsize=None)
+def adapter(tp: Any) -> TypeAdapter:
+    """
+    TypeAdapter for a type, built on first use and then reused. Building
+    one compiles a validator, which costs far more than validating with it.
+    """
+    return TypeAdapter(tp)
+
+class Document(BaseModel):
+    """Base for models stored in MongoDB; `id` is the document's `_id`"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PyObjectId = Field(default_factory=ObjectId, alias="_id")
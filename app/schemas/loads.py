@@ -0,0 +1,58 @@
+# app/schemas/loads.py
+from enum import Enum
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from app.schemas.common import Document
+
+class LoadStatus(str, Enum):
+    AVAILABLE = "available"
+    BOOKED = "booked"
+    IN_TRANSIT = "in_transit"
+    DELIVERED = "delivered"
+    CANCELLED = "cancelled"
+
+class LoadCreate(BaseModel):
+    """A load as listed by a shipper or import file; the search fields are derived by normalize_load"""
+    model_config = ConfigDict(
+        use_enum_values=True,
+        json_schema_extra={
+            "example": {
+                "load_id": "LD-2024-001",
+                "origin": "Chicago, IL",
+                "destination": "Atlanta, GA",
+                "pickup_datetime": "2024-01-15T08:00:00Z",
+                "delivery_datetime": "2024-01-16T18:00:00Z",
+                "equipment_type": "Dry Van",
+                "loadboard_rate": 2500.00,
+                "weight": 35000,
+                "commodity_type": "General Freight",
+                "num_of_pieces": 24,
+                "miles": 716,
+                "dimensions": "48x40x48"
+            }
+        }
+    )
+
+    load_id: str = Field(..., description="Unique identifier for the load")
+    origin: str = Field(..., description="Starting location")
+    destination: str = Field(..., description="Delivery location")
+    pickup_datetime: datetime = Field(..., description="Date and time for pickup")
+    delivery_datetime: datetime = Field(..., description="Date and time for delivery")
+    equipment_type: str = Field(..., description="Type of equipment needed")
+    loadboard_rate: float = Field(..., description="Listed rate for the load")
+    notes: Optional[str] = Field(default="", description="Additional information")
+    weight: float = Field(..., description="Load weight in pounds")
+    commodity_type: str = Field(..., description="Type of goods")
+    num_of_pieces: int = Field(..., description="Number of items")
+    miles: float = Field(..., description="Distance to travel")
+    dimensions: str = Field(..., description="Size measurements")
+    status: LoadStatus = Field(LoadStatus.AVAILABLE.value, description="Board status; imports only set it on new loads unless given")
+
+class Load(Document, LoadCreate):
+    """A stored load, including what book_load and the importer write"""
+    booked_by: Optional[str] = None
+    agreed_rate: Optional[float] = None
+    booked_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
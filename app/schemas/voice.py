@@ -0,0 +1,133 @@
+# app/schemas/voice.py
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional, Union
+from datetime import datetime
+from app.schemas.common import IdStr
+
+class ActionParams(BaseModel):
+    """Base for webhook action parameters; unknown keys from the agent are ignored"""
+    model_config = ConfigDict(extra="ignore")
+
+class ActionResponse(BaseModel):
+    success: bool
+    message: Optional[str] = None
+    # A failure a retry cannot change (load already booked, not found), so it may be
+    # replayed like a success; never serialized
+    definitive: bool = Field(False, exclude=True)
+
+class VerifyCarrierParams(ActionParams):
+    mc_number: Optional[IdStr] = None
+
+class VerifyCarrierResponse(ActionResponse):
+    is_eligible: Optional[bool] = None
+    carrier_name: Optional[str] = None
+    safety_rating: Optional[str] = None
+
+class SearchLoadsParams(ActionParams):
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    equipment_type: Optional[str] = None
+    min_rate: Optional[float] = None
+    max_rate: Optional[float] = None
+    origin_radius_miles: Optional[float] = Field(None, gt=0)
+    destination_radius_miles: Optional[float] = Field(None, gt=0)
+    # Verified carrier; with no sort or cursor, results are ranked for them
+    mc_number: Optional[IdStr] = None
+    sort: Optional[str] = None
+    # next_cursor from the previous search, for "any others?"
+    cursor: Optional[str] = None
+    limit: int = Field(3, ge=1, le=10)
+
+class LoadSummary(BaseModel):
+    load_id: str
+    origin: str
+    destination: str
+    rate: float
+    pickup: Union[datetime, str]
+    delivery: Union[datetime, str]
+    miles: float = 0
+    weight: float = 0
+    commodity: str = "General freight"
+    deadhead_miles: Optional[float] = None
+
+    @classmethod
+    def from_load(cls, load: Dict[str, Any]) -> "LoadSummary":
+        """Spoken summary of a load document"""
+        return cls(
+            load_id=load["load_id"],
+            origin=load["origin"],
+            destination=load["destination"],
+            rate=load["loadboard_rate"],
+            pickup=load["pickup_datetime"],
+            delivery=load["delivery_datetime"],
+            miles=load.get("miles") or 0,
+            weight=load.get("weight") or 0,
+            commodity=load.get("commodity_type") or "General freight",
+            deadhead_miles=load.get("deadhead_miles")
+        )
+
+class SearchLoadsResponse(ActionResponse):
+    loads: List[LoadSummary] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+class NegotiateRateParams(ActionParams):
+    load_id: IdStr
+    offered_rate: float
+    # Only used without a session_id; otherwise the server tracks rounds
+    negotiation_round: int = 1
+    mc_number: Optional[IdStr] = None
+
+class NegotiateRateResponse(ActionResponse):
+    action: Optional[str] = None
+    counter_rate: Optional[float] = None
+    accepted: bool = False
+
+class BookLoadParams(ActionParams):
+    load_id: IdStr
+    mc_number: IdStr
+    agreed_rate: float
+
+class BookingDetails(BaseModel):
+    load_id: str
+    mc_number: str
+    agreed_rate: float
+
+class BookLoadResponse(ActionResponse):
+    booking_details: Optional[BookingDetails] = None
+
+class LogCallParams(ActionParams):
+    mc_number: Optional[IdStr] = None
+    load_id: Optional[IdStr] = None
+    outcome: Optional[str] = None
+    sentiment: Optional[str] = None
+    final_rate: Optional[float] = None
+    negotiation_rounds: int = 0
+    duration: Optional[Any] = None
+    transcript: List[Any] = Field(default_factory=list)
+
+class LogCallResponse(ActionResponse):
+    pass
+
+class BatchStep(BaseModel):
+    """
+    One action inside a batch. Parameter values may be {"$ref": "<step id>.<path>"}
+    to use an earlier step's result, e.g. {"$ref": "search.loads.0.load_id"}.
+    """
+    id: Optional[str] = None
+    action: str
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+    depends_on: List[str] = Field(default_factory=list)
+
+class BatchParams(ActionParams):
+    steps: List[BatchStep] = Field(..., min_length=1)
+    # Steps run in list order; with this set, consecutive read-only steps
+    # (verify_carrier, search_loads) may run at the same time
+    concurrent: bool = False
+
+class BatchStepResult(BaseModel):
+    id: str
+    action: str
+    result: Dict[str, Any]
+
+class BatchResponse(ActionResponse):
+    results: List[BatchStepResult] = Field(default_factory=list)
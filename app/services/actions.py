@@ -0,0 +1,119 @@
+# app/services/actions.py
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Type, Union
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, create_model
+from typing_extensions import Annotated
+from app.core.metrics import add_timing, webhook_action_duration
+from app.core.responses import loads, orjson
+from app.schemas.common import IdStr
+import time
+
+class UnknownAction(Exception):
+    """The webhook named an action that isn't registered"""
+
+    def __init__(self, action: Optional[str]):
+        super().__init__(f"Unknown action: {action}")
+        self.action = action
+
+class InvalidParameters(Exception):
+    """The parameters did not validate against the action's schema"""
+
+    def __init__(self, action: str, errors: List[Dict[str, Any]]):
+        super().__init__(f"Invalid parameters for {action}")
+        self.action = action
+        self.errors = errors
+
+class Action:
+    __slots__ = ("name", "params_model", "response_model", "handler", "request_model")
+
+    def __init__(self, name: str, params_model: Type[BaseModel], response_model: Type[BaseModel], handler: Callable):
+        self.name = name
+        self.params_model = params_model
+        self.response_model = response_model
+        self.handler = handler
+        # Envelope for this action: {"action": name, "session_id": ..., "parameters": {...}}
+        self.request_model = create_model(
+            f"{params_model.__name__}Request",
+            action=(Literal[name], ...),
+            session_id=(Optional[IdStr], None),
+            parameters=(params_model, Field(default_factory=dict, validate_default=True))
+        )
+
+class ActionRegistry:
+    """
+    Dispatch table for webhook actions.
+
+    Every action declares its parameter and response models; the request
+    envelopes form one discriminated union on "action", so a body is
+    validated into the right typed request in a single pydantic-core pass.
+    """
+
+    def __init__(self):
+        self._actions: Dict[str, Action] = {}
+        self._adapter: Optional[TypeAdapter] = None
+
+    def register(self, name: str, params_model: Type[BaseModel], response_model: Type[BaseModel]):
+        def decorator(handler: Callable[..., Awaitable[BaseModel]]):
+            self._actions[name] = Action(name, params_model, response_model, handler)
+            self._adapter = None
+            return handler
+        return decorator
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._actions
+
+    def get(self, name: str) -> Action:
+        try:
+            return self._actions[name]
+        except KeyError:
+            raise UnknownAction(name)
+
+    @property
+    def adapter(self) -> TypeAdapter:
+        if self._adapter is None:
+            models = tuple(action.request_model for action in self._actions.values())
+            union = models[0] if len(models) == 1 else Union[models]
+            self._adapter = TypeAdapter(Annotated[union, Field(discriminator="action")])
+        return self._adapter
+
+    def _raise_for(self, e: ValidationError):
+        first = e.errors(include_url=False)[0]
+        if first["type"] in ("union_tag_invalid", "union_tag_not_found"):
+            raise UnknownAction((first.get("ctx") or {}).get("tag"))
+        if first["loc"] and first["loc"][0] in self._actions:
+            # Context can hold exception objects, which aren't JSON serializable
+            raise InvalidParameters(first["loc"][0], e.errors(include_url=False, include_context=False))
+        raise e
+
+    def parse(self, body: Union[bytes, str]) -> BaseModel:
+        """Validate a raw webhook body into the request model of its action"""
+        if orjson is not None:
+            # Cheaper than validate_json, which on pydantic 2.4 builds its own
+            # JSON tree first: 4x on a log_call with a transcript, 1.3x on small bodies
+            return self.parse_python(loads(body))
+        try:
+            return self.adapter.validate_json(body)
+        except ValidationError as e:
+            self._raise_for(e)
+
+    def parse_python(self, payload: Dict[str, Any]) -> BaseModel:
+        """Same as parse() for an already-decoded payload"""
+        try:
+            return self.adapter.validate_python(payload)
+        except ValidationError as e:
+            self._raise_for(e)
+
+    async def execute(self, request: BaseModel) -> BaseModel:
+        action = self._actions[request.action]
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await action.handler(request.session_id, request.parameters)
+            outcome = "success" if getattr(response, "success", True) else "failure"
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            webhook_action_duration.observe(elapsed, request.action, outcome)
+            add_timing(f"action-{request.action}", elapsed)
+
+    async def dispatch(self, body: Union[bytes, str]) -> BaseModel:
+        return await self.execute(self.parse(body))
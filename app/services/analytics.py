@@ -0,0 +1,253 @@
+# app/services/analytics.py
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.db.leases import acquire_lease, apply_window, id_window, settled_id, window_upsert
+from app.schemas.calls import CallOutcome
+from app.services.normalization import normalize_equipment, normalize_mc
+from app.services.pricing import lane_key
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {"hour": "analytics_hourly", "day": "analytics_daily"}
+DIMENSIONS = ("lane", "equipment", "mc_number")
+METRICS = ("calls", "bookings", "revenue", "listed_revenue", "negotiations", "accepted_offers", "negotiation_rounds")
+META_ID = "_analytics"
+
+SOURCES = ("call_logs", "bookings", "negotiations")
+
+# Outcomes become field names in the rollup, so only known values are kept as-is
+OUTCOMES = frozenset(outcome.value for outcome in CallOutcome)
+
+def outcome_field(value: Any) -> str:
+    """Rollup field for a call's free-text outcome: a CallOutcome value, "other" or "unknown" """
+    if value is None or not str(value).strip():
+        return "unknown"
+    value = str(value).strip().lower()
+    return value if value in OUTCOMES else "other"
+
+def truncate(value: datetime, granularity: str) -> datetime:
+    value = value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if granularity == "day" else value
+
+class _Rollup:
+    """Metric deltas for one window, keyed by (bucket, lane, equipment, mc_number)"""
+
+    def __init__(self):
+        self.rows: Dict[Tuple, Dict[str, float]] = defaultdict(lambda: defaultdict(int))
+
+    def add(self, at: Optional[datetime], dims: Tuple, **metrics: float):
+        if at is None:
+            return
+        for granularity in GRANULARITIES:
+            row = self.rows[(granularity, truncate(at, granularity)) + dims]
+            for name, value in metrics.items():
+                row[name] += value
+
+    def updates(self, window_id: ObjectId) -> Dict[str, List[UpdateOne]]:
+        updates: Dict[str, List[UpdateOne]] = defaultdict(list)
+        for (granularity, bucket, *dims), metrics in self.rows.items():
+            updates[GRANULARITIES[granularity]].append(window_upsert(
+                {"bucket": bucket, **dict(zip(DIMENSIONS, dims))},
+                {"$inc": dict(metrics)},
+                window_id
+            ))
+        return updates
+
+class AnalyticsRollups:
+    """
+    Hourly and daily rollups of call_logs, bookings and negotiations.
+
+    A background job folds documents written since the last _id watermark
+    into per-bucket counters ($inc upserts keyed by bucket, lane, equipment
+    and carrier), so analytics queries read a few small documents per bucket
+    instead of scanning the raw collections. As in the pricing model, a
+    window is recorded before it is applied and replayed with the same
+    bounds if the run dies, and each bucket takes a window only once.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db):
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db):
+        while True:
+            try:
+                if await acquire_lease(db.analytics_meta, META_ID, settings.analytics_rollup_interval_seconds * 2):
+                    await self.roll_up(db)
+            except Exception as e:
+                logger.error(f"Analytics rollup failed: {e}")
+            await asyncio.sleep(settings.analytics_rollup_interval_seconds)
+
+    async def _load_dimensions(self, db, load_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        load_ids = [load_id for load_id in set(load_ids) if load_id]
+        if not load_ids:
+            return {}
+        cursor = db.loads.find(
+            {"load_id": {"$in": load_ids}},
+            {"load_id": 1, "loadboard_rate": 1, "origin_state_norm": 1, "destination_state_norm": 1, "equipment_norm": 1}
+        )
+        return {load["load_id"]: load async for load in cursor}
+
+    async def roll_up(self, db) -> int:
+        """Fold one window of new source documents into the rollups; returns documents processed"""
+        meta = await db.analytics_meta.find_one({"_id": META_ID}) or {}
+        watermarks = meta.get("watermarks", {})
+        pending = meta.get("pending")
+
+        docs = {}
+        if pending is None:
+            upto = settled_id(settings.analytics_settle_seconds)
+            for collection in SOURCES:
+                docs[collection] = await db[collection].find(
+                    {"_id": id_window(watermarks.get(collection), upto)}
+                ).sort("_id", 1).limit(settings.analytics_batch_size).to_list(length=None)
+            # A full batch means there is more to catch up on; the window ends at its last _id
+            pending = {
+                "id": ObjectId(),
+                "ends": {
+                    collection: batch[-1]["_id"] if len(batch) >= settings.analytics_batch_size else upto
+                    for collection, batch in docs.items()
+                }
+            }
+            await db.analytics_meta.update_one({"_id": META_ID}, {"$set": {"pending": pending}}, upsert=True)
+        else:
+            # Replay the window an interrupted run recorded
+            for collection in SOURCES:
+                docs[collection] = await db[collection].find(
+                    {"_id": id_window(watermarks.get(collection), pending["ends"][collection])}
+                ).sort("_id", 1).to_list(length=None)
+
+        load_ids = [doc.get("load_id") for batch in docs.values() for doc in batch]
+        loads = await self._load_dimensions(db, load_ids)
+
+        def dimensions(doc: Dict[str, Any]) -> Tuple:
+            load = loads.get(doc.get("load_id"), {})
+            lane = doc.get("lane")
+            if lane is None and load:
+                lane = lane_key(load.get("origin_state_norm"), load.get("destination_state_norm"))
+            return (lane, doc.get("equipment") or load.get("equipment_norm"), normalize_mc(doc.get("mc_number")))
+
+        rollup = _Rollup()
+        for doc in docs["call_logs"]:
+            rollup.add(
+                doc.get("created_at"), dimensions(doc),
+                calls=1, negotiation_rounds=doc.get("negotiation_rounds") or 0,
+                **{f"outcomes.{outcome_field(doc.get('outcome'))}": 1}
+            )
+        for doc in docs["bookings"]:
+            listed = doc.get("original_rate") or loads.get(doc.get("load_id"), {}).get("loadboard_rate") or 0
+            rollup.add(
+                doc.get("booked_at"), dimensions(doc),
+                bookings=1, revenue=doc.get("agreed_rate") or 0, listed_revenue=listed
+            )
+        for doc in docs["negotiations"]:
+            accepted = bool((doc.get("result") or {}).get("accepted"))
+            rollup.add(doc.get("timestamp"), dimensions(doc), negotiations=1, accepted_offers=int(accepted))
+
+        for collection, updates in rollup.updates(pending["id"]).items():
+            await apply_window(db[collection], updates)
+
+        await db.analytics_meta.update_one(
+            {"_id": META_ID},
+            {
+                "$set": {
+                    **{f"watermarks.{collection}": end for collection, end in pending["ends"].items()},
+                    "rolled_up_at": datetime.utcnow()
+                },
+                "$unset": {"pending": ""}
+            },
+            upsert=True
+        )
+        return sum(len(batch) for batch in docs.values())
+
+def _match(start: datetime, end: datetime, lane: Optional[str], equipment: Optional[str], mc_number: Optional[str]) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"bucket": {"$gte": start, "$lt": end}}
+    if lane:
+        query["lane"] = lane.lower()
+    if equipment:
+        query["equipment"] = normalize_equipment(equipment)
+    if mc_number:
+        query["mc_number"] = normalize_mc(mc_number)
+    return query
+
+def _finish(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Derived metrics for a summed row"""
+    for name in METRICS:
+        row.setdefault(name, 0)
+    row["margin"] = round(row["listed_revenue"] - row["revenue"], 2)
+    row["margin_pct"] = round(row["margin"] / row["listed_revenue"] * 100, 2) if row["listed_revenue"] else None
+    row["conversion_rate"] = round(row["outcomes"].get("booked", 0) / row["calls"], 4) if row["calls"] else None
+    row["avg_negotiation_rounds"] = round(row["negotiation_rounds"] / row["calls"], 2) if row["calls"] else None
+    return row
+
+def _add(target: Dict[str, Any], doc: Dict[str, Any]):
+    for name in METRICS:
+        target[name] = target.get(name, 0) + (doc.get(name) or 0)
+    outcomes = target.setdefault("outcomes", {})
+    for outcome, count in (doc.get("outcomes") or {}).items():
+        outcomes[outcome] = outcomes.get(outcome, 0) + count
+
+async def timeseries(
+    db,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    lane: Optional[str] = None,
+    equipment: Optional[str] = None,
+    mc_number: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Metrics per hour/day bucket over [start, end), summed across the unfiltered dimensions"""
+    projection = {"_id": 0, "bucket": 1, "outcomes": 1, **{name: 1 for name in METRICS}}
+    series: Dict[datetime, Dict[str, Any]] = {}
+    async for doc in db[GRANULARITIES[granularity]].find(_match(start, end, lane, equipment, mc_number), projection):
+        _add(series.setdefault(doc["bucket"], {"bucket": doc["bucket"]}), doc)
+    return [_finish(series[bucket]) for bucket in sorted(series)]
+
+async def breakdown(
+    db,
+    by: str,
+    start: datetime,
+    end: datetime,
+    lane: Optional[str] = None,
+    equipment: Optional[str] = None,
+    mc_number: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Totals over [start, end) grouped by lane, equipment or carrier, largest revenue first"""
+    # Whole days come from the daily rollup; it has far fewer documents per range
+    granularity = "day" if start == truncate(start, "day") and end == truncate(end, "day") else "hour"
+    projection = {"_id": 0, by: 1, "outcomes": 1, **{name: 1 for name in METRICS}}
+    groups: Dict[Any, Dict[str, Any]] = {}
+    async for doc in db[GRANULARITIES[granularity]].find(_match(start, end, lane, equipment, mc_number), projection):
+        _add(groups.setdefault(doc.get(by), {by: doc.get(by)}), doc)
+    rows = [_finish(row) for row in groups.values()]
+    return sorted(rows, key=lambda row: (-row["revenue"], -row["calls"]))
+
+def _naive_utc(value: datetime) -> datetime:
+    """Buckets are naive UTC; convert offset-aware query bounds rather than dropping the offset"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def default_range(start: Optional[datetime], end: Optional[datetime], granularity: str) -> Tuple[datetime, datetime]:
+    end = _naive_utc(end) if end else truncate(datetime.utcnow(), granularity) + (timedelta(days=1) if granularity == "day" else timedelta(hours=1))
+    start = _naive_utc(start) if start else end - timedelta(days=7)
+    return start, end
+
+analytics_rollups = AnalyticsRollups()
@@ -0,0 +1,150 @@
+# app/services/batch.py
+from typing import Any, Dict, List, Optional, Set
+import asyncio
+import logging
+from app.core.config import settings
+from app.schemas.voice import BatchParams, BatchResponse, BatchStep, BatchStepResult
+from app.services.actions import ActionRegistry, InvalidParameters, UnknownAction
+
+logger = logging.getLogger(__name__)
+
+BATCH_ACTION = "batch"
+
+# Actions that may overlap each other in a concurrent batch; everything else
+# changes load, booking or negotiation state and runs strictly in list order
+READ_ONLY_ACTIONS = frozenset({"verify_carrier", "search_loads"})
+
+class BatchError(Exception):
+    """A step could not run (bad reference, failed dependency, invalid batch)"""
+
+def _lookup(results: Dict[str, Dict[str, Any]], ref: str) -> Any:
+    step_id, _, path = ref.partition(".")
+    if step_id not in results:
+        raise BatchError(f"Unknown step in reference: {ref}")
+
+    value: Any = results[step_id]
+    for part in path.split(".") if path else ():
+        if isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        elif isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            raise BatchError(f"Unresolved reference: {ref}")
+    return value
+
+def _references(value: Any) -> List[str]:
+    """Step ids referenced anywhere inside a parameter value"""
+    if isinstance(value, dict):
+        if set(value) == {"$ref"}:
+            return [str(value["$ref"]).partition(".")[0]]
+        return [ref for v in value.values() for ref in _references(v)]
+    if isinstance(value, list):
+        return [ref for v in value for ref in _references(v)]
+    return []
+
+def _resolve(value: Any, results: Dict[str, Dict[str, Any]]) -> Any:
+    if isinstance(value, dict):
+        if set(value) == {"$ref"}:
+            return _lookup(results, str(value["$ref"]))
+        return {k: _resolve(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, results) for v in value]
+    return value
+
+def _plan(steps: List[BatchStep]) -> List[List[str]]:
+    """Assign ids and compute each step's dependencies; only earlier steps may be referenced"""
+    seen = set()
+    dependencies = []
+    for index, step in enumerate(steps):
+        if step.id is None:
+            step.id = str(index)
+        if step.id in seen:
+            raise BatchError(f"Duplicate step id: {step.id}")
+        if step.action == BATCH_ACTION:
+            raise BatchError("Batches cannot be nested")
+
+        deps = list(dict.fromkeys(step.depends_on + _references(step.parameters)))
+        for dep in deps:
+            if dep not in seen:
+                raise BatchError(f"Step {step.id} depends on {dep}, which is not an earlier step")
+        dependencies.append(deps)
+        seen.add(step.id)
+    return dependencies
+
+async def run_batch(registry: ActionRegistry, session_id: Optional[str], params: BatchParams) -> BatchResponse:
+    """
+    Run the steps of a batch in list order. A step whose dependencies
+    (explicit or through a $ref) did not succeed is skipped. With
+    `concurrent`, consecutive read-only steps start together; a step with
+    side effects still waits for every earlier step, and later steps wait
+    for it.
+    """
+    if len(params.steps) > settings.batch_max_steps:
+        return BatchResponse(success=False, message=f"A batch can contain at most {settings.batch_max_steps} steps")
+
+    try:
+        dependencies = _plan(params.steps)
+    except BatchError as e:
+        return BatchResponse(success=False, message=str(e))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+    transient: Set[str] = set()  # steps that failed in a way a retry might not
+
+    async def run_step(step: BatchStep, deps: List[str], after: List[str]) -> Dict[str, Any]:
+        waits = list(dict.fromkeys(after + deps))
+        if waits:
+            await asyncio.gather(*(tasks[step_id] for step_id in waits))
+        failed = [dep for dep in deps if not results[dep].get("success", False)]
+        if failed:
+            if transient.intersection(failed):
+                transient.add(step.id)
+            return {"success": False, "message": f"Skipped because step {failed[0]} did not succeed"}
+
+        try:
+            request = registry.parse_python({
+                "action": step.action,
+                "session_id": session_id,
+                "parameters": _resolve(step.parameters, results)
+            })
+            response = await registry.execute(request)
+            if not (response.success or response.definitive):
+                transient.add(step.id)
+            return response.model_dump(mode="json", exclude_none=True)
+        except (BatchError, UnknownAction) as e:
+            return {"success": False, "message": str(e)}
+        except InvalidParameters as e:
+            return {"success": False, "message": str(e), "errors": e.errors}
+
+    async def record(step: BatchStep, deps: List[str], after: List[str]):
+        results[step.id] = await run_step(step, deps, after)
+
+    barrier: List[str] = []  # the last step with side effects
+    reads: List[str] = []    # read-only steps started since it
+    for step, deps in zip(params.steps, dependencies):
+        if params.concurrent and step.action in READ_ONLY_ACTIONS:
+            after = barrier
+            reads.append(step.id)
+        else:
+            after = barrier + reads
+            barrier, reads = [step.id], []
+        tasks[step.id] = asyncio.create_task(record(step, deps, after))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except Exception:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+    step_results = [
+        BatchStepResult(id=step.id, action=step.action, result=results[step.id])
+        for step in params.steps
+    ]
+    succeeded = sum(1 for r in step_results if r.result.get("success", False))
+    return BatchResponse(
+        success=succeeded == len(step_results),
+        message=f"{succeeded} of {len(step_results)} steps succeeded",
+        results=step_results,
+        definitive=not transient
+    )
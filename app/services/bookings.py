@@ -0,0 +1,71 @@
+# app/services/bookings.py
+from typing import Dict, Any
+from bson import ObjectId
+import logging
+
+logger = logging.getLogger(__name__)
+
+def load_filter(load_id: str) -> Dict[str, Any]:
+    """Match a load by its load_id or, when it parses as one, its ObjectId"""
+    if ObjectId.is_valid(load_id):
+        return {"$or": [{"load_id": load_id}, {"_id": ObjectId(load_id)}]}
+    return {"load_id": load_id}
+
+def booking_record(load: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the bookings row for a booked load document"""
+    return {
+        "load_id": load.get("load_id") or str(load["_id"]),
+        "mc_number": load["booked_by"],
+        "agreed_rate": load["agreed_rate"],
+        "original_rate": load.get("loadboard_rate"),
+        "booked_at": load["booked_at"]
+    }
+
+async def record_booking(db, load: Dict[str, Any]):
+    """
+    Write the bookings row for a booked load.
+
+    The load's conditional status update is the commit point and the booked
+    load itself acts as the outbox entry, so this is an idempotent upsert
+    that can be replayed by relay_unrecorded_bookings. It is keyed on
+    load_id and booked_at, so a load that is re-listed and booked again gets
+    a row per booking.
+    """
+    booking = booking_record(load)
+    await db.bookings.update_one(
+        {"load_id": booking["load_id"], "booked_at": booking["booked_at"]},
+        {"$setOnInsert": booking},
+        upsert=True
+    )
+
+async def relay_unrecorded_bookings(db) -> int:
+    """Write bookings rows for booked loads whose bookings write never landed"""
+    pipeline = [
+        {"$match": {"status": "booked", "booked_by": {"$exists": True}}},
+        {"$lookup": {
+            "from": "bookings",
+            "localField": "load_id",
+            "foreignField": "load_id",
+            "as": "recorded"
+        }},
+        # Earlier bookings of a re-listed load don't count for the current one
+        {"$addFields": {"recorded": {"$filter": {
+            "input": "$recorded",
+            "as": "booking",
+            "cond": {"$eq": ["$$booking.booked_at", "$booked_at"]}
+        }}}},
+        {"$match": {"recorded": {"$size": 0}}},
+        {"$project": {"recorded": 0}}
+    ]
+
+    relayed = 0
+    async for load in db.loads.aggregate(pipeline):
+        try:
+            await record_booking(db, load)
+            relayed += 1
+        except Exception as e:
+            logger.error(f"Failed to relay booking for load {load.get('load_id')}: {e}")
+
+    if relayed:
+        logger.info(f"Relayed {relayed} unrecorded bookings")
+    return relayed
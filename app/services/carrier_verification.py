@@ -0,0 +1,166 @@
+# app/services/carrier_verification.py
+from typing import Dict, Any, Optional, Set
+from datetime import datetime
+import asyncio
+import logging
+import time
+import httpx
+from app.core.cache import cache, CARRIER_NAMESPACE, MISSING
+from app.core.config import settings
+from app.core.metrics import add_timing, fmcsa_request_duration
+from app.db.sessions import get_database
+from app.services.normalization import normalize_mc
+
+logger = logging.getLogger(__name__)
+
+class CarrierVerificationService:
+    """
+    Verify carriers against FMCSA with a pooled HTTP client,
+    the shared two-tier cache and request coalescing per MC number
+    """
+
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    async def start(self):
+        """Open the app-lifetime HTTP connection pool"""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=settings.fmcsa_base_url,
+                timeout=settings.fmcsa_timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=settings.fmcsa_max_connections,
+                    max_keepalive_connections=settings.fmcsa_max_connections
+                )
+            )
+
+    async def close(self):
+        """Close the HTTP pool and wait for pending write-throughs"""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    @staticmethod
+    def normalize_mc(mc_number: str) -> str:
+        """Bare MC digits, so cache keys are stable"""
+        return normalize_mc(mc_number) or ""
+
+    async def verify(self, mc_number: str) -> Dict[str, Any]:
+        """Return the verification result for an MC number"""
+        key = self.normalize_mc(mc_number)
+
+        cached, full_key = await cache.get(CARRIER_NAMESPACE, key)
+        if cached is not MISSING:
+            return {**cached, "mc_number": mc_number}
+
+        # Coalesce concurrent lookups for the same MC onto one upstream call. It runs
+        # as its own task, so a caller that is cancelled doesn't take the others down
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, full_key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fetched(key, done))
+        result = await asyncio.shield(task)
+
+        return {**result, "mc_number": mc_number}
+
+    def _fetched(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark retrieved so a lookup whose callers all went away doesn't log "never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, key: str, full_key: Optional[str]) -> Dict[str, Any]:
+        """Query FMCSA and populate the cache; upstream errors are not cached"""
+        if self.client is None:
+            await self.start()
+
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self.client.get(
+                f"/carriers/{key}",
+                params={"webKey": settings.fmcsa_api_key}
+            )
+            outcome = str(response.status_code)
+        finally:
+            elapsed = time.perf_counter() - start
+            fmcsa_request_duration.observe(elapsed, outcome)
+            add_timing("fmcsa", elapsed)
+
+        carrier = None
+        if response.status_code == 200:
+            carrier = (response.json().get("content") or {}).get("carrier")
+        elif response.status_code != 404:
+            response.raise_for_status()
+
+        if not carrier:
+            result = {"mc_number": key, "is_eligible": False, "error": "Not found"}
+            if full_key is not None:
+                await cache.set(full_key, result, settings.carrier_negative_cache_ttl_seconds)
+            return result
+
+        result = {
+            "mc_number": key,
+            "is_eligible": (
+                carrier.get("entityType") == "CARRIER" and
+                carrier.get("statusCode") == "ACTIVE"
+            ),
+            "carrier_name": carrier.get("legalName", "Unknown"),
+            "safety_rating": carrier.get("safetyRating", "Not Rated")
+        }
+
+        # Ineligible carriers may get reinstated, so re-check them sooner
+        ttl = (
+            settings.carrier_cache_ttl_seconds if result["is_eligible"]
+            else settings.carrier_negative_cache_ttl_seconds
+        )
+        if full_key is not None:
+            await cache.set(full_key, result, ttl)
+
+        if settings.carrier_write_through:
+            self._schedule(self._write_through(key, carrier, result))
+
+        return result
+
+    def _schedule(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _write_through(self, key: str, carrier: Dict[str, Any], result: Dict[str, Any]):
+        """
+        Persist the verification onto the carriers collection off the request
+        path. Stored MC numbers may carry the prefix (the seed data writes
+        "MC100000"), so match either form and insert new carriers in that one.
+        """
+        db = get_database()
+        if db is None:
+            return
+
+        try:
+            await db.carriers.update_one(
+                {"mc_number": {"$in": [key, f"MC{key}"]}},
+                {
+                    "$setOnInsert": {"mc_number": f"MC{key}"},
+                    "$set": {
+                        "legal_name": result["carrier_name"],
+                        "dot_number": carrier.get("dotNumber"),
+                        "entity_type": carrier.get("entityType"),
+                        "status_code": carrier.get("statusCode"),
+                        "safety_rating": result["safety_rating"],
+                        "is_eligible": result["is_eligible"],
+                        "last_verified": datetime.utcnow()
+                    }
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Carrier write-through failed for MC {key}: {e}")
+
+carrier_verification_service = CarrierVerificationService()
@@ -0,0 +1,218 @@
+# app/services/dashboard_metrics.py
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+from app.core.config import settings
+from app.services.stats_stream import stats_broker
+
+logger = logging.getLogger(__name__)
+
+def _midnight(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class DashboardMetrics:
+    """
+    Dashboard counters kept in memory.
+
+    Booking and call-log events update the counters as they happen; a
+    periodic reconciliation recomputes them from MongoDB to pick up writes
+    made by other workers or outside the API. Readers get a pre-serialized
+    snapshot with a content hash for ETag, so serving the dashboard never
+    queries the database.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.version = 0
+        self._published: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._reset()
+
+    def _reset(self):
+        self.status_counts: Counter = Counter()
+        self.status_rate_sums: Counter = Counter()
+        self._reset_day(_midnight(datetime.utcnow()))
+        self._snapshot: Optional[Tuple[bytes, str]] = None
+
+    def _reset_day(self, day: datetime):
+        self.day = day
+        self.booked_today = 0
+        self.agreed_rate_sum_today = 0.0
+        self.calls_today = 0
+        self.outcomes_today: Counter = Counter()
+        self.sentiments_today: Counter = Counter()
+        self.negotiation_rounds_today = 0
+        self.negotiations_today = 0
+
+    def _roll_day(self):
+        today = _midnight(datetime.utcnow())
+        if today != self.day:
+            self._reset_day(today)
+            self._snapshot = None
+
+    async def start(self, db):
+        try:
+            await self.reconcile(db)
+        except Exception as e:
+            logger.error(f"Dashboard metrics reconciliation failed: {e}")
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db):
+        while True:
+            await asyncio.sleep(settings.dashboard_metrics_reconcile_seconds)
+            try:
+                await self.reconcile(db)
+            except Exception as e:
+                logger.error(f"Dashboard metrics reconciliation failed: {e}")
+
+    async def reconcile(self, db):
+        """Recompute every counter from the database and swap them in"""
+        status_counts: Counter = Counter()
+        status_rate_sums: Counter = Counter()
+        async for row in db.loads.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}, "rate_sum": {"$sum": "$loadboard_rate"}}}
+        ]):
+            status_counts[row["_id"]] = row["count"]
+            status_rate_sums[row["_id"]] = row["rate_sum"] or 0.0
+
+        day = _midnight(datetime.utcnow())
+        booked = [row async for row in db.loads.aggregate([
+            {"$match": {"status": "booked", "booked_at": {"$gte": day}}},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "agreed_rate_sum": {"$sum": "$agreed_rate"}}}
+        ])]
+
+        outcomes: Counter = Counter()
+        sentiments: Counter = Counter()
+        calls = rounds = 0
+        async for row in db.call_logs.aggregate([
+            {"$match": {"created_at": {"$gte": day}}},
+            {"$group": {
+                "_id": {"outcome": "$outcome", "sentiment": "$sentiment"},
+                "count": {"$sum": 1},
+                "rounds": {"$sum": "$negotiation_rounds"}
+            }}
+        ]):
+            calls += row["count"]
+            rounds += row["rounds"] or 0
+            if row["_id"].get("outcome"):
+                outcomes[row["_id"]["outcome"]] += row["count"]
+            if row["_id"].get("sentiment"):
+                sentiments[row["_id"]["sentiment"]] += row["count"]
+
+        self.status_counts = status_counts
+        self.status_rate_sums = status_rate_sums
+        self._reset_day(day)
+        if booked:
+            self.booked_today = booked[0]["count"]
+            self.agreed_rate_sum_today = booked[0]["agreed_rate_sum"] or 0.0
+        self.calls_today = calls
+        self.outcomes_today = outcomes
+        self.sentiments_today = sentiments
+        self.negotiation_rounds_today = rounds
+        self.negotiations_today = await db.negotiations.count_documents({"timestamp": {"$gte": day}})
+        self.ready = True
+        self._changed("reconciled")
+
+    def _changed(self, event: str, detail: Optional[Dict[str, Any]] = None):
+        """Invalidate the cached snapshot and push the changed fields to stream subscribers"""
+        self._snapshot = None
+        self.version += 1
+        if not len(stats_broker):
+            return
+        summary = self.summary()
+        changes = {key: value for key, value in summary.items() if self._published.get(key) != value}
+        self._published = summary
+        stats_broker.publish({
+            "type": "delta",
+            "version": self.version,
+            "data": {"event": event, "detail": detail or {}, "changes": changes}
+        })
+
+    def current(self) -> Tuple[int, Dict[str, Any]]:
+        """Version and full summary, for a new stream subscriber"""
+        summary = self.summary()
+        if len(stats_broker) <= 1:
+            # Nothing was published while nobody listened; diff the next delta against this
+            self._published = summary
+        return self.version, summary
+
+    def load_booked(self, loadboard_rate: Optional[float], agreed_rate: float, load_id: Optional[str] = None):
+        """A load moved from available to booked"""
+        self._roll_day()
+        rate = loadboard_rate or 0.0
+        self.status_counts["available"] -= 1
+        self.status_rate_sums["available"] -= rate
+        self.status_counts["booked"] += 1
+        self.status_rate_sums["booked"] += rate
+        self.booked_today += 1
+        self.agreed_rate_sum_today += agreed_rate
+        self._changed("load_booked", {"load_id": load_id, "agreed_rate": agreed_rate})
+
+    def call_logged(self, call_log: Dict[str, Any]):
+        """A call was logged by the voice agent"""
+        self._roll_day()
+        self.calls_today += 1
+        if call_log.get("outcome"):
+            self.outcomes_today[call_log["outcome"]] += 1
+        if call_log.get("sentiment"):
+            self.sentiments_today[call_log["sentiment"]] += 1
+        self.negotiation_rounds_today += call_log.get("negotiation_rounds") or 0
+        self._changed("call_logged", {key: call_log.get(key) for key in ("load_id", "mc_number", "outcome", "sentiment", "final_rate")})
+
+    def negotiation_recorded(self, load_id: str, offered_rate: float, result: Dict[str, Any]):
+        """An offer was evaluated"""
+        self._roll_day()
+        self.negotiations_today += 1
+        self._changed("negotiation", {
+            "load_id": load_id,
+            "offered_rate": offered_rate,
+            "action": result.get("action"),
+            "counter_rate": result.get("counter_rate")
+        })
+
+    def summary(self) -> Dict[str, Any]:
+        self._roll_day()
+        status_breakdown = [
+            {
+                "_id": status,
+                "count": count,
+                "avg_rate": round(self.status_rate_sums[status] / count, 2) if count else None
+            }
+            for status, count in sorted(self.status_counts.items(), key=lambda item: str(item[0]))
+            if count > 0
+        ]
+        return {
+            "total_loads": sum(count for count in self.status_counts.values() if count > 0),
+            "booked_today": self.booked_today,
+            "status_breakdown": status_breakdown,
+            "avg_agreed_rate_today": round(self.agreed_rate_sum_today / self.booked_today, 2) if self.booked_today else None,
+            "calls_today": self.calls_today,
+            "negotiations_today": self.negotiations_today,
+            "conversion_rate": round(self.outcomes_today["booked"] / self.calls_today, 4) if self.calls_today else None,
+            "avg_negotiation_rounds": round(self.negotiation_rounds_today / self.calls_today, 2) if self.calls_today else None,
+            "outcome_breakdown": dict(self.outcomes_today),
+            "sentiment_breakdown": dict(self.sentiments_today)
+        }
+
+    def snapshot(self) -> Tuple[bytes, str]:
+        """Serialized summary and its ETag, rebuilt only after the counters change"""
+        self._roll_day()
+        if self._snapshot is None:
+            body = json.dumps(self.summary(), separators=(",", ":")).encode()
+            self._snapshot = (body, f'"{hashlib.sha1(body).hexdigest()[:16]}"')
+        return self._snapshot
+
+dashboard_metrics = DashboardMetrics()
@@ -0,0 +1,55 @@
+# app/services/geo.py
+from typing import Dict, Any, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+import csv
+import math
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "us_cities.csv"
+
+EARTH_RADIUS_MILES = 3958.8
+METERS_PER_MILE = 1609.344
+
+@lru_cache(maxsize=1)
+def _gazetteer() -> Tuple[Dict[str, Tuple[float, float]], Dict[str, Tuple[float, float]]]:
+    """
+    Load the bundled city list once.
+
+    Returns lookups by "city, st" and by bare city; the file is ordered by
+    population so a bare city resolves to its largest namesake.
+    """
+    by_city_state: Dict[str, Tuple[float, float]] = {}
+    by_city: Dict[str, Tuple[float, float]] = {}
+
+    with open(GAZETTEER_PATH, newline="") as f:
+        for row in csv.DictReader(f):
+            city = row["city"].lower()
+            state = row["state"].lower()
+            coords = (float(row["longitude"]), float(row["latitude"]))
+            by_city_state.setdefault(f"{city}, {state}", coords)
+            by_city.setdefault(city, coords)
+
+    return by_city_state, by_city
+
+def lookup(city: str, state: str = "") -> Optional[Tuple[float, float]]:
+    """Resolve a normalized city (and optional state code) to (longitude, latitude)"""
+    by_city_state, by_city = _gazetteer()
+    if state:
+        return by_city_state.get(f"{city}, {state}")
+    return by_city.get(city)
+
+def point(coords: Tuple[float, float]) -> Dict[str, Any]:
+    return {"type": "Point", "coordinates": [coords[0], coords[1]]}
+
+def miles_to_radians(miles: float) -> float:
+    return miles / EARTH_RADIUS_MILES
+
+def haversine_miles(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Great-circle distance between two (longitude, latitude) pairs"""
+    lon1, lat1 = map(math.radians, a)
+    lon2, lat2 = map(math.radians, b)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2 +
+        math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(h))
@@ -0,0 +1,211 @@
+# app/services/idempotency.py
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+import asyncio
+import hashlib
+import logging
+import time
+from pydantic import BaseModel
+from pymongo.errors import DuplicateKeyError
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import webhook_idempotency
+from app.db.sessions import get_database
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "webhook_idempotency"
+
+class IdempotencyConflict(Exception):
+    """The Idempotency-Key was already used for a request with different parameters"""
+
+class IdempotencyInProgress(Exception):
+    """An earlier attempt with the same key is still running"""
+
+# (request hash, response body)
+Completed = Tuple[str, bytes]
+
+def request_key(request: BaseModel, idempotency_key: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    (key, request hash) for a parsed webhook request. An Idempotency-Key
+    header wins; otherwise the key is session + action + parameters, so a
+    retry of the same turn maps to the same entry. Requests without either
+    aren't deduplicated, nor are header-only actions (and batches containing
+    them) sent without a header: identical parameters there can be a
+    legitimate repeat, like a carrier restating the same offer.
+    """
+    request_hash = hashlib.sha256(f"{request.action}:{request.parameters.model_dump_json()}".encode()).hexdigest()
+    if idempotency_key:
+        return f"key:{idempotency_key}", request_hash
+    actions = {request.action} | {step.action for step in getattr(request.parameters, "steps", None) or ()}
+    if actions & set(settings.idempotency_header_only_actions):
+        return None
+    if request.session_id:
+        return f"{request.session_id}:{request.action}:{request_hash}", request_hash
+    return None
+
+class IdempotencyStore:
+    """
+    Replays the response of a side-effecting webhook when it is retried.
+
+    Completed responses live in an in-process TTL cache in front of the
+    webhook_idempotency collection, whose _id is the key, so a retry that
+    lands on another worker still finds the first attempt. An attempt
+    claims its key with an insert before running; a concurrent retry waits
+    for that attempt's response instead of running the action again. If
+    MongoDB is unreachable, the in-process cache alone deduplicates.
+
+    Only responses `produce` marks replayable are kept; a failure a retry
+    could fix releases the claim so the retry runs the action. The claim
+    insert is the one write on the request path; the response is stored
+    after returning it.
+    """
+
+    def __init__(self, ttl: float = 3600, max_size: int = 10000):
+        self.ttl = ttl
+        self._completed = TTLCache(max_size=max_size, default_ttl=ttl)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    async def close(self):
+        """Wait for pending response writes"""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    async def run(
+        self,
+        action: str,
+        key: str,
+        request_hash: str,
+        produce: Callable[[], Awaitable[Tuple[bytes, bool]]]
+    ) -> Tuple[bytes, bool]:
+        """
+        Response body for the request and whether it was replayed. `produce`
+        returns the body and whether it may be replayed; it runs at most once
+        per key until it returns a replayable body.
+        """
+        completed = self._completed.get(key)
+        if completed is None:
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                try:
+                    completed = await asyncio.wait_for(asyncio.shield(inflight), settings.idempotency_wait_seconds)
+                except asyncio.TimeoutError:
+                    raise IdempotencyInProgress(key)
+        if completed is not None:
+            return self._replay(action, completed, request_hash), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        claimed = False
+        try:
+            try:
+                completed = await self._claim(key, request_hash)
+                claimed = completed is None
+            except (IdempotencyConflict, IdempotencyInProgress):
+                raise
+            except Exception as e:
+                logger.warning(f"Idempotency store unavailable, deduplicating in-process only: {e}")
+
+            if completed is not None:
+                self._completed.set(key, completed)
+                future.set_result(completed)
+                return self._replay(action, completed, request_hash), True
+
+            body, replayable = await produce()
+            webhook_idempotency.inc(action, "executed")
+            if not replayable:
+                # Let waiters and later retries run the action themselves
+                future.set_result(None)
+                if claimed:
+                    await self._release(key)
+                return body, False
+
+            completed = (request_hash, body)
+            self._completed.set(key, completed)
+            future.set_result(completed)
+            if claimed:
+                self._schedule(self._complete(key, body))
+            return body, False
+        except BaseException:
+            # Let waiters and later retries run the action themselves
+            if not future.done():
+                future.set_result(None)
+            if claimed:
+                await self._release(key)
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _replay(self, action: str, completed: Completed, request_hash: str) -> bytes:
+        stored_hash, body = completed
+        if stored_hash != request_hash:
+            raise IdempotencyConflict("Idempotency-Key was already used with different parameters")
+        webhook_idempotency.inc(action, "replayed")
+        return body
+
+    async def _claim(self, key: str, request_hash: str) -> Optional[Completed]:
+        """Claim the key; None when this attempt should run, the stored response when one already did"""
+        collection = get_database()[COLLECTION]
+        deadline = time.monotonic() + settings.idempotency_wait_seconds
+        while True:
+            now = datetime.utcnow()
+            try:
+                await collection.insert_one({
+                    "_id": key,
+                    "request_hash": request_hash,
+                    "status": "pending",
+                    "claimed_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl)
+                })
+                return None
+            except DuplicateKeyError:
+                pass
+
+            existing = await collection.find_one({"_id": key})
+            if existing is None:
+                # Expired between the insert and the read
+                continue
+            if existing["status"] == "completed":
+                return existing["request_hash"], existing["response"].encode()
+            if existing["request_hash"] != request_hash:
+                # Even an abandoned claim may have had side effects; don't reuse its key for other parameters
+                raise IdempotencyConflict("Idempotency-Key was already used with different parameters")
+            if existing["claimed_at"] <= now - timedelta(seconds=settings.idempotency_lock_seconds):
+                # The worker holding the claim died mid-request; take it over
+                taken = await collection.find_one_and_update(
+                    {"_id": key, "status": "pending", "request_hash": request_hash, "claimed_at": existing["claimed_at"]},
+                    {"$set": {"claimed_at": now}}
+                )
+                if taken is not None:
+                    return None
+                continue
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress(key)
+            await asyncio.sleep(0.05)
+
+    def _schedule(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _complete(self, key: str, body: bytes):
+        try:
+            await get_database()[COLLECTION].update_one(
+                {"_id": key},
+                {"$set": {"status": "completed", "response": body.decode(), "completed_at": datetime.utcnow()}}
+            )
+        except Exception as e:
+            logger.error(f"Failed to store idempotent response for {key}: {e}")
+
+    async def _release(self, key: str):
+        try:
+            await get_database()[COLLECTION].delete_one({"_id": key, "status": "pending"})
+        except Exception as e:
+            logger.error(f"Failed to release idempotency claim {key}: {e}")
+
+idempotency_store = IdempotencyStore(
+    ttl=settings.idempotency_ttl_seconds,
+    max_size=settings.idempotency_max_size
+)
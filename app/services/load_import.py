@@ -0,0 +1,220 @@
+# app/services/load_import.py
+from datetime import datetime
+from typing import Any, AsyncIterable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import codecs
+import csv
+import json
+import logging
+import time
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.core.cache import cache
+from app.core.config import settings
+from app.schemas.common import adapter
+from app.schemas.loads import LoadCreate
+from app.services.normalization import normalize_load
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+
+_load_adapter = adapter(LoadCreate)
+
+class RowParser:
+    """
+    Push parser turning text lines into (line number, row dict) pairs.
+
+    Lines are fed one at a time so files and request bodies can be parsed
+    incrementally; CSV records with quoted newlines are held back until
+    their closing quote arrives.
+    """
+
+    def __init__(self, fmt: str):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.fmt = fmt
+        self.line_no = 0
+        self._header: Optional[List[str]] = None
+        self._pending: List[str] = []
+        self._record_start = 0
+
+    def feed(self, line: str) -> Iterator[Tuple[int, Union[Dict[str, Any], Exception]]]:
+        self.line_no += 1
+        if self.fmt == "jsonl":
+            line = line.strip()
+            if line:
+                try:
+                    row = json.loads(line)
+                    yield self.line_no, row if isinstance(row, dict) else ValueError("Expected a JSON object")
+                except ValueError as e:
+                    yield self.line_no, e
+            return
+
+        if not self._pending:
+            self._record_start = self.line_no
+        self._pending.append(line)
+        # A record is complete once its quotes balance ("" escapes keep the count even)
+        if sum(part.count('"') for part in self._pending) % 2:
+            return
+        record = "".join(self._pending)
+        self._pending = []
+        if not record.strip():
+            return
+
+        values = next(csv.reader([record]))
+        if self._header is None:
+            self._header = [name.strip().lstrip("﻿") for name in values]
+            return
+        if len(values) != len(self._header):
+            yield self._record_start, ValueError(f"Expected {len(self._header)} columns, got {len(values)}")
+            return
+        # Empty cells count as missing so model defaults apply
+        yield self._record_start, {name: value for name, value in zip(self._header, values) if value != ""}
+
+    def close(self) -> Iterator[Tuple[int, Union[Dict[str, Any], Exception]]]:
+        if self._pending:
+            self._pending = []
+            yield self._record_start, ValueError("Unterminated quoted field")
+
+async def aiter_lines(chunks: AsyncIterable[bytes], encoding: str = "utf-8") -> AsyncIterable[str]:
+    """Split a byte stream into text lines (keeping line endings) without buffering the whole body"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        lines = buffer.splitlines(keepends=True)
+        # The last piece may be an incomplete line; keep it for the next chunk
+        buffer = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+def prepare(row: Dict[str, Any]) -> UpdateOne:
+    """Validate a row against LoadCreate and build its upsert; raises ValidationError"""
+    load = _load_adapter.validate_python(row)
+    doc = normalize_load(load.model_dump())
+    now = datetime.utcnow()
+    on_insert: Dict[str, Any] = {"created_at": now}
+    # Re-importing a load must not put a booked load back on the board
+    if "status" not in load.model_fields_set:
+        on_insert["status"] = doc.pop("status")
+    doc["updated_at"] = now
+    return UpdateOne({"load_id": load.load_id}, {"$set": doc, "$setOnInsert": on_insert}, upsert=True)
+
+class ImportReport:
+    __slots__ = ("rows", "inserted", "updated", "failed", "errors", "started", "elapsed")
+
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def error(self, line: int, message: str, load_id: Optional[str] = None, details: Any = None):
+        self.failed += 1
+        if len(self.errors) < settings.import_max_errors:
+            entry = {"line": line, "message": message}
+            if load_id:
+                entry["load_id"] = load_id
+            if details:
+                entry["details"] = details
+            self.errors.append(entry)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "elapsed_seconds": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows / self.elapsed) if self.elapsed else None
+        }
+
+class LoadImporter:
+    """Validate, normalize and upsert parsed rows in bulk_write batches keyed on load_id"""
+
+    def __init__(self, db, batch_size: Optional[int] = None, dry_run: bool = False):
+        self.db = db
+        self.batch_size = batch_size or settings.import_batch_size
+        self.dry_run = dry_run
+        self.report = ImportReport()
+        self._batch: List[UpdateOne] = []
+        self._lines: List[Tuple[int, str]] = []
+
+    async def add(self, line: int, row: Union[Dict[str, Any], Exception]):
+        self.report.rows += 1
+        if isinstance(row, Exception):
+            self.report.error(line, f"Unparseable row: {row}")
+            return
+        try:
+            operation = prepare(row)
+        except ValidationError as e:
+            self.report.error(line, "Validation failed", row.get("load_id"), e.errors(include_url=False, include_context=False, include_input=False))
+            return
+        self._batch.append(operation)
+        self._lines.append((line, row["load_id"]))
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self._batch:
+            return
+        batch, lines = self._batch, self._lines
+        self._batch, self._lines = [], []
+        if self.dry_run:
+            self.report.inserted += len(batch)
+            return
+        try:
+            result = await self.db.loads.bulk_write(batch, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for error in details.get("writeErrors", []):
+                line, load_id = lines[error["index"]]
+                self.report.error(line, error.get("errmsg", "Write failed"), load_id)
+        self.report.inserted += details.get("nUpserted", 0)
+        self.report.updated += details.get("nModified", 0)
+
+    async def finish(self) -> ImportReport:
+        await self.flush()
+        self.report.elapsed = time.perf_counter() - self.report.started
+        if not self.dry_run and (self.report.inserted or self.report.updated):
+            await cache.fire("loads_imported")
+        return self.report
+
+async def import_lines(
+    db,
+    lines: Union[Iterable[str], AsyncIterable[str]],
+    fmt: str,
+    batch_size: Optional[int] = None,
+    dry_run: bool = False
+) -> ImportReport:
+    """Parse, validate and upsert loads from a stream of text lines"""
+    parser = RowParser(fmt)
+    importer = LoadImporter(db, batch_size, dry_run)
+
+    if hasattr(lines, "__aiter__"):
+        async for line in lines:
+            for line_no, row in parser.feed(line):
+                await importer.add(line_no, row)
+    else:
+        for line in lines:
+            for line_no, row in parser.feed(line):
+                await importer.add(line_no, row)
+    for line_no, row in parser.close():
+        await importer.add(line_no, row)
+
+    report = await importer.finish()
+    logger.info(
+        f"Imported loads: {report.rows} rows, {report.inserted} inserted, {report.updated} updated, "
+        f"{report.failed} failed in {report.elapsed:.1f}s"
+    )
+    return report
@@ -0,0 +1,322 @@
+# app/services/load_index.py
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import merge, nsmallest
+from itertools import islice
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+from app.services.geo import haversine_miles
+from app.services.normalization import normalize_load, normalize_equipment, parse_location
+from app.services.pagination import SORTS, order_key, trim
+
+logger = logging.getLogger(__name__)
+
+# Server errors meaning the deployment has no change streams (standalone mongod, old servers)
+CHANGE_STREAMS_UNSUPPORTED = {40324, 40573}
+
+class LoadRecord:
+    """
+    One available load: the stored document, returned (trimmed to the
+    requested fields) as the search result, and its search fields pulled out
+    into slots. The slot values mostly reference the document's own strings,
+    so a record costs about the document plus a slotted object.
+    """
+    __slots__ = (
+        "key", "load_id", "origin_norm", "origin_state", "destination_norm",
+        "destination_state", "equipment", "rate", "pickup_at", "rate_per_mile",
+        "origin_coords", "destination_coords", "doc"
+    )
+
+    def __init__(self, doc: Dict[str, Any]):
+        if "equipment_norm" not in doc or "rate_per_mile" not in doc:
+            normalize_load(doc)
+        self.key = str(doc["_id"])
+        self.load_id = doc.get("load_id")
+        self.origin_norm = doc.get("origin_norm", "")
+        self.origin_state = doc.get("origin_state_norm", "")
+        self.destination_norm = doc.get("destination_norm", "")
+        self.destination_state = doc.get("destination_state_norm", "")
+        self.equipment = doc.get("equipment_norm", "")
+        self.rate = float(doc.get("loadboard_rate") or 0)
+        self.pickup_at = doc.get("pickup_at")
+        self.rate_per_mile = doc.get("rate_per_mile")
+        self.origin_coords = _coords(doc.get("origin_point"))
+        self.destination_coords = _coords(doc.get("destination_point"))
+        doc["_id"] = self.key
+        self.doc = doc
+
+def _coords(point: Optional[Dict[str, Any]]) -> Optional[Tuple[float, float]]:
+    if not point:
+        return None
+    lon, lat = point["coordinates"]
+    return lon, lat
+
+def _matches(kind: str, text: str, norm: str, state: str) -> bool:
+    if kind == "state":
+        return state == text
+    if kind == "exact":
+        return norm == text
+    return norm.startswith(text)
+
+class _Bucket:
+    """Records for one (equipment, origin state) pair, highest rate first and then by _id descending"""
+    __slots__ = ("neg_rates", "records")
+
+    def __init__(self):
+        self.neg_rates = array("d")
+        self.records: List[LoadRecord] = []
+
+    def add(self, record: LoadRecord):
+        i = bisect_right(self.neg_rates, -record.rate)
+        # Order equal rates by _id like the Mongo sort, so cursors resume in the same place
+        while i and self.neg_rates[i - 1] == -record.rate and self.records[i - 1].key < record.key:
+            i -= 1
+        self.neg_rates.insert(i, -record.rate)
+        self.records.insert(i, record)
+
+    def remove(self, record: LoadRecord):
+        i = bisect_left(self.neg_rates, -record.rate)
+        while self.records[i] is not record:
+            i += 1
+        del self.neg_rates[i]
+        del self.records[i]
+
+    def scan(self, min_rate: Optional[float], max_rate: Optional[float]) -> List[LoadRecord]:
+        lo = bisect_left(self.neg_rates, -max_rate) if max_rate else 0
+        hi = bisect_right(self.neg_rates, -min_rate) if min_rate else len(self.records)
+        return self.records[lo:hi]
+
+# Search sort name -> LoadRecord attribute
+_RECORD_SORT_FIELDS = {"rate": "rate", "pickup": "pickup_at", "rate_per_mile": "rate_per_mile"}
+
+class LoadIndex:
+    """
+    In-process index of available loads, warmed at startup and kept
+    current from a MongoDB change stream.
+
+    Deployments without change streams (a standalone mongod, mongomock in
+    the --mock benchmarks) don't get the index: the sync task logs one
+    warning and exits, and searches keep going to MongoDB. There is no
+    periodic-reload fallback, since a polled index would keep serving loads
+    booked on other workers until the next reload.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._records: Dict[str, LoadRecord] = {}
+        self._by_load_id: Dict[str, LoadRecord] = {}
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._states: Dict[str, Set[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    async def start(self, db):
+        """
+        Start syncing in the background; searches use MongoDB until the
+        first snapshot is taken under a live change stream, so a database
+        blip at startup only delays the index
+        """
+        self._task = asyncio.create_task(self._sync(db))
+
+    async def stop(self):
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def reload(self, db):
+        """Rebuild the index from the available loads in one pass"""
+        docs = await db.loads.find({"status": "available"}).to_list(length=None)
+        self._records.clear()
+        self._by_load_id.clear()
+        self._buckets.clear()
+        self._states.clear()
+        for doc in docs:
+            self._add(LoadRecord(doc))
+
+    def upsert(self, doc: Dict[str, Any]):
+        self.discard(str(doc["_id"]))
+        if doc.get("status") == "available":
+            self._add(LoadRecord(doc))
+
+    def get(self, load_id: str) -> Optional[LoadRecord]:
+        return self._by_load_id.get(load_id)
+
+    def discard(self, key: str):
+        """Remove a load by ObjectId string or load_id"""
+        record = self._records.pop(key, None) or self._by_load_id.get(key)
+        if record is None:
+            return
+        self._records.pop(record.key, None)
+        self._by_load_id.pop(record.load_id, None)
+        self._buckets[(record.equipment, record.origin_state)].remove(record)
+
+    def _add(self, record: LoadRecord):
+        self._records[record.key] = record
+        if record.load_id:
+            self._by_load_id[record.load_id] = record
+        bucket_key = (record.equipment, record.origin_state)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self._buckets[bucket_key] = _Bucket()
+            self._states.setdefault(record.equipment, set()).add(record.origin_state)
+        bucket.add(record)
+
+    def _candidate_buckets(self, equipment: Optional[str], origin_state: Optional[str]) -> Iterable[_Bucket]:
+        equipments = [equipment] if equipment is not None else list(self._states)
+        for eq in equipments:
+            states = [origin_state] if origin_state is not None else self._states.get(eq, ())
+            for state in states:
+                bucket = self._buckets.get((eq, state))
+                if bucket is not None:
+                    yield bucket
+
+    def search(
+        self,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        origin_coords: Optional[Tuple[float, float]] = None,
+        origin_radius_miles: Optional[float] = None,
+        destination_coords: Optional[Tuple[float, float]] = None,
+        destination_radius_miles: Optional[float] = None,
+        sort: str = "rate",
+        after: Optional[Tuple[Any, str]] = None,
+        fields: Optional[List[str]] = None,
+        limit: int = 10
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, str]]]:
+        """
+        Mirror of the Mongo search in search_loads, answered from memory.
+        Returns one page after the `after` position and the position of its
+        last load when more follow.
+        """
+        equipment = normalize_equipment(equipment_type) if equipment_type else None
+        origin_match = parse_location(origin) if origin and origin_coords is None else None
+        destination_match = parse_location(destination) if destination and destination_coords is None else None
+        origin_state = origin_match[1] if origin_match and origin_match[0] == "state" else None
+        if origin_match and origin_match[0] == "exact":
+            origin_state = origin_match[1].rsplit(", ", 1)[1]
+
+        direction = SORTS[sort][1]
+        distance_field = "deadhead_miles" if origin_coords is not None else "destination_distance_miles"
+        after_key = order_key(*after, direction) if after else None
+
+        # Buckets are rate-ordered, so a rate cursor starts the scan at its rate
+        if sort == "rate" and after:
+            max_rate = min(max_rate, after[0]) if max_rate else after[0]
+        buckets = self._candidate_buckets(equipment, origin_state)
+        candidates = merge(
+            *(bucket.scan(min_rate, max_rate) for bucket in buckets),
+            key=lambda record: order_key(record.rate, record.key, -1)
+        )
+
+        def matches():
+            for record in candidates:
+                if origin_match and not _matches(*origin_match, record.origin_norm, record.origin_state):
+                    continue
+                if destination_match and not _matches(*destination_match, record.destination_norm, record.destination_state):
+                    continue
+                distances = {}
+                if origin_coords is not None:
+                    if record.origin_coords is None:
+                        continue
+                    distances["deadhead_miles"] = haversine_miles(origin_coords, record.origin_coords)
+                    if distances["deadhead_miles"] > origin_radius_miles:
+                        continue
+                if destination_coords is not None:
+                    if record.destination_coords is None:
+                        continue
+                    distance = haversine_miles(destination_coords, record.destination_coords)
+                    if distance > destination_radius_miles:
+                        continue
+                    if origin_coords is None:
+                        distances["destination_distance_miles"] = distance
+                value = distances[distance_field] if sort == "distance" else getattr(record, _RECORD_SORT_FIELDS[sort])
+                position = order_key(value, record.key, direction)
+                if after_key is None or position > after_key:
+                    yield position, value, record, distances
+
+        if sort == "rate":
+            # Candidates already arrive in page order; stop once the page is full
+            page = list(islice(matches(), limit + 1))
+        else:
+            page = nsmallest(limit + 1, matches(), key=lambda item: item[0])
+
+        results = []
+        for _, _, record, distances in page[:limit]:
+            doc = trim(dict(record.doc), fields)
+            for field, distance in distances.items():
+                doc[field] = round(distance, 1)
+            results.append(doc)
+
+        next_after = None
+        if len(page) > limit:
+            _, value, record, _ = page[limit - 1]
+            next_after = (value, record.key)
+        return results, next_after
+
+    def _apply(self, change: Dict[str, Any]):
+        operation = change["operationType"]
+        if operation == "delete":
+            self.discard(str(change["documentKey"]["_id"]))
+        elif operation in ("insert", "update", "replace"):
+            doc = change.get("fullDocument")
+            if doc is None:
+                # Document was deleted before the update lookup ran
+                self.discard(str(change["documentKey"]["_id"]))
+            else:
+                self.upsert(doc)
+
+    async def _sync(self, db):
+        """
+        Keep the index current from a change stream. It only serves while the
+        stream is open: a booking on another worker reaches this one through
+        the stream, so without it the index could hand out booked loads.
+        """
+        while True:
+            try:
+                stream = db.loads.watch(full_document="updateLookup")
+            except (AttributeError, NotImplementedError, TypeError) as e:
+                # Drivers and test doubles with no change stream support at all
+                self._disable(e)
+                return
+            try:
+                async with stream:
+                    # Open the stream before re-snapshotting so no change slips between them
+                    first = await stream.try_next()
+                    await self.reload(db)
+                    if first is not None:
+                        self._apply(first)
+                    self.ready = True
+                    logger.info(f"Load index warmed with {len(self)} available loads")
+                    async for change in stream:
+                        self._apply(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                self.ready = False
+                if e.code in CHANGE_STREAMS_UNSUPPORTED or "replica set" in str(e):
+                    self._disable(e)
+                    return
+                logger.warning(f"Load index change stream failed: {e}")
+            except Exception as e:
+                self.ready = False
+                logger.warning(f"Load index change stream dropped: {e}")
+            await asyncio.sleep(settings.load_index_retry_seconds)
+
+    def _disable(self, error: Exception):
+        self.ready = False
+        logger.warning(f"Change streams unavailable ({error}), load index disabled; searches use MongoDB")
+
+load_index = LoadIndex()
@@ -0,0 +1,324 @@
+# app/services/loads.py
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+from app.db.sessions import get_database, get_read_database
+from app.db.write_behind import write_behind
+from app.core.cache import cached, cache, LOAD_SEARCH_NAMESPACE, LOAD_DETAIL_NAMESPACE
+from app.core.config import settings
+from app.services.negotiation import negotiation_service
+from app.services.negotiation_sessions import NegotiationSession, negotiation_sessions
+from app.services.pricing import pricing_policies
+from app.services.pricing_model import pricing_model
+from app.services.recommendations import recommendation_engine
+from app.services.normalization import normalize_equipment, location_query, geocode
+from app.services.geo import point, miles_to_radians, haversine_miles, METERS_PER_MILE
+from app.services.pagination import SORTS, decode_cursor, encode_cursor, keyset_filter, mongo_sort, projection, trim
+from app.services.load_index import load_index
+from app.services.bookings import load_filter, record_booking
+from app.services.dashboard_metrics import dashboard_metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LoadNotFound(Exception):
+    """No load matches the given load_id or ObjectId"""
+
+class LoadNotAvailable(Exception):
+    """The load exists but is no longer available to book"""
+
+class InvalidSearch(Exception):
+    """Search parameters that cannot be combined, such as a distance sort without a radius"""
+
+@cached(LOAD_SEARCH_NAMESPACE, ttl=settings.load_search_cache_ttl_seconds)
+async def search_loads(
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    equipment_type: Optional[str] = None,
+    min_rate: Optional[float] = None,
+    max_rate: Optional[float] = None,
+    origin_radius_miles: Optional[float] = None,
+    destination_radius_miles: Optional[float] = None,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    limit: int = 10
+) -> Dict[str, Any]:
+    """
+    Search for available loads based on criteria.
+
+    Returns one page of `limit` loads in `sort` order and a `next_cursor`
+    for the following page (None on the last one). Radius searches rank by
+    distance unless another sort is given. `fields` limits what is fetched.
+    """
+    db = get_read_database()
+    
+    # Radius searches need the city in the gazetteer; otherwise fall back to name matching
+    origin_coords = geocode(origin) if origin and origin_radius_miles else None
+    destination_coords = geocode(destination) if destination and destination_radius_miles else None
+    
+    sort = sort or ("distance" if origin_coords is not None or destination_coords is not None else "rate")
+    if sort not in SORTS:
+        raise InvalidSearch(f"Unknown sort '{sort}', expected one of: {', '.join(SORTS)}")
+    if sort == "distance" and origin_coords is None and destination_coords is None:
+        raise InvalidSearch("Sorting by distance needs a radius search on a known city")
+    after = decode_cursor(cursor, sort) if cursor else None
+    
+    # Serve from the in-process index when it is warm
+    if load_index.ready:
+        loads, next_after = load_index.search(
+            origin=origin,
+            destination=destination,
+            equipment_type=equipment_type,
+            min_rate=min_rate,
+            max_rate=max_rate,
+            origin_coords=origin_coords,
+            origin_radius_miles=origin_radius_miles,
+            destination_coords=destination_coords,
+            destination_radius_miles=destination_radius_miles,
+            sort=sort,
+            after=after,
+            fields=fields,
+            limit=limit
+        )
+        return {"loads": loads, "next_cursor": encode_cursor(sort, *next_after) if next_after else None}
+    
+    # Build query on the normalized fields so the compound index is used
+    query = {"status": "available"}
+    
+    if equipment_type:
+        query["equipment_norm"] = normalize_equipment(equipment_type)
+    if origin and origin_coords is None:
+        query.update(location_query("origin", origin))
+    if destination and destination_coords is None:
+        query.update(location_query("destination", destination))
+    if min_rate:
+        query["loadboard_rate"] = {"$gte": min_rate}
+    if max_rate:
+        if "loadboard_rate" in query:
+            query["loadboard_rate"]["$lte"] = max_rate
+        else:
+            query["loadboard_rate"] = {"$lte": max_rate}
+    
+    # Deadhead from the origin is reported when searching around it, else distance to the destination
+    radii = []
+    if origin_coords is not None:
+        radii.append(("origin_point", origin_coords, origin_radius_miles, "deadhead_miles"))
+    if destination_coords is not None:
+        radii.append(("destination_point", destination_coords, destination_radius_miles, "destination_distance_miles"))
+    
+    # Execute query
+    if sort == "distance":
+        key, coords, radius, distance_field = radii[0]
+        for other_key, other_coords, other_radius, _ in radii[1:]:
+            query[other_key] = {
+                "$geoWithin": {"$centerSphere": [list(other_coords), miles_to_radians(other_radius)]}
+            }
+        geo_near = {
+            "near": point(coords),
+            "key": key,
+            "distanceField": distance_field,
+            "distanceMultiplier": 1 / METERS_PER_MILE,
+            "maxDistance": radius * METERS_PER_MILE,
+            "query": query,
+            "spherical": True
+        }
+        pipeline = [{"$geoNear": geo_near}]
+        if after:
+            # Skip straight to the cursor's ring, then past loads at exactly its distance
+            geo_near["minDistance"] = after[0] * METERS_PER_MILE
+            pipeline.append({"$match": keyset_filter(distance_field, 1, *after)})
+        pipeline += [{"$sort": dict(mongo_sort(distance_field, 1))}, {"$limit": limit + 1}]
+        fetch = projection(fields, distance_field)
+        if fetch:
+            pipeline.append({"$project": fetch})
+        loads_cursor = db.loads.aggregate(pipeline)
+    else:
+        field, direction = SORTS[sort]
+        for key, coords, radius, _ in radii:
+            query[key] = {"$geoWithin": {"$centerSphere": [list(coords), miles_to_radians(radius)]}}
+        if after:
+            query = {"$and": [query, keyset_filter(field, direction, *after)]}
+        fetch = projection(fields, field, *(key for key, *_ in radii))
+        loads_cursor = db.loads.find(query, fetch).sort(mongo_sort(field, direction)).limit(limit + 1)
+    
+    loads = []
+    positions = []
+    async for load in loads_cursor:
+        load["_id"] = str(load["_id"])
+        distances = {}
+        if sort == "distance":
+            distance_field = radii[0][3]
+            positions.append(load[distance_field])
+            distances[distance_field] = load[distance_field]
+        else:
+            positions.append(load.get(SORTS[sort][0]))
+            for key, coords, _, distance_field in radii[:1]:
+                if load.get(key):
+                    distances[distance_field] = haversine_miles(coords, tuple(load[key]["coordinates"]))
+        load = trim(load, fields)
+        for distance_field, distance in distances.items():
+            load[distance_field] = round(distance, 1)
+        loads.append(load)
+    
+    next_cursor = None
+    if len(loads) > limit:
+        next_cursor = encode_cursor(sort, positions[limit - 1], loads[limit - 1]["_id"])
+    return {"loads": loads[:limit], "next_cursor": next_cursor}
+
+async def recommend_loads(
+    mc_number: Optional[str],
+    k: int = 3,
+    fields: Optional[List[str]] = None,
+    explain: bool = False,
+    **criteria: Any
+) -> List[Dict[str, Any]]:
+    """
+    Best k loads for a carrier among the first recommendation_candidates
+    search matches (by rate, or by distance for radius searches)
+    """
+    if fields:
+        fields = [*fields, "origin_state_norm", "destination_state_norm", "equipment_norm", "rate_per_mile"]
+    page = await search_loads(**criteria, fields=fields, limit=settings.recommendation_candidates)
+    return recommendation_engine.rank(mc_number, page["loads"], k, explain)
+
+@cached(LOAD_DETAIL_NAMESPACE, ttl=settings.load_detail_cache_ttl_seconds)
+async def get_load(load_id: str) -> Dict[str, Any]:
+    """Get specific load details"""
+    db = get_database()
+    
+    # Match by load_id field or MongoDB _id in one query
+    load = await db.loads.find_one(load_filter(load_id))
+    
+    if not load:
+        raise LoadNotFound(load_id)
+    
+    load["_id"] = str(load["_id"])
+    return load
+
+async def book_load(load_id: str, mc_number: str, agreed_rate: float) -> Dict[str, Any]:
+    """Book a load for a carrier"""
+    db = get_database()
+    booked_at = datetime.utcnow()
+    
+    # Claim the load in a single conditional update so concurrent callers can't both win
+    load = await db.loads.find_one_and_update(
+        {**load_filter(load_id), "status": "available"},
+        {
+            "$set": {
+                "status": "booked",
+                "booked_by": mc_number,
+                "agreed_rate": agreed_rate,
+                "booked_at": booked_at
+            }
+        },
+        projection={"load_id": 1, "loadboard_rate": 1}
+    )
+    
+    if not load:
+        # Only the losing path pays for a second lookup
+        if await db.loads.find_one(load_filter(load_id), {"_id": 1}):
+            raise LoadNotAvailable(load_id)
+        raise LoadNotFound(load_id)
+    
+    # Drop cached search/detail results so no worker serves this load as available
+    load_index.discard(str(load["_id"]))
+    await cache.fire("load_booked")
+    dashboard_metrics.load_booked(load.get("loadboard_rate"), agreed_rate, load.get("load_id") or load_id)
+    
+    # Log the booking; the booked load doubles as its outbox entry if this fails
+    try:
+        await record_booking(db, {
+            **load,
+            "status": "booked",
+            "booked_by": mc_number,
+            "agreed_rate": agreed_rate,
+            "booked_at": booked_at
+        })
+    except Exception as e:
+        logger.error(f"Failed to record booking for load {load_id}: {e}")
+    
+    return {
+        "success": True,
+        "load_id": load_id,
+        "mc_number": mc_number,
+        "agreed_rate": agreed_rate,
+        "message": "Load booked successfully"
+    }
+
+PRICING_FIELDS = {
+    "load_id": 1, "loadboard_rate": 1, "origin_state_norm": 1,
+    "destination_state_norm": 1, "equipment_norm": 1, "miles": 1,
+    "pickup_datetime": 1
+}
+
+async def pricing_inputs(load_id: str) -> Dict[str, Any]:
+    """Rate, lane and equipment of a load, from the in-memory index when it is warm"""
+    if load_index.ready:
+        record = load_index.get(load_id)
+        if record is not None:
+            return record.doc
+
+    db = get_database()
+    load = await db.loads.find_one({"load_id": load_id}, PRICING_FIELDS)
+    if not load:
+        raise LoadNotFound(load_id)
+    return load
+
+async def negotiate_rate(
+    load_id: str,
+    offered_rate: float,
+    negotiation_round: int = 1,
+    mc_number: Optional[str] = None,
+    session_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Handle price negotiation for a load.
+
+    With a session_id the round and pricing inputs come from the call's
+    negotiation session and the client-supplied negotiation_round is ignored.
+    """
+    session = None
+    if session_id:
+        session = await negotiation_sessions.get(session_id, load_id)
+    if session is None:
+        session = NegotiationSession.from_load(session_id, await pricing_inputs(load_id))
+    if session_id:
+        negotiation_round = session.next_round
+    
+    # Evaluate the offer under the lane/equipment policy, with the floor moved by booking history
+    policy = pricing_model.adjust(
+        pricing_policies.resolve(session.lane, session.equipment),
+        session.loadboard_rate,
+        lane=session.lane,
+        equipment=session.equipment,
+        load_id=load_id,
+        miles=session.miles,
+        pickup_datetime=session.pickup_datetime
+    )
+    result = negotiation_service.evaluate_offer(
+        session.loadboard_rate,
+        offered_rate, 
+        negotiation_round,
+        policy
+    )
+
+    if session_id:
+        session.record(offered_rate, result)
+        await negotiation_sessions.save(session)
+    
+    # Log negotiation attempt off the voice path
+    await write_behind.enqueue("negotiations", {
+        "session_id": session_id,
+        "load_id": load_id,
+        "mc_number": mc_number,
+        "base_rate": session.loadboard_rate,
+        "lane": session.lane,
+        "equipment": session.equipment,
+        "offered_rate": offered_rate,
+        "negotiation_round": negotiation_round,
+        "result": result,
+        "timestamp": datetime.utcnow()
+    })
+    dashboard_metrics.negotiation_recorded(load_id, offered_rate, result)
+    
+    return result
@@ -1,63 +1,66 @@
 # app/services/negotiation.py
-from typing import Dict, Any
-from app.models.loads import Load
+from typing import Dict, Any, Optional
+from app.services.pricing import (
+    ACCEPT, COUNTER, DECLINE_CONTINUE, PricingPolicy, decide, pricing_policies
+)
 
 class NegotiationService:
     """Handle price negotiation logic"""
-    
+
     @staticmethod
-    def evaluate_offer(load: Load, offered_rate: float, negotiation_round: int) -> Dict[str, Any]:
+    def evaluate_offer(
+        base_rate: float,
+        offered_rate: float,
+        negotiation_round: int,
+        policy: Optional[PricingPolicy] = None
+    ) -> Dict[str, Any]:
         """
-        Evaluate a carrier's price offer
+        Evaluate a carrier's price offer against the load's listed rate
         Returns decision on whether to accept, counter, or transfer
         """
-        base_rate = load.loadboard_rate
-        min_acceptable_rate = base_rate * 0.85  # 15% below listed rate
-        
-        # Check negotiation rounds
-        if negotiation_round > 3:
-            return {
-                "action": "transfer_to_rep",
-                "accepted": False,
-                "reason": "Maximum negotiation rounds exceeded",
-                "message": "I'll need to transfer you to a sales representative for further assistance."
-            }
-        
-        # Accept if within 5% of asking price
-        if offered_rate >= base_rate * 0.95:
+        policy = policy or pricing_policies.default
+        action, counter_rate, min_acceptable_rate = decide(policy, base_rate, offered_rate, negotiation_round)
+
+        # Accept if close enough to the asking price
+        if action == ACCEPT:
             return {
                 "action": "accept",
                 "accepted": True,
                 "final_rate": offered_rate,
                 "message": f"Great! I can accept your rate of ${offered_rate:.2f} for this load."
             }
-        
+
         # Counter offer if rate is reasonable but low
-        elif offered_rate >= min_acceptable_rate:
-            # Calculate counter offer (meet halfway between offer and base rate)
-            counter_rate = offered_rate + ((base_rate - offered_rate) * 0.3)
+        if action == COUNTER:
             return {
                 "action": "counter_offer",
                 "accepted": False,
-                "counter_rate": round(counter_rate, 2),
+                "counter_rate": counter_rate,
                 "message": f"I appreciate your offer. I can go as low as ${counter_rate:.2f} for this load. Would that work for you?"
             }
-        
-        # Decline if too low
-        else:
-            if negotiation_round < 2:
-                return {
-                    "action": "decline_continue",
-                    "accepted": False,
-                    "min_rate": round(min_acceptable_rate, 2),
-                    "message": f"I understand you're looking for the best rate. The lowest I can offer for this load is ${min_acceptable_rate:.2f}. Would you like to reconsider?"
-                }
-            else:
-                return {
-                    "action": "transfer_to_rep",
-                    "accepted": False,
-                    "reason": "Rate too low after multiple attempts",
-                    "message": "I see we're having difficulty agreeing on a rate. Let me transfer you to a sales representative who may have more flexibility."
-                }
-
-negotiation_service = NegotiationService()
\ No newline at end of file
+
+        # Decline if too low, with another chance early on
+        if action == DECLINE_CONTINUE:
+            return {
+                "action": "decline_continue",
+                "accepted": False,
+                "min_rate": round(min_acceptable_rate, 2),
+                "message": f"I understand you're looking for the best rate. The lowest I can offer for this load is ${min_acceptable_rate:.2f}. Would you like to reconsider?"
+            }
+
+        if negotiation_round > policy.max_rounds:
+            return {
+                "action": "transfer_to_rep",
+                "accepted": False,
+                "reason": "Maximum negotiation rounds exceeded",
+                "message": "I'll need to transfer you to a sales representative for further assistance."
+            }
+
+        return {
+            "action": "transfer_to_rep",
+            "accepted": False,
+            "reason": "Rate too low after multiple attempts",
+            "message": "I see we're having difficulty agreeing on a rate. Let me transfer you to a sales representative who may have more flexibility."
+        }
+
+negotiation_service = NegotiationService()
@@ -0,0 +1,181 @@
+# app/services/negotiation_sessions.py
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+from app.core.cache import TTLCache, cache, dumps, loads
+from app.core.config import settings
+from app.services.pricing import lane_key
+
+logger = logging.getLogger(__name__)
+
+class NegotiationSession:
+    """Pricing inputs and offer history for one load within one call"""
+    __slots__ = (
+        "session_id", "load_id", "loadboard_rate", "lane", "equipment", "miles",
+        "pickup_datetime", "rounds", "history", "status", "final_rate",
+        "created_at", "updated_at"
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        load_id: str,
+        loadboard_rate: float,
+        lane: Optional[str] = None,
+        equipment: Optional[str] = None,
+        miles: Optional[float] = None,
+        pickup_datetime: Optional[datetime] = None
+    ):
+        self.session_id = session_id
+        self.load_id = load_id
+        self.loadboard_rate = loadboard_rate
+        self.lane = lane
+        self.equipment = equipment
+        self.miles = miles
+        self.pickup_datetime = pickup_datetime
+        self.rounds = 0
+        self.history: List[Dict[str, Any]] = []
+        self.status = "open"
+        self.final_rate: Optional[float] = None
+        self.created_at = datetime.utcnow()
+        self.updated_at = self.created_at
+
+    @classmethod
+    def from_load(cls, session_id: str, load: Dict[str, Any]) -> "NegotiationSession":
+        """Capture the pricing inputs of a (normalized) load document"""
+        return cls(
+            session_id,
+            load["load_id"],
+            float(load["loadboard_rate"]),
+            lane_key(load.get("origin_state_norm"), load.get("destination_state_norm")),
+            load.get("equipment_norm"),
+            load.get("miles"),
+            _parse_datetime(load.get("pickup_datetime"))
+        )
+
+    @property
+    def next_round(self) -> int:
+        return self.rounds + 1
+
+    def record(self, offered_rate: float, result: Dict[str, Any]):
+        """Append one evaluated offer and advance the round"""
+        self.rounds += 1
+        self.updated_at = datetime.utcnow()
+        self.history.append({
+            "load_id": self.load_id,
+            "round": self.rounds,
+            "offered_rate": offered_rate,
+            "action": result["action"],
+            "counter_rate": result.get("counter_rate"),
+            "accepted": result.get("accepted", False),
+            "timestamp": self.updated_at
+        })
+        if result.get("accepted"):
+            self.status = "accepted"
+            self.final_rate = result.get("final_rate", offered_rate)
+        elif result["action"] == "transfer_to_rep":
+            self.status = "transferred"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NegotiationSession":
+        session = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(session, name, data.get(name))
+        session.created_at = _parse_datetime(session.created_at)
+        session.updated_at = _parse_datetime(session.updated_at)
+        session.pickup_datetime = _parse_datetime(session.pickup_datetime)
+        session.history = [
+            {**entry, "timestamp": _parse_datetime(entry.get("timestamp"))}
+            for entry in session.history or []
+        ]
+        return session
+
+def _parse_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return value
+
+class NegotiationSessionStore:
+    """
+    Negotiation state per call, keyed by session_id and then load_id.
+
+    Sessions live in an in-process TTL cache. With a shared backend (the
+    response cache's L2) they are read from and written back to it on every
+    turn instead, so a call can move between workers. Either way a turn never
+    touches MongoDB once the load's pricing inputs have been captured.
+    """
+
+    def __init__(self, shared: bool = False, ttl: float = 1800, max_size: int = 10000, prefix: str = "negotiation"):
+        self.shared = shared
+        self.ttl = ttl
+        self.prefix = prefix
+        self._local = TTLCache(max_size=max_size, default_ttl=ttl)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}:{session_id}"
+
+    async def _load(self, session_id: str) -> Dict[str, NegotiationSession]:
+        if not self.shared:
+            return self._local.get(session_id) or {}
+
+        try:
+            raw = await cache.backend.get(self._key(session_id))
+        except Exception as e:
+            logger.warning(f"Negotiation session read failed for {session_id}: {e}")
+            return self._local.get(session_id) or {}
+        if raw is None:
+            return {}
+        return {load_id: NegotiationSession.from_dict(data) for load_id, data in loads(raw).items()}
+
+    async def _store(self, session_id: str, sessions: Dict[str, NegotiationSession]):
+        self._local.set(session_id, sessions)
+        if not self.shared:
+            return
+
+        payload = {load_id: session.to_dict() for load_id, session in sessions.items()}
+        try:
+            await cache.backend.set(self._key(session_id), dumps(payload), self.ttl)
+        except Exception as e:
+            logger.warning(f"Negotiation session write failed for {session_id}: {e}")
+
+    async def get(self, session_id: str, load_id: str) -> Optional[NegotiationSession]:
+        return (await self._load(session_id)).get(load_id)
+
+    async def save(self, session: NegotiationSession):
+        sessions = await self._load(session.session_id)
+        sessions[session.load_id] = session
+        await self._store(session.session_id, sessions)
+
+    async def prime(self, session_id: str, loads: Iterable[Dict[str, Any]]):
+        """Capture pricing inputs for loads the caller was just offered, so their first offer needs no lookup"""
+        sessions = await self._load(session_id)
+        missing = [load for load in loads if load["load_id"] not in sessions]
+        if not missing:
+            return
+        for load in missing:
+            sessions[load["load_id"]] = NegotiationSession.from_load(session_id, load)
+        await self._store(session_id, sessions)
+
+    async def finalize(self, session_id: str) -> List[NegotiationSession]:
+        """Remove the sessions of a call and return those that saw at least one offer, oldest first"""
+        sessions = await self._load(session_id)
+        self._local.delete(session_id)
+        if self.shared:
+            try:
+                await cache.backend.delete(self._key(session_id))
+            except Exception as e:
+                logger.warning(f"Negotiation session delete failed for {session_id}: {e}")
+
+        return sorted((s for s in sessions.values() if s.rounds), key=lambda s: s.created_at)
+
+negotiation_sessions = NegotiationSessionStore(
+    shared=settings.negotiation_session_shared,
+    ttl=settings.negotiation_session_ttl_seconds,
+    max_size=settings.negotiation_session_max_size
+)
@@ -0,0 +1,146 @@
+# app/services/normalization.py
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+import re
+from app.services import geo
+
+_WHITESPACE = re.compile(r"\s+")
+
+US_STATES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar",
+    "california": "ca", "colorado": "co", "connecticut": "ct", "delaware": "de",
+    "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id",
+    "illinois": "il", "indiana": "in", "iowa": "ia", "kansas": "ks",
+    "kentucky": "ky", "louisiana": "la", "maine": "me", "maryland": "md",
+    "massachusetts": "ma", "michigan": "mi", "minnesota": "mn", "mississippi": "ms",
+    "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv",
+    "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm", "new york": "ny",
+    "north carolina": "nc", "north dakota": "nd", "ohio": "oh", "oklahoma": "ok",
+    "oregon": "or", "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc",
+    "south dakota": "sd", "tennessee": "tn", "texas": "tx", "utah": "ut",
+    "vermont": "vt", "virginia": "va", "washington": "wa", "west virginia": "wv",
+    "wisconsin": "wi", "wyoming": "wy", "district of columbia": "dc"
+}
+
+STATE_CODES = set(US_STATES.values())
+
+# Spoken or abbreviated equipment names mapped onto the canonical board names
+EQUIPMENT_ALIASES = {
+    "van": "dry van",
+    "dryvan": "dry van",
+    "dry-van": "dry van",
+    "53 van": "dry van",
+    "refrigerated": "reefer",
+    "reefer van": "reefer",
+    "flat bed": "flatbed",
+    "flat-bed": "flatbed",
+    "stepdeck": "step deck",
+    "step-deck": "step deck",
+    "box": "box truck",
+    "straight truck": "box truck",
+    "tank": "tanker"
+}
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lower-case and collapse whitespace"""
+    if not value:
+        return ""
+    return _WHITESPACE.sub(" ", str(value)).strip().lower()
+
+def normalize_state(value: Optional[str]) -> str:
+    """Return the two-letter lower-case code for a state name or code"""
+    state = normalize_text(value).rstrip(".")
+    return US_STATES.get(state, state)
+
+def normalize_equipment(value: Optional[str]) -> str:
+    equipment = normalize_text(value)
+    return EQUIPMENT_ALIASES.get(equipment, equipment)
+
+def normalize_mc(value: Any) -> Optional[str]:
+    """Bare MC digits: strip an optional MC prefix and whitespace, so "MC-123" and 123 match"""
+    if value is None:
+        return None
+    mc = str(value).strip().upper()
+    if mc.startswith("MC"):
+        mc = mc[2:].lstrip("-# ")
+    return mc or None
+
+def split_location(value: Optional[str]) -> Tuple[str, str]:
+    """Split "Chicago, IL" into normalized ("chicago", "il")"""
+    text = normalize_text(value)
+    if "," in text:
+        city, state = text.rsplit(",", 1)
+        return city.strip(), normalize_state(state)
+    return text, ""
+
+def normalize_location(value: Optional[str]) -> str:
+    """Canonical "city, st" form stored alongside the display string"""
+    city, state = split_location(value)
+    return f"{city}, {state}" if state else city
+
+def geocode(location: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Resolve "Dallas, TX" or "Dallas" to (longitude, latitude) from the bundled gazetteer"""
+    city, state = split_location(location)
+    if not city:
+        return None
+    return geo.lookup(city, state)
+
+def parse_pickup(value: Any) -> Optional[datetime]:
+    """Pickup time as a naive datetime at millisecond precision, as MongoDB stores it"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value.replace(tzinfo=None, microsecond=value.microsecond // 1000 * 1000)
+
+def rate_per_mile(load: Dict[str, Any]) -> Optional[float]:
+    miles = load.get("miles")
+    rate = load.get("loadboard_rate")
+    if not miles or rate is None:
+        return None
+    return round(float(rate) / float(miles), 4)
+
+def normalize_load(load: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the lower-cased search fields, sort keys and GeoJSON points to a load document in place"""
+    for field in ("origin", "destination"):
+        city, state = split_location(load.get(field))
+        load[f"{field}_norm"] = f"{city}, {state}" if state else city
+        load[f"{field}_state_norm"] = state
+        
+        coords = geo.lookup(city, state) if city else None
+        if coords is not None:
+            load[f"{field}_point"] = geo.point(coords)
+    load["equipment_norm"] = normalize_equipment(load.get("equipment_type"))
+    load["pickup_at"] = parse_pickup(load.get("pickup_datetime"))
+    load["rate_per_mile"] = rate_per_mile(load)
+    return load
+
+def parse_location(value: str) -> Tuple[str, str]:
+    """
+    Classify a spoken location for matching.
+
+    A bare state ("TX", "Texas") becomes ("state", "tx"), a full
+    "City, ST" becomes ("exact", "city, st") and a bare city becomes
+    ("prefix", "city").
+    """
+    text = normalize_text(value)
+    state = US_STATES.get(text) or (text if text in STATE_CODES else None)
+    if state:
+        return "state", state
+
+    city, state = split_location(text)
+    if state:
+        return "exact", f"{city}, {state}"
+    return "prefix", city
+
+def location_query(field: str, value: str) -> Dict[str, Any]:
+    """Build an index-friendly filter on `field` ("origin" or "destination")"""
+    kind, text = parse_location(value)
+    if kind == "state":
+        return {f"{field}_state_norm": text}
+    if kind == "exact":
+        return {f"{field}_norm": text}
+    return {f"{field}_norm": {"$regex": f"^{re.escape(text)}"}}
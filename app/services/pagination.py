@@ -0,0 +1,73 @@
+# app/services/pagination.py
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId, json_util
+
+# Sort name -> (stored field, direction). Every sort breaks ties on _id in the
+# same direction, so (value, _id) is unique and a cursor resumes exactly.
+SORTS: Dict[str, Tuple[Optional[str], int]] = {
+    "rate": ("loadboard_rate", -1),
+    "pickup": ("pickup_at", 1),
+    "rate_per_mile": ("rate_per_mile", -1),
+    # Miles from the radius search center; the field depends on which end is searched
+    "distance": (None, 1)
+}
+
+class InvalidCursor(Exception):
+    """A cursor that is malformed or was issued for a different sort"""
+
+def encode_cursor(sort: str, value: Any, key: str) -> str:
+    """Opaque cursor for the position just after (value, key)"""
+    payload = json_util.dumps({"s": sort, "v": value, "id": key}, separators=(",", ":"))
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    try:
+        payload = json_util.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value, key = payload["v"], payload["id"]
+        ObjectId(key)
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+    if payload.get("s") != sort:
+        raise InvalidCursor(f"Cursor was issued for sort '{payload.get('s')}', not '{sort}'")
+    if isinstance(value, datetime):
+        value = value.replace(tzinfo=None)
+    return value, key
+
+def keyset_filter(field: str, direction: int, value: Any, key: str) -> Dict[str, Any]:
+    """
+    Mongo filter for documents after (value, key) in (field, _id) order.
+    Nulls sort first ascending and last descending, as MongoDB orders them.
+    """
+    oid = ObjectId(key)
+    if direction > 0:
+        if value is None:
+            return {"$or": [{field: {"$ne": None}}, {field: None, "_id": {"$gt": oid}}]}
+        return {"$or": [{field: {"$gt": value}}, {field: value, "_id": {"$gt": oid}}]}
+    if value is None:
+        return {field: None, "_id": {"$lt": oid}}
+    return {"$or": [{field: {"$lt": value}}, {field: value, "_id": {"$lt": oid}}, {field: None}]}
+
+def order_key(value: Any, key: str, direction: int) -> Tuple:
+    """Python sort key matching MongoDB's (field, _id) order, for the in-process index"""
+    oid = int(key, 16)
+    if direction > 0:
+        return (0, 0, oid) if value is None else (1, value, oid)
+    return (1, 0, -oid) if value is None else (0, -value, -oid)
+
+def mongo_sort(field: str, direction: int) -> List[Tuple[str, int]]:
+    return [(field, direction), ("_id", direction)]
+
+def projection(fields: Optional[List[str]], *required: str) -> Optional[Dict[str, int]]:
+    """Mongo projection for the requested fields plus those needed to page; None fetches everything"""
+    if not fields:
+        return None
+    return {field: 1 for field in (*fields, "load_id", *required)}
+
+def trim(doc: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Drop the paging-only fields a projected result didn't ask for"""
+    if not fields:
+        return doc
+    keep = {"_id", "load_id", *fields}
+    return {field: value for field, value in doc.items() if field in keep}
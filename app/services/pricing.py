@@ -0,0 +1,154 @@
+# app/services/pricing.py
+from typing import Any, Dict, Iterable, Optional, Tuple
+import json
+import logging
+import numpy as np
+from pydantic import BaseModel, Field
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Decision codes used by the vectorized engine, in the same order as ACTIONS
+ACCEPT, COUNTER, DECLINE_CONTINUE, TRANSFER = range(4)
+ACTIONS = ("accept", "counter_offer", "decline_continue", "transfer_to_rep")
+
+WILDCARD = "*"
+
+class PricingPolicy(BaseModel):
+    """Thresholds for evaluating an offer, as fractions of the listed rate"""
+    accept_ratio: float = Field(0.95, gt=0)   # accept offers at or above this share of the listed rate
+    floor_ratio: float = Field(0.85, gt=0)    # lowest share worth countering
+    counter_step: float = Field(0.3, ge=0, le=1)  # how far a counter moves from the offer toward the listed rate
+    max_rounds: int = Field(3, ge=1)          # transfer once the round exceeds this
+    decline_rounds: int = Field(2, ge=1)      # below-floor offers before this round get another chance
+    counter_floor_ratio: float = Field(0.0, ge=0)  # counters never go below this share of the listed rate
+
+DEFAULT_POLICY = PricingPolicy()
+
+def lane_key(origin_state: Optional[str], destination_state: Optional[str]) -> str:
+    return f"{origin_state or WILDCARD}-{destination_state or WILDCARD}".lower()
+
+def policy_key(lane: Optional[str], equipment: Optional[str]) -> str:
+    return f"{lane or WILDCARD}|{equipment or WILDCARD}".lower()
+
+class PolicyTable:
+    """
+    Pricing policies keyed by "<lane>|<equipment>", e.g. "TX-IL|reefer"
+    (case-insensitive; lanes and equipment use the normalized load fields).
+
+    Lookups fall back from the exact key to "<lane>|*", then "*|<equipment>",
+    then the default policy.
+    """
+
+    def __init__(self, policies: Optional[Dict[str, PricingPolicy]] = None, default: PricingPolicy = DEFAULT_POLICY):
+        self.default = default
+        self.policies = {key.lower(): policy for key, policy in (policies or {}).items()}
+        self._resolved: Dict[str, PricingPolicy] = {}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PolicyTable":
+        default = PricingPolicy(**data.get("default", {}))
+        policies = {
+            key: PricingPolicy(**{**default.model_dump(), **values})
+            for key, values in data.get("policies", {}).items()
+        }
+        return cls(policies, default)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PolicyTable":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def resolve(self, lane: Optional[str] = None, equipment: Optional[str] = None) -> PricingPolicy:
+        key = policy_key(lane, equipment)
+        policy = self._resolved.get(key)
+        if policy is None:
+            lane, equipment = key.split("|", 1)
+            for candidate in (key, policy_key(lane, None), policy_key(None, equipment)):
+                if candidate in self.policies:
+                    policy = self.policies[candidate]
+                    break
+            else:
+                policy = self.default
+            self._resolved[key] = policy
+        return policy
+
+    def parameters(self, keys: Iterable[str], codes: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Per-row policy parameters, resolving each distinct key once.
+
+        Pass one key per row, or the distinct keys plus an integer array of
+        row -> key positions (cheaper for large replays than sorting strings).
+        """
+        if codes is None:
+            keys, codes = np.unique(np.asarray(keys, dtype=str), return_inverse=True)
+        resolved = [self.resolve(*key.split("|", 1)) for key in keys]
+        return {
+            name: np.array([getattr(p, name) for p in resolved], dtype=np.float64)[codes]
+            for name in PricingPolicy.model_fields
+        }
+
+def decide(policy: PricingPolicy, base_rate: float, offered_rate: float, negotiation_round: int) -> Tuple[int, Optional[float], float]:
+    """Scalar decision for one offer: (action code, counter rate, floor)"""
+    floor = base_rate * policy.floor_ratio
+    if negotiation_round > policy.max_rounds:
+        return TRANSFER, None, floor
+    if offered_rate >= base_rate * policy.accept_ratio:
+        return ACCEPT, None, floor
+    if offered_rate >= floor:
+        counter_rate = max(offered_rate + (base_rate - offered_rate) * policy.counter_step, base_rate * policy.counter_floor_ratio)
+        return COUNTER, round(min(counter_rate, base_rate), 2), floor
+    if negotiation_round < policy.decline_rounds:
+        return DECLINE_CONTINUE, None, floor
+    return TRANSFER, None, floor
+
+def evaluate(
+    base_rates: np.ndarray,
+    offered_rates: np.ndarray,
+    rounds: np.ndarray,
+    policy: Optional[PricingPolicy] = None,
+    parameters: Optional[Dict[str, np.ndarray]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Evaluate many offers at once with the same rules as decide().
+
+    Uses a single policy, or per-row parameters from PolicyTable.parameters().
+    Returns (action codes, counter rates with NaN where there is no counter, floors).
+    """
+    base_rates = np.asarray(base_rates, dtype=np.float64)
+    offered_rates = np.asarray(offered_rates, dtype=np.float64)
+    rounds = np.asarray(rounds)
+
+    if parameters is None:
+        policy = policy or DEFAULT_POLICY
+        parameters = {name: getattr(policy, name) for name in PricingPolicy.model_fields}
+
+    floors = base_rates * parameters["floor_ratio"]
+    over_limit = rounds > parameters["max_rounds"]
+    accept = offered_rates >= base_rates * parameters["accept_ratio"]
+    counter = offered_rates >= floors
+    decline = rounds < parameters["decline_rounds"]
+
+    actions = np.select(
+        [over_limit, accept, counter, decline],
+        [TRANSFER, ACCEPT, COUNTER, DECLINE_CONTINUE],
+        default=TRANSFER
+    ).astype(np.int8)
+
+    counter_rates = np.maximum(
+        offered_rates + (base_rates - offered_rates) * parameters["counter_step"],
+        base_rates * parameters["counter_floor_ratio"]
+    )
+    counter_rates = np.where(actions == COUNTER, np.round(np.minimum(counter_rates, base_rates), 2), np.nan)
+    return actions, counter_rates, floors
+
+def _load_policies() -> PolicyTable:
+    if not settings.pricing_policy_path:
+        return PolicyTable()
+    try:
+        return PolicyTable.from_file(settings.pricing_policy_path)
+    except Exception as e:
+        logger.error(f"Failed to load pricing policies from {settings.pricing_policy_path}: {e}")
+        return PolicyTable()
+
+pricing_policies = _load_policies()
@@ -0,0 +1,248 @@
+# app/services/pricing_model.py
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import math
+from bson import ObjectId
+from app.core.config import settings
+from app.db.leases import acquire_lease, apply_window, id_window, settled_id, window_upsert
+from app.services.pricing import PricingPolicy, WILDCARD, policy_key
+
+logger = logging.getLogger(__name__)
+
+META_ID = "_meta"
+LOAD_PREFIX = "load:"
+
+def _key_expr(origin: str, destination: str, equipment: str) -> Dict[str, Any]:
+    """Mongo expression building the same "<lane>|<equipment>" key as policy_key()"""
+    return {"$concat": [
+        {"$ifNull": [origin, WILDCARD]}, "-",
+        {"$ifNull": [destination, WILDCARD]}, "|",
+        {"$ifNull": [equipment, WILDCARD]}
+    ]}
+
+class LaneStats:
+    """Booked rate statistics for one lane/equipment key"""
+    __slots__ = ("bookings", "rpm_mean", "rpm_std", "ratio_mean", "ratio_std")
+
+    def __init__(self, sums: Dict[str, float]):
+        n = sums.get("bookings", 0)
+        self.bookings = n
+        self.rpm_mean, self.rpm_std = _mean_std(n, sums.get("rpm_sum", 0.0), sums.get("rpm_sq_sum", 0.0))
+        self.ratio_mean, self.ratio_std = _mean_std(n, sums.get("ratio_sum", 0.0), sums.get("ratio_sq_sum", 0.0))
+
+def _mean_std(n: int, total: float, squares: float):
+    if not n:
+        return 0.0, 0.0
+    mean = total / n
+    return mean, math.sqrt(max(squares / n - mean * mean, 0.0))
+
+STAT_FIELDS = ("bookings", "rpm_sum", "rpm_sq_sum", "ratio_sum", "ratio_sq_sum")
+
+class PricingModel:
+    """
+    Lane/equipment booking statistics folded into a dynamic floor and counter.
+
+    A background job aggregates only the bookings and negotiations written
+    since the last run (by _id watermark) and adds them to running sums in
+    the pricing_stats collection; one worker holds a lease for that step.
+    A window is recorded before it is applied and each sum remembers the
+    last window added to it, so a run that dies before moving the watermark
+    is replayed without counting anything twice.
+    Every worker then reloads the small stats table into memory, so pricing
+    an offer is a dictionary lookup.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._lanes: Dict[str, LaneStats] = {}
+        self._carriers: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, db):
+        try:
+            await self.refresh(db)
+        except Exception as e:
+            logger.error(f"Pricing model refresh failed: {e}")
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db):
+        while True:
+            await asyncio.sleep(settings.pricing_model_refresh_seconds)
+            try:
+                await self.refresh(db)
+            except Exception as e:
+                logger.error(f"Pricing model refresh failed: {e}")
+
+    async def refresh(self, db):
+        # Only the lease holder adds each window to the sums
+        if await acquire_lease(db.pricing_stats, META_ID, settings.pricing_model_refresh_seconds * 2):
+            await self.aggregate(db)
+        await self.reload(db)
+
+    async def aggregate(self, db):
+        """Add bookings and negotiations written since the last watermark to the running sums"""
+        meta = await db.pricing_stats.find_one({"_id": META_ID}) or {}
+        watermarks = meta.get("watermarks", {})
+        # Replay an interrupted window with the same bounds, or cut a new one
+        pending = meta.get("pending")
+        if pending is None:
+            pending = {"id": ObjectId(), "upto": settled_id(settings.pricing_model_settle_seconds)}
+            await db.pricing_stats.update_one({"_id": META_ID}, {"$set": {"pending": pending}}, upsert=True)
+        upto, window_id = pending["upto"], pending["id"]
+
+        def window(collection: str) -> Dict[str, Any]:
+            return id_window(watermarks.get(collection), upto)
+
+        updates = []
+        async for row in db.bookings.aggregate([
+            {"$match": {"_id": window("bookings"), "agreed_rate": {"$gt": 0}}},
+            {"$lookup": {"from": "loads", "localField": "load_id", "foreignField": "load_id", "as": "load"}},
+            {"$unwind": "$load"},
+            {"$match": {"load.miles": {"$gt": 0}, "load.loadboard_rate": {"$gt": 0}}},
+            {"$project": {
+                "key": _key_expr("$load.origin_state_norm", "$load.destination_state_norm", "$load.equipment_norm"),
+                "rpm": {"$divide": ["$agreed_rate", "$load.miles"]},
+                "ratio": {"$divide": ["$agreed_rate", "$load.loadboard_rate"]}
+            }},
+            {"$group": {
+                "_id": "$key",
+                "bookings": {"$sum": 1},
+                "rpm_sum": {"$sum": "$rpm"},
+                "rpm_sq_sum": {"$sum": {"$multiply": ["$rpm", "$rpm"]}},
+                "ratio_sum": {"$sum": "$ratio"},
+                "ratio_sq_sum": {"$sum": {"$multiply": ["$ratio", "$ratio"]}}
+            }}
+        ]):
+            updates.append(window_upsert(
+                {"_id": row["_id"]},
+                {"$inc": {field: row[field] for field in STAT_FIELDS}, "$set": {"kind": "lane"}},
+                window_id
+            ))
+
+        # Each carrier's first offer on a load counts as one carrier who looked at it
+        async for row in db.negotiations.aggregate([
+            {"$match": {"_id": window("negotiations"), "negotiation_round": 1}},
+            {"$group": {"_id": "$load_id", "carriers": {"$sum": 1}}}
+        ]):
+            updates.append(window_upsert(
+                {"_id": f"{LOAD_PREFIX}{row['_id']}"},
+                {"$inc": {"carriers": row["carriers"]}, "$set": {"kind": "load", "load_id": row["_id"]}},
+                window_id
+            ))
+
+        await apply_window(db.pricing_stats, updates)
+        await self._prune_carriers(db)
+        await db.pricing_stats.update_one(
+            {"_id": META_ID},
+            {
+                "$set": {"watermarks.bookings": upto, "watermarks.negotiations": upto, "aggregated_at": datetime.utcnow()},
+                "$unset": {"pending": ""}
+            }
+        )
+
+    async def _prune_carriers(self, db):
+        """
+        Drop carrier counts of loads that are no longer available (booked,
+        expired, cancelled or deleted), so they don't pile up in every
+        worker's lookup table
+        """
+        load_ids = await db.pricing_stats.distinct("load_id", {"kind": "load"})
+        if not load_ids:
+            return
+        object_ids = [ObjectId(load_id) for load_id in load_ids if ObjectId.is_valid(load_id)]
+        available = set()
+        async for load in db.loads.find(
+            {"status": "available", "$or": [{"load_id": {"$in": load_ids}}, {"_id": {"$in": object_ids}}]},
+            {"load_id": 1}
+        ):
+            available.update((load.get("load_id"), str(load["_id"])))
+        stale = [load_id for load_id in load_ids if load_id not in available]
+        if stale:
+            await db.pricing_stats.delete_many({"kind": "load", "load_id": {"$in": stale}})
+
+    async def reload(self, db):
+        """Rebuild the in-memory lookup tables from the running sums"""
+        sums: Dict[str, Dict[str, float]] = {}
+        carriers: Dict[str, int] = {}
+        async for doc in db.pricing_stats.find({"kind": {"$in": ["lane", "load"]}}):
+            if doc["kind"] == "load":
+                carriers[doc["load_id"]] = doc.get("carriers", 0)
+                continue
+            sums[doc["_id"]] = doc
+            # Roll lanes up per equipment type as the fallback for thin lanes
+            equipment = doc["_id"].split("|", 1)[1]
+            rollup = sums.setdefault(policy_key(None, equipment), {field: 0 for field in STAT_FIELDS})
+            for field in STAT_FIELDS:
+                rollup[field] += doc.get(field, 0)
+
+        self._lanes = {key: LaneStats(values) for key, values in sums.items()}
+        self._carriers = carriers
+        self.ready = True
+
+    def lane_stats(self, lane: Optional[str], equipment: Optional[str]) -> Optional[LaneStats]:
+        for key in (policy_key(lane, equipment), policy_key(None, equipment)):
+            stats = self._lanes.get(key)
+            if stats is not None and stats.bookings >= settings.pricing_model_min_samples:
+                return stats
+        return None
+
+    def adjust(
+        self,
+        policy: PricingPolicy,
+        base_rate: float,
+        lane: Optional[str] = None,
+        equipment: Optional[str] = None,
+        load_id: Optional[str] = None,
+        miles: Optional[float] = None,
+        pickup_datetime: Optional[datetime] = None
+    ) -> PricingPolicy:
+        """
+        Move the policy's floor toward what the lane actually books at, then
+        lower it for loads other carriers have passed on and for urgent pickups.
+        The floor stays within pricing_model_max_adjust of the policy.
+        """
+        if not self.ready or base_rate <= 0:
+            return policy
+
+        floor_ratio = policy.floor_ratio
+        counter_floor_ratio = policy.counter_floor_ratio
+
+        stats = self.lane_stats(lane, equipment)
+        if stats is not None:
+            if miles and stats.rpm_mean:
+                market, spread = stats.rpm_mean * miles / base_rate, stats.rpm_std * miles / base_rate
+            else:
+                market, spread = stats.ratio_mean, stats.ratio_std
+            floor_ratio = market - spread
+            counter_floor_ratio = max(counter_floor_ratio, min(market, policy.accept_ratio))
+
+        if load_id:
+            floor_ratio -= self._carriers.get(load_id, 0) * settings.pricing_model_carrier_step
+        if pickup_datetime is not None:
+            if pickup_datetime.tzinfo is not None:
+                pickup_datetime = pickup_datetime.astimezone(timezone.utc).replace(tzinfo=None)
+            days_out = (pickup_datetime - datetime.utcnow()).total_seconds() / 86400
+            if days_out <= settings.pricing_model_urgent_days:
+                floor_ratio -= settings.pricing_model_urgent_discount
+
+        max_adjust = settings.pricing_model_max_adjust
+        floor_ratio = min(max(floor_ratio, policy.floor_ratio - max_adjust), policy.floor_ratio + max_adjust)
+        floor_ratio = min(floor_ratio, policy.accept_ratio - 0.01)
+
+        if floor_ratio == policy.floor_ratio and counter_floor_ratio == policy.counter_floor_ratio:
+            return policy
+        return policy.model_copy(update={"floor_ratio": floor_ratio, "counter_floor_ratio": counter_floor_ratio})
+
+pricing_model = PricingModel()
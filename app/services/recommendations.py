@@ -0,0 +1,262 @@
+# app/services/recommendations.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import numpy as np
+from pydantic import BaseModel, Field
+from app.core.config import settings
+from app.services.normalization import normalize_equipment, normalize_mc, normalize_state, split_location
+from app.services.pricing import lane_key
+
+logger = logging.getLogger(__name__)
+
+# Pseudo-counts pulling a thin carrier's acceptance rate toward the overall rate
+ACCEPTANCE_PRIOR_WEIGHT = 5.0
+
+class ScoringWeights(BaseModel):
+    """Relative weight of each feature in a load's score; features are scaled to 0..1"""
+    lane: float = Field(0.3, ge=0)        # carrier has run or prefers this lane (or its origin state)
+    equipment: float = Field(0.2, ge=0)   # carrier runs this equipment
+    acceptance: float = Field(0.15, ge=0) # carrier's offer acceptance rate on the lane
+    deadhead: float = Field(0.15, ge=0)   # closer to the carrier's search origin
+    rate_per_mile: float = Field(0.2, ge=0)  # better paying among the candidates
+
+FEATURES = tuple(ScoringWeights.model_fields)
+
+class CarrierProfile:
+    """What a carrier tends to book, precomputed from the analytics rollups and the carriers collection"""
+    __slots__ = ("mc_number", "lanes", "origins", "equipment", "acceptance", "lane_acceptance", "bookings")
+
+    def __init__(self, mc_number: str):
+        self.mc_number = mc_number
+        self.lanes: Dict[str, float] = {}
+        self.origins: Dict[str, float] = {}
+        self.equipment: Dict[str, float] = {}
+        self.acceptance: Optional[float] = None
+        self.lane_acceptance: Dict[str, float] = {}
+        self.bookings = 0
+
+def _preferred_lane(preference: Any) -> Optional[str]:
+    """Lane key for a carriers.preferred_lanes entry: {"origin": "Dallas, TX", "destination": "IL"} or state fields"""
+    if isinstance(preference, str):
+        origin, _, destination = preference.partition("-")
+        preference = {"origin_state": origin, "destination_state": destination}
+    if not isinstance(preference, dict):
+        return None
+
+    def state(end: str) -> Optional[str]:
+        if preference.get(f"{end}_state"):
+            return normalize_state(preference[f"{end}_state"])
+        city, code = split_location(preference.get(end))
+        return code or normalize_state(city) or None
+
+    origin, destination = state("origin"), state("destination")
+    return lane_key(origin, destination) if origin or destination else None
+
+def _shares(counts: Dict[str, float]) -> Dict[str, float]:
+    """Scale counts so the carrier's most frequent value is 1"""
+    top = max(counts.values(), default=0)
+    return {key: count / top for key, count in counts.items()} if top else {}
+
+def _smoothed(accepted: float, offers: float, prior: float) -> float:
+    return (accepted + ACCEPTANCE_PRIOR_WEIGHT * prior) / (offers + ACCEPTANCE_PRIOR_WEIGHT)
+
+class RecommendationEngine:
+    """
+    Rank candidate loads for a carrier.
+
+    Carrier profiles (lane and equipment affinity, acceptance rates) are
+    rebuilt in the background from the daily analytics rollups and the
+    carriers collection, so scoring a call's candidates is a few dict
+    lookups followed by one vectorized weighted sum and a top-k partition.
+    """
+
+    def __init__(self, weights: Optional[ScoringWeights] = None):
+        self.weights = weights or ScoringWeights()
+        self.ready = False
+        self.acceptance_prior = 0.5
+        self._profiles: Dict[str, CarrierProfile] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    async def start(self, db):
+        try:
+            await self.refresh(db)
+        except Exception as e:
+            logger.error(f"Carrier profile refresh failed: {e}")
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db):
+        while True:
+            await asyncio.sleep(settings.recommendation_refresh_seconds)
+            try:
+                await self.refresh(db)
+            except Exception as e:
+                logger.error(f"Carrier profile refresh failed: {e}")
+
+    async def refresh(self, db):
+        """Rebuild every carrier profile and swap them in"""
+        since = datetime.utcnow() - timedelta(days=settings.recommendation_lookback_days)
+        lanes: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        equipment: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        offers: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0.0, 0.0]))
+        bookings: Dict[str, int] = defaultdict(int)
+        total_offers = total_accepted = 0.0
+
+        async for row in db.analytics_daily.aggregate([
+            {"$match": {"bucket": {"$gte": since}, "mc_number": {"$ne": None}}},
+            {"$group": {
+                "_id": {"mc_number": "$mc_number", "lane": "$lane", "equipment": "$equipment"},
+                "calls": {"$sum": "$calls"},
+                "bookings": {"$sum": "$bookings"},
+                "negotiations": {"$sum": "$negotiations"},
+                "accepted_offers": {"$sum": "$accepted_offers"}
+            }}
+        ]):
+            key = row["_id"]
+            # Rollups written before MC numbers were normalized may still hold "MC123" next to "123"
+            mc_number, lane = normalize_mc(key["mc_number"]), key.get("lane")
+            if mc_number is None:
+                continue
+            # A booking says far more about a carrier's lanes than a call that went nowhere
+            interest = (row.get("bookings") or 0) + 0.25 * (row.get("calls") or 0)
+            if lane:
+                lanes[mc_number][lane] += interest
+            if key.get("equipment"):
+                equipment[mc_number][key["equipment"]] += interest
+            negotiations, accepted = row.get("negotiations") or 0, row.get("accepted_offers") or 0
+            offers[mc_number][lane][0] += accepted
+            offers[mc_number][lane][1] += negotiations
+            bookings[mc_number] += row.get("bookings") or 0
+            total_accepted += accepted
+            total_offers += negotiations
+
+        prior = total_accepted / total_offers if total_offers else 0.5
+        preferences = {}
+        async for carrier in db.carriers.find(
+            {"$or": [{"preferred_lanes.0": {"$exists": True}}, {"preferred_equipment.0": {"$exists": True}}]},
+            {"mc_number": 1, "preferred_lanes": 1, "preferred_equipment": 1}
+        ):
+            mc_number = normalize_mc(carrier.get("mc_number"))
+            if mc_number is not None:
+                preferences[mc_number] = carrier
+
+        profiles = {}
+        for mc_number in set(lanes) | set(equipment) | set(offers) | set(preferences):
+            profile = CarrierProfile(mc_number)
+            profile.lanes = _shares(lanes.get(mc_number, {}))
+            profile.equipment = _shares(equipment.get(mc_number, {}))
+            carrier = preferences.get(mc_number, {})
+            for preference in carrier.get("preferred_lanes") or []:
+                lane = _preferred_lane(preference)
+                if lane:
+                    profile.lanes[lane] = 1.0
+            for preferred in carrier.get("preferred_equipment") or []:
+                profile.equipment[normalize_equipment(preferred)] = 1.0
+            for lane, share in profile.lanes.items():
+                origin = lane.split("-", 1)[0]
+                profile.origins[origin] = max(profile.origins.get(origin, 0.0), share)
+
+            carrier_offers = offers.get(mc_number, {})
+            accepted = sum(values[0] for values in carrier_offers.values())
+            negotiations = sum(values[1] for values in carrier_offers.values())
+            profile.acceptance = _smoothed(accepted, negotiations, prior) if negotiations else None
+            profile.lane_acceptance = {
+                lane: _smoothed(values[0], values[1], profile.acceptance)
+                for lane, values in carrier_offers.items()
+                if lane and values[1]
+            }
+            profile.bookings = bookings.get(mc_number, 0)
+            profiles[mc_number] = profile
+
+        self._profiles = profiles
+        self.acceptance_prior = prior
+        self.ready = True
+        logger.info(f"Built {len(profiles)} carrier profiles")
+
+    def profile(self, mc_number: Optional[str]) -> Optional[CarrierProfile]:
+        """Profile of a carrier, keyed by bare MC digits like the analytics rollups"""
+        mc_number = normalize_mc(mc_number)
+        return self._profiles.get(mc_number) if mc_number else None
+
+    def features(self, profile: Optional[CarrierProfile], loads: List[Dict[str, Any]]) -> np.ndarray:
+        """(len(loads), len(FEATURES)) matrix of 0..1 feature values; unknowns score a neutral 0.5"""
+        n = len(loads)
+        lane = np.full(n, 0.5)
+        equipment = np.full(n, 0.5)
+        acceptance = np.full(n, profile.acceptance if profile and profile.acceptance is not None else self.acceptance_prior)
+        deadhead = np.full(n, np.nan)
+        rate_per_mile = np.full(n, np.nan)
+
+        for i, load in enumerate(loads):
+            key = lane_key(load.get("origin_state_norm"), load.get("destination_state_norm"))
+            if profile is not None:
+                if profile.lanes or profile.origins:
+                    lane[i] = profile.lanes.get(key) or 0.5 * profile.origins.get(load.get("origin_state_norm") or "", 0.0)
+                if profile.equipment:
+                    equipment[i] = profile.equipment.get(load.get("equipment_norm") or "", 0.0)
+                if key in profile.lane_acceptance:
+                    acceptance[i] = profile.lane_acceptance[key]
+            if load.get("deadhead_miles") is not None:
+                deadhead[i] = load["deadhead_miles"]
+            if load.get("rate_per_mile") is not None:
+                rate_per_mile[i] = load["rate_per_mile"]
+
+        deadhead = np.where(
+            np.isnan(deadhead), 0.5,
+            1.0 - np.clip(deadhead / settings.recommendation_max_deadhead_miles, 0.0, 1.0)
+        )
+        # Rate per mile is judged against the other candidates on the call
+        known = ~np.isnan(rate_per_mile)
+        if known.any():
+            low, high = np.nanmin(rate_per_mile), np.nanmax(rate_per_mile)
+            scaled = (rate_per_mile - low) / (high - low) if high > low else np.ones(n)
+            rate_per_mile = np.where(known, scaled, 0.5)
+        else:
+            rate_per_mile = np.full(n, 0.5)
+
+        return np.column_stack([lane, equipment, acceptance, deadhead, rate_per_mile])
+
+    def rank(
+        self,
+        mc_number: Optional[str],
+        loads: List[Dict[str, Any]],
+        k: int,
+        explain: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Top-k loads for the carrier, best first, each with its score (and per-feature contributions)"""
+        if not loads:
+            return []
+        weights = np.array([getattr(self.weights, name) for name in FEATURES])
+        weights = weights / weights.sum()
+        contributions = self.features(self.profile(mc_number), loads) * weights
+        scores = contributions.sum(axis=1)
+
+        k = min(k, len(loads))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        ranked = []
+        for i in top:
+            load = dict(loads[i])
+            load["score"] = round(float(scores[i]), 4)
+            if explain:
+                load["score_breakdown"] = {name: round(float(value), 4) for name, value in zip(FEATURES, contributions[i])}
+            ranked.append(load)
+        return ranked
+
+recommendation_engine = RecommendationEngine()
@@ -0,0 +1,98 @@
+# app/services/stats_stream.py
+from typing import Any, AsyncIterator, Dict, Optional, Set
+import asyncio
+import json
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class TooManySubscribers(Exception):
+    """The stream already has the configured maximum of connected clients"""
+
+class Subscriber:
+    """One connected client: a bounded queue of pending messages"""
+    __slots__ = ("queue", "resync")
+
+    def __init__(self, max_pending: int):
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_pending)
+        self.resync = False
+
+class StatsBroker:
+    """
+    In-process fan-out of dashboard updates to every connected stream.
+
+    Publishing never blocks: a client that falls behind has its pending
+    deltas dropped and is sent one full snapshot once it catches up.
+    """
+
+    def __init__(self, max_subscribers: int = 100, max_pending: int = 100):
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self._subscribers: Set[Subscriber] = set()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        if len(self._subscribers) >= self.max_subscribers:
+            raise TooManySubscribers()
+        subscriber = Subscriber(self.max_pending)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, message: Dict[str, Any]):
+        for subscriber in self._subscribers:
+            if subscriber.resync:
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow client: deltas would arrive stale anyway, replace them with a snapshot
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.resync = True
+                subscriber.queue.put_nowait({"type": "resync"})
+                self.dropped += 1
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, default=str, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+async def stream(broker: StatsBroker, subscriber: Subscriber, snapshot) -> AsyncIterator[str]:
+    """
+    Server-sent events for one subscriber: a full snapshot first, then deltas
+    as they are published, with a comment line as heartbeat when idle.
+    `snapshot` returns (version, summary) for the current state.
+    """
+    try:
+        version, summary = snapshot()
+        yield f"retry: {settings.stats_stream_retry_ms}\n\n"
+        yield format_event("snapshot", summary, version)
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), settings.stats_stream_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+
+            if message["type"] == "resync":
+                subscriber.resync = False
+                version, summary = snapshot()
+                yield format_event("snapshot", summary, version)
+            else:
+                yield format_event(message["type"], message["data"], message.get("version"))
+    finally:
+        broker.unsubscribe(subscriber)
+
+stats_broker = StatsBroker(
+    max_subscribers=settings.stats_stream_max_clients,
+    max_pending=settings.stats_stream_max_pending
+)
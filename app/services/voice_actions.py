@@ -0,0 +1,209 @@
+# app/services/voice_actions.py
+from typing import Optional
+from datetime import datetime
+from app.core.config import settings
+from app.db.write_behind import write_behind
+from app.schemas.voice import (
+    VerifyCarrierParams, VerifyCarrierResponse,
+    SearchLoadsParams, SearchLoadsResponse, LoadSummary,
+    NegotiateRateParams, NegotiateRateResponse,
+    BookLoadParams, BookLoadResponse, BookingDetails,
+    LogCallParams, LogCallResponse,
+    BatchParams, BatchResponse
+)
+from app.services import loads as load_service
+from app.services.actions import ActionRegistry
+from app.services.batch import BATCH_ACTION, run_batch
+from app.services.carrier_verification import carrier_verification_service
+from app.services.dashboard_metrics import dashboard_metrics
+from app.services.loads import InvalidSearch, LoadNotAvailable, LoadNotFound
+from app.services.negotiation_sessions import negotiation_sessions
+from app.services.pagination import InvalidCursor
+import logging
+
+logger = logging.getLogger(__name__)
+
+voice_actions = ActionRegistry()
+
+# What a spoken search result and its negotiation session need from each load
+VOICE_SEARCH_FIELDS = [
+    "origin", "destination", "loadboard_rate", "pickup_datetime", "delivery_datetime",
+    "miles", "weight", "commodity_type", "origin_state_norm", "destination_state_norm", "equipment_norm",
+    "rate_per_mile"
+]
+
+@voice_actions.register("verify_carrier", VerifyCarrierParams, VerifyCarrierResponse)
+async def verify_carrier(session_id: Optional[str], params: VerifyCarrierParams) -> VerifyCarrierResponse:
+    """Verify carrier using MC number"""
+    if not params.mc_number:
+        return VerifyCarrierResponse(
+            success=False,
+            message="MC number is required for verification"
+        )
+
+    try:
+        result = await carrier_verification_service.verify(params.mc_number)
+
+        return VerifyCarrierResponse(
+            success=True,
+            is_eligible=result["is_eligible"],
+            carrier_name=result.get("carrier_name", "Unknown"),
+            safety_rating=result.get("safety_rating", "Not Rated"),
+            message=f"Carrier {result.get('carrier_name', 'Unknown')} verified successfully" if result["is_eligible"]
+                    else "Carrier is not eligible to book loads"
+        )
+    except Exception as e:
+        logger.error(f"Carrier verification failed: {str(e)}")
+        return VerifyCarrierResponse(
+            success=False,
+            message="Unable to verify carrier at this time"
+        )
+
+@voice_actions.register("search_loads", SearchLoadsParams, SearchLoadsResponse)
+async def search_loads(session_id: Optional[str], params: SearchLoadsParams) -> SearchLoadsResponse:
+    """Search for loads based on carrier criteria"""
+    try:
+        criteria = params.model_dump(exclude={"mc_number", "sort", "cursor", "limit"})
+        if params.mc_number and not (params.sort or params.cursor) and settings.recommendations_enabled:
+            # Lead with the loads this carrier is most likely to take
+            loads = await load_service.recommend_loads(params.mc_number, params.limit, VOICE_SEARCH_FIELDS, **criteria)
+            page = {"loads": loads, "next_cursor": None}
+        else:
+            page = await load_service.search_loads(
+                **criteria, sort=params.sort, cursor=params.cursor, fields=VOICE_SEARCH_FIELDS, limit=params.limit
+            )
+        loads = page["loads"]
+
+        if not loads:
+            return SearchLoadsResponse(
+                success=True,
+                loads=[],
+                message="No loads currently available matching your criteria"
+            )
+
+        # Format loads for voice response
+        formatted_loads = [LoadSummary.from_load(load) for load in loads]
+
+        # Capture pricing inputs now so negotiating on these loads needs no lookup
+        if session_id:
+            await negotiation_sessions.prime(session_id, loads)
+
+        return SearchLoadsResponse(
+            success=True,
+            loads=formatted_loads,
+            next_cursor=page["next_cursor"],
+            message=f"Found {len(formatted_loads)} loads matching your criteria"
+        )
+
+    except (InvalidSearch, InvalidCursor) as e:
+        return SearchLoadsResponse(success=False, message=str(e))
+    except Exception as e:
+        logger.error(f"Load search failed: {str(e)}")
+        return SearchLoadsResponse(
+            success=False,
+            message="Unable to search loads at this time"
+        )
+
+@voice_actions.register("negotiate_rate", NegotiateRateParams, NegotiateRateResponse)
+async def negotiate_rate(session_id: Optional[str], params: NegotiateRateParams) -> NegotiateRateResponse:
+    """Handle rate negotiation"""
+    try:
+        result = await load_service.negotiate_rate(
+            load_id=params.load_id,
+            offered_rate=params.offered_rate,
+            negotiation_round=params.negotiation_round,
+            mc_number=params.mc_number,
+            session_id=session_id
+        )
+
+        return NegotiateRateResponse(
+            success=True,
+            action=result["action"],
+            message=result["message"],
+            counter_rate=result.get("counter_rate"),
+            accepted=result.get("accepted", False)
+        )
+
+    except Exception as e:
+        logger.error(f"Negotiation failed: {str(e)}")
+        return NegotiateRateResponse(
+            success=False,
+            message="Unable to process negotiation"
+        )
+
+@voice_actions.register("book_load", BookLoadParams, BookLoadResponse)
+async def book_load(session_id: Optional[str], params: BookLoadParams) -> BookLoadResponse:
+    """Book a load for a carrier"""
+    try:
+        result = await load_service.book_load(
+            load_id=params.load_id,
+            mc_number=params.mc_number,
+            agreed_rate=params.agreed_rate
+        )
+
+        return BookLoadResponse(
+            success=True,
+            message=result["message"],
+            booking_details=BookingDetails(
+                load_id=params.load_id,
+                mc_number=params.mc_number,
+                agreed_rate=params.agreed_rate
+            )
+        )
+
+    except LoadNotAvailable:
+        return BookLoadResponse(success=False, message="This load has already been booked", definitive=True)
+
+    except LoadNotFound:
+        return BookLoadResponse(success=False, message="Load not found", definitive=True)
+
+    except Exception as e:
+        logger.error(f"Booking failed: {str(e)}")
+        return BookLoadResponse(
+            success=False,
+            message="Unable to book load at this time"
+        )
+
+@voice_actions.register("log_call", LogCallParams, LogCallResponse)
+async def log_call(session_id: Optional[str], params: LogCallParams) -> LogCallResponse:
+    """Log call data for reporting"""
+    try:
+        call_log = {
+            "call_id": session_id,
+            **params.model_dump(),
+            "negotiation_history": [],
+            "created_at": datetime.utcnow()
+        }
+
+        if session_id:
+            # The history covers every load discussed; rounds and rates come from the logged load's
+            sessions = await negotiation_sessions.finalize(session_id)
+            call_log["negotiation_history"] = [entry for session in sessions for entry in session.history]
+            logged = [session for session in sessions if session.load_id == params.load_id] if params.load_id else sessions
+            logged_history = [entry for session in logged for entry in session.history]
+            if logged_history:
+                call_log["negotiation_rounds"] = len(logged_history)
+                call_log["initial_offer"] = logged_history[0]["offered_rate"]
+                accepted = [session.final_rate for session in logged if session.status == "accepted"]
+                if call_log["final_rate"] is None and accepted:
+                    call_log["final_rate"] = accepted[-1]
+
+        await write_behind.enqueue("call_logs", call_log)
+        dashboard_metrics.call_logged(call_log)
+
+        return LogCallResponse(
+            success=True,
+            message="Call data logged successfully"
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to log call data: {str(e)}")
+        return LogCallResponse(
+            success=False,
+            message="Failed to log call data"
+        )
+
+@voice_actions.register(BATCH_ACTION, BatchParams, BatchResponse)
+async def batch(session_id: Optional[str], params: BatchParams) -> BatchResponse:
+    """Run several actions from one webhook, e.g. search then book the first result"""
+    return await run_batch(voice_actions, session_id, params)
@@ -0,0 +1,136 @@
+# benchmarks/action_dispatch.py
+"""
+Measure per-action dispatch overhead of the voice webhook router.
+
+Compares the old path (json.loads + if/elif on "action" + dict lookups)
+with the registry path (decode, one pydantic-core validation into the typed
+request, table lookup, action metrics, response serialization). Handlers
+are replaced by no-ops so only routing/parsing cost is measured.
+
+The registry does more than the old path: it validates and coerces every
+parameter and times each action. On small bodies that costs a few
+microseconds per call. On a log_call with a transcript it is faster,
+because orjson decodes the body faster than json.loads does. Registry
+parsing decodes with orjson and then validates the Python objects. Using
+validate_json on the raw bytes was 2-2.5x slower than the old path for
+log_call on pydantic 2.4.
+
+    python benchmarks/action_dispatch.py
+    python benchmarks/action_dispatch.py --payloads webhook_samples.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("API_KEY", "benchmark")
+os.environ.setdefault("FMCSA_API_KEY", "benchmark")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+from app.services.actions import ActionRegistry
+from app.services.voice_actions import voice_actions
+
+SAMPLE_PAYLOADS = [
+    {"session_id": "call-001", "action": "verify_carrier", "parameters": {"mc_number": "MC123456"}},
+    {"session_id": "call-001", "action": "search_loads", "parameters": {
+        "origin": "Dallas, TX", "destination": "Chicago", "equipment_type": "Dry Van", "origin_radius_miles": 75
+    }},
+    {"session_id": "call-001", "action": "negotiate_rate", "parameters": {
+        "load_id": "LD100001", "offered_rate": "2150.00", "negotiation_round": 2, "mc_number": "MC123456"
+    }},
+    {"session_id": "call-001", "action": "book_load", "parameters": {
+        "load_id": "LD100001", "mc_number": "MC123456", "agreed_rate": 2200
+    }},
+    {"session_id": "call-001", "action": "log_call", "parameters": {
+        "mc_number": "MC123456", "load_id": "LD100001", "outcome": "booked", "sentiment": "positive",
+        "final_rate": 2200, "negotiation_rounds": 2, "duration": 312,
+        "transcript": [{"role": "agent" if i % 2 else "carrier", "text": "word " * 40} for i in range(60)]
+    }}
+]
+
+def load_payloads(path):
+    if not path:
+        return SAMPLE_PAYLOADS
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def build_noop_registry() -> ActionRegistry:
+    """Same schemas as the real registry, with handlers that do nothing"""
+    registry = ActionRegistry()
+    for name in ("verify_carrier", "search_loads", "negotiate_rate", "book_load", "log_call"):
+        action = voice_actions.get(name)
+        response = action.response_model(success=True, message="ok")
+        
+        async def handler(session_id, params, response=response):
+            return response
+        
+        registry.register(name, action.params_model, action.response_model)(handler)
+    return registry
+
+async def legacy_dispatch(body: bytes):
+    payload = json.loads(body)
+    session_id = payload.get("session_id")
+    action = payload.get("action")
+    params = payload.get("parameters", {})
+    if action == "verify_carrier":
+        result = {"success": True, "mc": params.get("mc_number")}
+    elif action == "search_loads":
+        result = {"success": True, "o": params.get("origin"), "d": params.get("destination")}
+    elif action == "negotiate_rate":
+        result = {"success": True, "r": params.get("offered_rate")}
+    elif action == "book_load":
+        result = {"success": True, "l": params.get("load_id")}
+    elif action == "log_call":
+        result = {"success": True, "s": session_id}
+    else:
+        result = {"error": f"Unknown action: {action}"}
+    return json.dumps(result).encode()
+
+async def registry_dispatch(registry: ActionRegistry, body: bytes):
+    result = await registry.dispatch(body)
+    return result.model_dump_json(exclude_none=True)
+
+async def measure(fn, body: bytes, iterations: int) -> float:
+    for _ in range(min(1000, iterations)):
+        await fn(body)
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        await fn(body)
+    return (time.perf_counter_ns() - start) / iterations
+
+async def run(payloads, iterations: int):
+    registry = build_noop_registry()
+    registry.adapter  # build the union validator before timing
+    
+    rows = defaultdict(lambda: [0.0, 0.0, 0])
+    for payload in payloads:
+        body = json.dumps(payload).encode()
+        legacy = await measure(legacy_dispatch, body, iterations)
+        typed = await measure(lambda b: registry_dispatch(registry, b), body, iterations)
+        row = rows[payload.get("action")]
+        row[0] += legacy
+        row[1] += typed
+        row[2] += 1
+    
+    print(f"{'action':<16} {'legacy ns/op':>14} {'registry ns/op':>16} {'bytes':>8}")
+    for payload in payloads:
+        action = payload.get("action")
+        if action not in rows:
+            continue
+        legacy, typed, count = rows.pop(action)
+        size = len(json.dumps(payload))
+        print(f"{action:<16} {legacy / count:>14,.0f} {typed / count:>16,.0f} {size:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--payloads", help="JSONL file of webhook payloads (defaults to built-in samples)")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(load_payloads(args.payloads), args.iterations))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/booking_race.py
+"""
+Fire N simultaneous bookings at one load and check exactly one wins, then
+re-list the load and race again to check the second booking gets its own
+bookings row.
+
+Runs against a local mongod (MONGODB_URL, default mongodb://localhost:27017)
+or, with --mock, against an in-process mongomock-motor stand-in
+(pip install mongomock-motor):
+
+    python benchmarks/booking_race.py --concurrency 200
+    python benchmarks/booking_race.py --mock
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("API_KEY", "benchmark")
+os.environ.setdefault("FMCSA_API_KEY", "benchmark")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+from fastapi import HTTPException
+from app.api.endpoints.loads import book_load
+from app.core.config import settings
+from app.db.indexes import ensure_indexes
+from app.db.sessions import mongodb
+
+def create_client(mock: bool):
+    if mock:
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(os.environ["MONGODB_URL"])
+
+async def attempt(load_id: str, carrier: int):
+    start = time.perf_counter()
+    try:
+        await book_load(load_id=load_id, mc_number=f"MC{carrier}", agreed_rate=2000.0, api_key=settings.api_key)
+        outcome = "won"
+    except HTTPException as e:
+        outcome = "conflict" if e.status_code == 409 else f"http_{e.status_code}"
+    return outcome, time.perf_counter() - start
+
+async def run(concurrency: int, rounds: int, mock: bool) -> bool:
+    client = create_client(mock)
+    db = client.booking_race_benchmark
+    mongodb.client, mongodb.database = client, db
+    
+    ok = True
+    latencies = []
+    try:
+        await ensure_indexes(db)
+        
+        for round_number in range(rounds):
+            load_id = f"RACE{round_number}"
+            await db.loads.delete_many({"load_id": load_id})
+            await db.bookings.delete_many({"load_id": load_id})
+            await db.loads.insert_one({
+                "load_id": load_id,
+                "loadboard_rate": 2000.0,
+                "status": "available",
+                "created_at": datetime.utcnow()
+            })
+            
+            for listing in (1, 2):
+                if listing == 2:
+                    await db.loads.update_one({"load_id": load_id}, {"$set": {"status": "available"}})
+                
+                results = await asyncio.gather(*(attempt(load_id, i) for i in range(concurrency)))
+                outcomes = [outcome for outcome, _ in results]
+                latencies.extend(latency for _, latency in results)
+                
+                winners = outcomes.count("won")
+                bookings = await db.bookings.count_documents({"load_id": load_id})
+                load = await db.loads.find_one({"load_id": load_id})
+                round_ok = winners == 1 and bookings == listing and load["status"] == "booked"
+                ok = ok and round_ok
+                
+                print(
+                    f"round {round_number} listing {listing}: winners={winners} conflicts={outcomes.count('conflict')} "
+                    f"bookings={bookings} booked_by={load.get('booked_by')} {'OK' if round_ok else 'FAIL'}"
+                )
+    finally:
+        await db.loads.drop()
+        await db.bookings.drop()
+        client.close()
+    
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{len(latencies)} attempts, p50={p50:.2f}ms p99={p99:.2f}ms")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--mock", action="store_true", help="use mongomock-motor instead of a local mongod")
+    args = parser.parse_args()
+    
+    ok = asyncio.run(run(args.concurrency, args.rounds, args.mock))
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
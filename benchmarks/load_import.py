@@ -0,0 +1,126 @@
+# benchmarks/load_import.py
+"""
+Import a generated file of N loads and report throughput and peak RSS.
+
+The file is written to a temp directory row by row, then run through the
+same streaming pipeline as POST /api/loads/import and
+scripts/import_loads.py. Runs against a local mongod (MONGODB_URL, default
+mongodb://localhost:27017) or, with --mock, against an in-process
+mongomock-motor stand-in (pip install mongomock-motor). --dry-run skips
+the writes to measure parsing and validation alone.
+
+    python benchmarks/load_import.py --rows 1000000
+    python benchmarks/load_import.py --rows 1000000 --format jsonl --dry-run
+    python benchmarks/load_import.py --rows 100000 --mock
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import resource
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("API_KEY", "benchmark")
+os.environ.setdefault("FMCSA_API_KEY", "benchmark")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+from app.services.load_import import import_lines
+
+CITIES = ["Dallas, TX", "Chicago, IL", "Atlanta, GA", "Denver, CO", "Phoenix, AZ", "Memphis, TN", "Columbus, OH"]
+EQUIPMENT = ["Dry Van", "Reefer", "Flatbed"]
+FIELDS = [
+    "load_id", "origin", "destination", "pickup_datetime", "delivery_datetime", "equipment_type",
+    "loadboard_rate", "notes", "weight", "commodity_type", "num_of_pieces", "miles", "dimensions"
+]
+
+def generate_rows(count: int, invalid_every: int):
+    rng = random.Random(42)
+    start = datetime(2026, 1, 1)
+    for i in range(count):
+        pickup = start + timedelta(hours=rng.randrange(24 * 60))
+        row = {
+            "load_id": f"BENCH{i:07d}",
+            "origin": rng.choice(CITIES),
+            "destination": rng.choice(CITIES),
+            "pickup_datetime": pickup.isoformat(),
+            "delivery_datetime": (pickup + timedelta(days=2)).isoformat(),
+            "equipment_type": rng.choice(EQUIPMENT),
+            "loadboard_rate": round(rng.uniform(800, 4000), 2),
+            "notes": "Call on arrival, dock 4" if i % 10 == 0 else "",
+            "weight": rng.randrange(5000, 45000),
+            "commodity_type": "General freight",
+            "num_of_pieces": rng.randrange(1, 30),
+            "miles": rng.randrange(100, 2000),
+            "dimensions": "48x40x60"
+        }
+        if invalid_every and i % invalid_every == invalid_every - 1:
+            row["loadboard_rate"] = "n/a"
+        yield row
+
+def write_file(path: str, fmt: str, count: int, invalid_every: int):
+    with open(path, "w", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in generate_rows(count, invalid_every):
+                writer.writerow(row)
+        else:
+            for row in generate_rows(count, invalid_every):
+                f.write(json.dumps(row) + "\n")
+
+def create_client(mock: bool):
+    if mock:
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(os.environ["MONGODB_URL"])
+
+async def run(args):
+    client = create_client(args.mock)
+    db = client.load_import_benchmark
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"loads.{args.format}")
+        start = time.perf_counter()
+        write_file(path, args.format, args.rows, args.invalid_every)
+        print(f"Generated {args.rows} rows ({os.path.getsize(path) / 1e6:.0f} MB) in {time.perf_counter() - start:.1f}s")
+        
+        try:
+            if not args.dry_run:
+                await db.loads.drop()
+                await db.loads.create_index("load_id", unique=True)
+            
+            with open(path, newline="") as f:
+                report = await import_lines(db, f, args.format, args.batch_size, args.dry_run)
+        finally:
+            if not args.dry_run:
+                await db.loads.drop()
+            client.close()
+    
+    # ru_maxrss is in KB on Linux; it stays flat as --rows grows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    result = report.to_dict()
+    print(
+        f"{result['rows']} rows: {result['inserted']} inserted, {result['updated']} updated, "
+        f"{result['failed']} failed in {result['elapsed_seconds']:.1f}s "
+        f"({result['rows_per_second']} rows/s), peak RSS {peak / 1e6:.0f} MB"
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--invalid-every", type=int, default=1000, help="make every Nth row invalid (0 for none)")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--mock", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# benchmarks/serialization.py
+"""
+Measure the cost of turning load documents into a JSON response body.
+
+Paths compared, each on the same documents as they come back from Motor
+(ObjectId _id, naive datetimes, GeoJSON points and normalized fields):
+
+  jsonable_encoder   the FastAPI default for endpoints returning dicts:
+                     _id stringified by hand, jsonable_encoder, JSONResponse
+  load_model         a Load model validated per document, then model_dump_json
+  load_construct     the same with Load.model_construct, which skips validation
+                     but is pure Python (slower than validating on pydantic 2.4)
+  fast_response      FastJSONResponse straight from the documents
+  stdlib_fallback    the same response layer without orjson installed
+
+Reports microseconds per load and bytes allocated per load (the latter in a
+separate tracemalloc pass, so it doesn't skew the timings).
+
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --page-size 1 --iterations 20000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("API_KEY", "benchmark")
+os.environ.setdefault("FMCSA_API_KEY", "benchmark")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core import responses
+from app.core.responses import FastJSONResponse
+from app.schemas.loads import Load
+from app.services.normalization import normalize_load
+
+CITIES = ["Dallas, TX", "Chicago, IL", "Atlanta, GA", "Denver, CO", "Phoenix, AZ", "Memphis, TN", "Columbus, OH"]
+EQUIPMENT = ["Dry Van", "Reefer", "Flatbed"]
+
+def make_loads(n: int, rng: random.Random):
+    start = datetime(2025, 1, 6, 8, 0)
+    loads = []
+    for i in range(n):
+        origin, destination = rng.sample(CITIES, 2)
+        pickup = start + timedelta(hours=rng.randint(0, 24 * 14))
+        load = normalize_load({
+            "load_id": f"LD{100000 + i}",
+            "origin": origin,
+            "destination": destination,
+            "pickup_datetime": pickup,
+            "delivery_datetime": pickup + timedelta(days=rng.randint(1, 4)),
+            "equipment_type": rng.choice(EQUIPMENT),
+            "loadboard_rate": float(rng.randint(800, 4500)),
+            "notes": "Driver assist, call ahead",
+            "weight": float(rng.randint(5000, 44000)),
+            "commodity_type": "General Freight",
+            "num_of_pieces": rng.randint(1, 30),
+            "miles": float(rng.randint(150, 1800)),
+            "dimensions": "48x40x60",
+            "status": "available"
+        })
+        load["_id"] = ObjectId()
+        loads.append(load)
+    return loads
+
+def fetch(loads):
+    """Fresh copies, as each request gets its own documents from the driver"""
+    return [dict(load) for load in loads]
+
+def jsonable_encoder_path(loads) -> bytes:
+    for load in loads:
+        load["_id"] = str(load["_id"])
+    return JSONResponse(jsonable_encoder(loads)).body
+
+def load_model_path(loads) -> bytes:
+    models = [Load.model_validate(load) for load in loads]
+    return b"[" + b",".join(model.model_dump_json(by_alias=True).encode() for model in models) + b"]"
+
+def load_construct_path(loads) -> bytes:
+    models = [Load.model_construct(**load) for load in loads]
+    return b"[" + b",".join(model.model_dump_json(by_alias=True).encode() for model in models) + b"]"
+
+def fast_response_path(loads) -> bytes:
+    return FastJSONResponse(loads).body
+
+def stdlib_fallback_path(loads) -> bytes:
+    return json.dumps(loads, default=responses._default, separators=(",", ":")).encode()
+
+PATHS = {
+    "jsonable_encoder": jsonable_encoder_path,
+    "load_model": load_model_path,
+    "load_construct": load_construct_path,
+    "fast_response": fast_response_path,
+    "stdlib_fallback": stdlib_fallback_path
+}
+
+def time_path(path, loads, iterations: int) -> float:
+    """Seconds per load; the document copies are made before the clock starts"""
+    pages = [fetch(loads) for _ in range(iterations)]
+    start = time.perf_counter()
+    for page in pages:
+        path(page)
+    return (time.perf_counter() - start) / (iterations * len(loads))
+
+def allocated_per_load(path, loads, iterations: int) -> float:
+    pages = [fetch(loads) for _ in range(iterations)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for page in pages:
+        path(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # Peak over a single page, as each body is dropped before the next one
+    return (peak - before) / len(loads)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=10, help="loads per response")
+    parser.add_argument("--iterations", type=int, default=2000, help="responses per path")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    loads = make_loads(args.page_size, random.Random(args.seed))
+    print(f"encoder: {'orjson ' + responses.orjson.__version__ if responses.orjson else 'stdlib json'}")
+    print(f"{args.page_size} loads per response, {args.iterations} responses per path, "
+          f"{len(fast_response_path(fetch(loads))) // args.page_size} bytes per load\n")
+
+    baseline = None
+    print(f"{'path':<18} {'us/load':>9} {'speedup':>8} {'peak B/load':>12}")
+    for name, path in PATHS.items():
+        path(fetch(loads))  # warm up validators and encoders
+        seconds = time_path(path, loads, args.iterations)
+        allocated = allocated_per_load(path, loads, max(1, args.iterations // 20))
+        baseline = baseline or seconds
+        print(f"{name:<18} {seconds * 1e6:>9.2f} {baseline / seconds:>7.1f}x {allocated:>12.0f}")
+
+if __name__ == "__main__":
+    main()
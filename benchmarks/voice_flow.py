@@ -0,0 +1,321 @@
+# benchmarks/voice_flow.py
+"""
+Drive full voice-agent conversations through POST /api/webhooks/happyrobot/voice
+and report latency percentiles per action and throughput.
+
+Each conversation is verify_carrier -> search_loads -> negotiate_rate x N ->
+book_load -> log_call, sent in-process through the ASGI app (real routers,
+services and metrics middleware). FMCSA is replaced by a mock transport with
+configurable latency. Storage is a local mongod (MONGODB_URL, default
+mongodb://localhost:27017) or, with --mock, an in-process mongomock-motor
+stand-in (pip install mongomock-motor).
+
+    python benchmarks/voice_flow.py --mock
+    python benchmarks/voice_flow.py --conversations 2000 --concurrency 100 --rounds 3
+    python benchmarks/voice_flow.py --mock --concurrency 10 --conversations 300 \
+        --save-baseline benchmarks/baselines/voice_flow_mock.json
+    python benchmarks/voice_flow.py --mock --concurrency 10 --conversations 300 \
+        --compare benchmarks/baselines/voice_flow_mock.json
+
+mongomock has no indexes and runs on the event loop, so under --mock every
+query is a synchronous collection scan and time spent waiting on FMCSA
+inflates with concurrency (verify_carrier's tail in particular). The stored
+mock baseline uses low concurrency to keep that queueing out of the numbers;
+use a real mongod for absolute latencies.
+
+--compare exits non-zero when any action's p95 (or overall throughput) is
+worse than the baseline by more than --tolerance. Baselines are only
+comparable on the same machine and with the same options, which are stored
+alongside the results.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("API_KEY", "benchmark")
+os.environ.setdefault("FMCSA_API_KEY", "benchmark")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from app.api.endpoints import webhooks
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.db.indexes import ensure_indexes
+from app.db.sessions import mongodb
+from app.db.write_behind import write_behind
+from app.services.carrier_verification import carrier_verification_service
+from app.services.load_index import load_index
+from app.services.normalization import normalize_load
+
+ACTIONS = ("verify_carrier", "search_loads", "negotiate_rate", "book_load", "log_call")
+CITIES = [
+    "Dallas, TX", "Houston, TX", "Chicago, IL", "Atlanta, GA", "Denver, CO",
+    "Phoenix, AZ", "Memphis, TN", "Columbus, OH", "Los Angeles, CA", "Newark, NJ"
+]
+EQUIPMENT = ["Dry Van", "Reefer", "Flatbed"]
+WEBHOOK = "/api/webhooks/happyrobot/voice"
+
+def create_client(mock: bool):
+    if mock:
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(os.environ["MONGODB_URL"])
+
+def mock_fmcsa(latency_ms: float) -> httpx.AsyncClient:
+    """FMCSA stand-in: every MC is an active carrier, answered after `latency_ms`"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency_ms / 1000)
+        mc = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200, json={"content": {"carrier": {
+            "legalName": f"Carrier {mc}",
+            "dotNumber": f"9{mc}",
+            "entityType": "CARRIER",
+            "statusCode": "ACTIVE",
+            "safetyRating": "Satisfactory"
+        }}})
+    return httpx.AsyncClient(base_url=settings.fmcsa_base_url, transport=httpx.MockTransport(handler))
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(webhooks.router, prefix="/api/webhooks")
+    return app
+
+async def seed(db, count: int, rng: random.Random):
+    await db.loads.delete_many({})
+    for collection in ("bookings", "negotiations", "call_logs", "carriers", "call_events", "webhook_idempotency"):
+        await db[collection].delete_many({})
+    # The production schema, so a kept database or a real mongod is measured with its indexes
+    await ensure_indexes(db)
+
+    start = datetime.utcnow() + timedelta(days=1)
+    docs = []
+    for i in range(count):
+        origin, destination = rng.sample(CITIES, 2)
+        pickup = start + timedelta(hours=rng.randrange(24 * 14))
+        docs.append(normalize_load({
+            "load_id": f"FLOW{i:06d}",
+            "origin": origin,
+            "destination": destination,
+            "pickup_datetime": pickup.isoformat(),
+            "delivery_datetime": (pickup + timedelta(days=2)).isoformat(),
+            "equipment_type": rng.choice(EQUIPMENT),
+            "loadboard_rate": round(rng.uniform(1200, 4000), 2),
+            "notes": "",
+            "weight": rng.randrange(5000, 45000),
+            "commodity_type": "General freight",
+            "num_of_pieces": rng.randrange(1, 30),
+            "miles": rng.randrange(200, 2000),
+            "dimensions": "48x40x60",
+            "status": "available"
+        }))
+    await db.loads.insert_many(docs)
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(lambda: defaultdict(int))
+
+    async def post(self, client: httpx.AsyncClient, session_id: str, action: str, parameters: dict) -> dict:
+        body = json.dumps({"session_id": session_id, "action": action, "parameters": parameters})
+        start = time.perf_counter()
+        response = await client.post(WEBHOOK, content=body)
+        self.latencies[action].append(time.perf_counter() - start)
+        result = response.json() if response.status_code == 200 else {}
+        outcome = "http_error" if response.status_code != 200 else ("success" if result.get("success") else "failure")
+        self.outcomes[action][outcome] += 1
+        return result
+
+async def conversation(client: httpx.AsyncClient, recorder: Recorder, number: int, args, rng: random.Random):
+    session_id = f"bench-{number}"
+    mc_number = f"MC{rng.randrange(args.carriers)}"
+    await recorder.post(client, session_id, "verify_carrier", {"mc_number": mc_number})
+
+    origin = rng.choice(CITIES)
+    search = await recorder.post(client, session_id, "search_loads", {
+        "origin": origin.rsplit(", ", 1)[1],
+        "equipment_type": rng.choice(EQUIPMENT)
+    })
+    loads = search.get("loads") or []
+    if not loads:
+        await recorder.post(client, session_id, "log_call", {"mc_number": mc_number, "outcome": "no_loads"})
+        return
+
+    load = loads[0]
+    rate = load["rate"]
+    agreed = None
+    for round_number in range(1, args.rounds + 1):
+        offer = round(rate * (0.8 + 0.05 * round_number), 2)
+        result = await recorder.post(client, session_id, "negotiate_rate", {
+            "load_id": load["load_id"], "offered_rate": offer, "mc_number": mc_number
+        })
+        if result.get("accepted"):
+            agreed = offer
+            break
+        if result.get("counter_rate"):
+            agreed = result["counter_rate"]
+
+    booked = await recorder.post(client, session_id, "book_load", {
+        "load_id": load["load_id"], "mc_number": mc_number, "agreed_rate": agreed or rate
+    })
+    await recorder.post(client, session_id, "log_call", {
+        "mc_number": mc_number,
+        "load_id": load["load_id"],
+        "outcome": "booked" if booked.get("success") else "not_booked",
+        "sentiment": "positive",
+        "final_rate": agreed or rate
+    })
+
+def summarize(recorder: Recorder, elapsed: float, conversations: int) -> dict:
+    actions = {}
+    total = 0
+    for action in ACTIONS:
+        samples = recorder.latencies.get(action)
+        if not samples:
+            continue
+        values = np.array(samples) * 1000
+        total += len(values)
+        actions[action] = {
+            "count": len(values),
+            "p50_ms": round(float(np.percentile(values, 50)), 3),
+            "p95_ms": round(float(np.percentile(values, 95)), 3),
+            "p99_ms": round(float(np.percentile(values, 99)), 3),
+            "max_ms": round(float(values.max()), 3),
+            "outcomes": dict(recorder.outcomes[action])
+        }
+    return {
+        "actions": actions,
+        "requests": total,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(total / elapsed, 1),
+        "conversations_per_second": round(conversations / elapsed, 1)
+    }
+
+def print_report(report: dict):
+    print(f"{'action':<16} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}  outcomes")
+    for action, row in report["actions"].items():
+        outcomes = " ".join(f"{name}={count}" for name, count in sorted(row["outcomes"].items()))
+        print(
+            f"{action:<16} {row['count']:>7} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+            f"{row['p99_ms']:>9.2f} {row['max_ms']:>9.2f}  {outcomes}"
+        )
+    print(
+        f"{report['requests']} requests in {report['elapsed_seconds']:.1f}s: "
+        f"{report['requests_per_second']} req/s, {report['conversations_per_second']} conversations/s"
+    )
+
+def compare(report: dict, baseline: dict, tolerance: float) -> bool:
+    """Print regressions against a stored baseline; True when within tolerance"""
+    if baseline.get("options") != report["options"]:
+        print(f"Warning: baseline was recorded with different options: {baseline.get('options')}")
+    ok = True
+    for action, row in report["actions"].items():
+        before = baseline.get("actions", {}).get(action)
+        if not before:
+            continue
+        change = row["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        flag = "REGRESSION" if change > tolerance else "ok"
+        ok &= flag == "ok"
+        print(f"{action:<16} p95 {before['p95_ms']:>8.2f} -> {row['p95_ms']:>8.2f} ms ({change:+.0%}) {flag}")
+    before = baseline.get("requests_per_second")
+    if before:
+        change = report["requests_per_second"] / before - 1
+        flag = "REGRESSION" if change < -tolerance else "ok"
+        ok &= flag == "ok"
+        print(f"{'throughput':<16} {before:>12.1f} -> {report['requests_per_second']:>8.1f} req/s ({change:+.0%}) {flag}")
+    return ok
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    client = create_client(args.mock)
+    db = client.voice_flow_benchmark
+    mongodb.client, mongodb.database = client, db
+
+    await seed(db, args.loads, rng)
+    write_behind.start(db)
+    if args.index:
+        await load_index.start(db)
+    carrier_verification_service.client = mock_fmcsa(args.fmcsa_latency_ms)
+
+    app = create_app()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    recorder = Recorder()
+
+    async def limited(http: httpx.AsyncClient, number: int):
+        async with semaphore:
+            await conversation(http, recorder, number, args, random.Random(args.seed + number))
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as http:
+            # Warm up imports, validators and connection pools outside the timed window
+            await asyncio.gather(*(limited(http, -1 - i) for i in range(min(args.concurrency, 20))))
+            recorder = Recorder()
+
+            start = time.perf_counter()
+            await asyncio.gather(*(limited(http, i) for i in range(args.conversations)))
+            elapsed = time.perf_counter() - start
+    finally:
+        await load_index.stop()
+        await carrier_verification_service.close()
+        await write_behind.stop()
+        if not args.keep:
+            await client.drop_database("voice_flow_benchmark")
+        client.close()
+
+    report = summarize(recorder, elapsed, args.conversations)
+    report["options"] = {
+        name: getattr(args, name)
+        for name in ("conversations", "concurrency", "rounds", "loads", "carriers", "fmcsa_latency_ms", "mock", "index", "seed")
+    }
+    report["environment"] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "recorded_at": datetime.utcnow().isoformat(timespec="seconds")
+    }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3, help="negotiation rounds per call")
+    parser.add_argument("--loads", type=int, default=1000)
+    parser.add_argument("--carriers", type=int, default=200, help="distinct MC numbers (repeat callers hit the cache)")
+    parser.add_argument("--fmcsa-latency-ms", type=float, default=80.0)
+    parser.add_argument("--index", action="store_true", help="serve searches from the in-process load index (needs change streams, so not under --mock)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--mock", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="leave the benchmark database in place")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95/throughput regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
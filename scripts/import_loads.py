@@ -0,0 +1,51 @@
+# scripts/import_loads.py
+"""
+Bulk upsert loads from a CSV or JSONL file.
+
+Rows are read, validated and written in batches, so memory stays flat
+regardless of file size. Loads are matched on load_id: new ones are
+inserted, existing ones updated (a booked load keeps its status unless
+the file sets one).
+
+    python scripts/import_loads.py loads.csv
+    python scripts/import_loads.py loads.jsonl --batch-size 5000
+    python scripts/import_loads.py loads.csv --dry-run
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+load_dotenv()
+
+from app.services.load_import import FORMATS, import_lines
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    args = parser.parse_args()
+    
+    fmt = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        parser.error(f"Cannot tell the format of {args.path}; pass --format")
+    
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+    db = client.carrier_loads
+    
+    try:
+        # newline="" keeps quoted line breaks inside CSV fields intact
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            report = await import_lines(db, f, fmt, args.batch_size, args.dry_run)
+        print(json.dumps(report.to_dict(), indent=2))
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
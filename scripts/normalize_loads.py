@@ -0,0 +1,72 @@
+# scripts/normalize_loads.py
+import asyncio
+import os
+import sys
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.normalization import normalize_load
+
+load_dotenv()
+
+NORMALIZED_FIELDS = (
+    "origin_norm", "origin_state_norm",
+    "destination_norm", "destination_state_norm",
+    "equipment_norm",
+    "origin_point", "destination_point",
+    "pickup_at", "rate_per_mile"
+)
+
+async def backfill(db, batch_size=1000):
+    """
+    Compute normalized search fields, sort keys and points for loads written
+    before they existed. Each load it rewrites is marked with normalized_at,
+    so a load whose city has no gazetteer point isn't picked up again on
+    every run.
+    """
+    updated = 0
+    batch = []
+    now = datetime.utcnow()
+    
+    cursor = db.loads.find(
+        {"normalized_at": {"$exists": False}, "$or": [
+            {"equipment_norm": {"$exists": False}},
+            {"origin_point": {"$exists": False}},
+            {"rate_per_mile": {"$exists": False}}
+        ]},
+        {"origin": 1, "destination": 1, "equipment_type": 1, "pickup_datetime": 1, "loadboard_rate": 1, "miles": 1}
+    )
+    
+    async for load in cursor:
+        normalize_load(load)
+        batch.append(UpdateOne(
+            {"_id": load["_id"]},
+            {"$set": {**{field: load[field] for field in NORMALIZED_FIELDS if field in load}, "normalized_at": now}}
+        ))
+        
+        if len(batch) >= batch_size:
+            result = await db.loads.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+    
+    if batch:
+        result = await db.loads.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+    
+    return updated
+
+async def main():
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+    db = client.carrier_loads
+    
+    try:
+        updated = await backfill(db)
+        print(f"Normalized {updated} loads")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+# scripts/pricing_whatif.py
+"""
+Replay historical negotiation offers through alternative pricing policies.
+
+Every offer in the `negotiations` collection is re-evaluated under the
+current policy table and under each --policy file, then acceptance rate,
+counter/transfer rates and margin against the listed rate are reported.
+
+    python scripts/pricing_whatif.py --policy aggressive.json --policy lenient.json
+    python scripts/pricing_whatif.py --synthetic 5000000 --policy aggressive.json
+
+A policy file looks like:
+
+    {"default": {"accept_ratio": 0.95, "floor_ratio": 0.85},
+     "policies": {"TX-IL|reefer": {"floor_ratio": 0.9}, "*|flatbed": {"counter_step": 0.5}}}
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.pricing import (
+    ACCEPT, COUNTER, TRANSFER, PolicyTable, evaluate, lane_key, policy_key, pricing_policies
+)
+
+load_dotenv()
+
+LOAD_FIELDS = {"load_id": 1, "loadboard_rate": 1, "origin_state_norm": 1, "destination_state_norm": 1, "equipment_norm": 1}
+
+async def fetch_offers(db, limit=0):
+    """Historical offers as (base rates, offered rates, rounds, distinct policy keys, key codes)"""
+    docs = await db.negotiations.find(
+        {},
+        {"load_id": 1, "base_rate": 1, "lane": 1, "equipment": 1, "offered_rate": 1, "negotiation_round": 1}
+    ).limit(limit).to_list(length=None)
+
+    # Offers logged before the pricing inputs were recorded need their load
+    missing = list({doc["load_id"] for doc in docs if doc.get("base_rate") is None})
+    loads = {}
+    if missing:
+        async for load in db.loads.find({"load_id": {"$in": missing}}, LOAD_FIELDS):
+            loads[load["load_id"]] = load
+
+    base_rates, offered_rates, rounds, codes = [], [], [], []
+    keys = {}
+    for doc in docs:
+        if doc.get("base_rate") is None:
+            load = loads.get(doc["load_id"])
+            if load is None:
+                continue
+            doc["base_rate"] = load["loadboard_rate"]
+            doc["lane"] = lane_key(load.get("origin_state_norm"), load.get("destination_state_norm"))
+            doc["equipment"] = load.get("equipment_norm")
+        base_rates.append(doc["base_rate"])
+        offered_rates.append(doc["offered_rate"])
+        rounds.append(doc.get("negotiation_round") or 1)
+        codes.append(keys.setdefault(policy_key(doc.get("lane"), doc.get("equipment")), len(keys)))
+
+    return (
+        np.array(base_rates, dtype=np.float64),
+        np.array(offered_rates, dtype=np.float64),
+        np.array(rounds, dtype=np.int16),
+        list(keys),
+        np.array(codes, dtype=np.intp)
+    )
+
+def synthetic_offers(n, seed=7):
+    """Random offers spread over a handful of lanes, for throughput runs"""
+    rng = np.random.default_rng(seed)
+    base_rates = rng.uniform(800, 4500, n).round(2)
+    offered_rates = (base_rates * rng.uniform(0.7, 1.05, n)).round(2)
+    rounds = rng.integers(1, 6, n, dtype=np.int16)
+    keys = [
+        policy_key(lane, equipment)
+        for lane in ("TX-IL", "CA-AZ", "GA-FL", "NY-PA")
+        for equipment in ("dry van", "reefer", "flatbed")
+    ]
+    return base_rates, offered_rates, rounds, keys, rng.integers(0, len(keys), n)
+
+def replay(table, base_rates, offered_rates, rounds, keys, codes):
+    started = time.perf_counter()
+    parameters = table.parameters(keys, codes)
+    actions, _, _ = evaluate(base_rates, offered_rates, rounds, parameters=parameters)
+    elapsed = time.perf_counter() - started
+
+    accepted = actions == ACCEPT
+    margin = base_rates[accepted] - offered_rates[accepted]
+    return actions, {
+        "acceptance": accepted.mean(),
+        "counter": (actions == COUNTER).mean(),
+        "transfer": (actions == TRANSFER).mean(),
+        "margin_pct": (margin / base_rates[accepted]).mean() * 100 if accepted.any() else 0.0,
+        "margin_total": margin.sum(),
+        "offers_per_sec": len(actions) / elapsed if elapsed else float("inf")
+    }
+
+def report(name, stats, changed=None):
+    line = (
+        f"{name:<28} accept {stats['acceptance']:6.1%}  counter {stats['counter']:6.1%}  "
+        f"transfer {stats['transfer']:6.1%}  margin {stats['margin_pct']:5.2f}% "
+        f"(${stats['margin_total']:,.0f})  {stats['offers_per_sec'] / 1e6:6.1f}M offers/s"
+    )
+    if changed is not None:
+        line += f"  {changed:,} decisions changed"
+    print(line)
+
+async def load_history(limit):
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+    try:
+        return await fetch_offers(client.carrier_loads, limit)
+    finally:
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--policy", action="append", default=[], help="Alternative policy table (JSON); repeatable")
+    parser.add_argument("--synthetic", type=int, default=0, help="Replay N random offers instead of the negotiations collection")
+    parser.add_argument("--limit", type=int, default=0, help="Replay at most this many historical offers")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        offers = synthetic_offers(args.synthetic)
+    else:
+        offers = asyncio.run(load_history(args.limit))
+
+    if not len(offers[0]):
+        print("No offers to replay")
+        return
+
+    print(f"Replaying {len(offers[0]):,} offers")
+    baseline, stats = replay(pricing_policies, *offers)
+    report("current", stats)
+    for path in args.policy:
+        actions, stats = replay(PolicyTable.from_file(path), *offers)
+        report(os.path.basename(path), stats, int((actions != baseline).sum()))
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,13 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timedelta
 import random
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.db.indexes import ensure_indexes
+from app.services.normalization import normalize_load
+
 load_dotenv()
 
 # Sample data for seeding
@@ -67,7 +72,7 @@ async def create_sample_loads(db, num_loads=50):
             "created_at": datetime.utcnow()
         }
         
-        loads.append(load)
+        loads.append(normalize_load(load))
     
     # Insert all loads
     result = await db.loads.insert_many(loads)
@@ -98,22 +103,10 @@ async def create_sample_carriers(db, num_carriers=20):
 
 async def create_indexes(db):
     """Create database indexes for better performance"""
-    # Loads indexes
-    await db.loads.create_index("load_id", unique=True)
-    await db.loads.create_index("status")
-    await db.loads.create_index("origin")
-    await db.loads.create_index("destination")
-    await db.loads.create_index("equipment_type")
-    await db.loads.create_index("loadboard_rate")
-    
-    # Carriers indexes
-    await db.carriers.create_index("mc_number", unique=True)
-    await db.carriers.create_index("dot_number")
-    
-    # Call logs indexes
-    await db.call_logs.create_index("call_id")
-    await db.call_logs.create_index("mc_number")
-    await db.call_logs.create_index("created_at")
+    # Same definitions the API ensures at startup
+    failed = await ensure_indexes(db)
+    if failed:
+        print(f"Could not create indexes: {', '.join(failed)}")
     
     print("Created database indexes")
 